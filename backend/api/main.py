@@ -1,8 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from api.metrics import MetricsMiddleware, router as metrics_router
 from api.v1.jobs import router as jobs_router
-from api.v1.status.credits import router as status_router
+from api.v1.status.credits import router as status_router, credits_service
+from api.v1.transfer import router as transfer_router
 from core.database import init_db
+from core.query_guard import QUERY_GUARD
 
 
 app = FastAPI(title="Duunikanban API")
@@ -12,6 +15,11 @@ app = FastAPI(title="Duunikanban API")
 def on_startup():
     init_db()
 
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await credits_service.aclose()
+
 # TODO: fix this and remove the wildcard from allowed origins
 origins = [
     "http://localhost:3000",
@@ -27,8 +35,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware, query_guard=QUERY_GUARD)
 
 
 app.include_router(jobs_router, prefix="/api/v1")
 app.include_router(status_router, prefix="/api/v1")
+app.include_router(transfer_router, prefix="/api/v1")
+app.include_router(metrics_router)
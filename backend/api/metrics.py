@@ -0,0 +1,181 @@
+# backend/api/metrics.py
+import logging
+import threading
+import time
+from bisect import bisect_left
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from core.query_guard import QUERY_GUARD_REPEATS, QueryStats, current_query_stats, repeated_statements
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 25, 50, 100, 250, 1000)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = {}
+        self.latency = {}
+        self.size = {}
+        self.statements = {}
+        self.query_seconds = {}
+
+    def observe(self, method, route, status, seconds, size, stats: QueryStats):
+        key = (method, route)
+        with self.lock:
+            self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.size.setdefault(key, Histogram(SIZE_BUCKETS)).observe(size)
+            self.statements.setdefault(key, Histogram(STATEMENT_BUCKETS)).observe(stats.statements)
+            self.query_seconds.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(stats.seconds)
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            lines += [
+                "# HELP http_requests_in_flight Requests currently being served.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+                "# HELP http_requests_total Requests served.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}'
+                )
+            for name, help_text, series in (
+                ("http_request_duration_seconds", "Request latency.", self.latency),
+                ("http_response_size_bytes", "Response body size.", self.size),
+                ("db_statements_per_request", "SQL statements executed per request.", self.statements),
+                ("db_query_seconds_per_request", "Time spent in SQL per request.", self.query_seconds),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (method, route), hist in sorted(series.items()):
+                    lines += _histogram_lines(name, f'method="{method}",route="{route}"', hist)
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name, labels, hist: Histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(hist.buckets, hist.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    cumulative += hist.counts[-1]
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+    lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+    lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+# Route template for the request, e.g. "/api/v1/jobs/{job_id}", so ids never
+# end up in label values. Depending on the FastAPI version, routes from an
+# included router report their path without the include prefix; in that case
+# the prefix is recovered from the part of the request path the route did not
+# match.
+def route_template(scope) -> str:
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "<unmatched>"
+    path = scope.get("path", "")
+    regex = getattr(route, "path_regex", None)
+    if regex is not None and not regex.match(path):
+        for i, char in enumerate(path):
+            if char == "/" and i and regex.match(path[i:]):
+                return path[:i] + template
+    return template
+
+
+# Plain ASGI middleware, so streaming responses pass through untouched and
+# the per-request cost stays a few dict updates. With query_guard (debug
+# mode, see core/query_guard.py) it also returns the statement count in
+# X-Query-Count and logs a warning when a statement shape repeats.
+class MetricsMiddleware:
+    def __init__(
+        self,
+        app,
+        registry: MetricsRegistry = registry,
+        query_guard: bool = False,
+        repeats: int = QUERY_GUARD_REPEATS,
+    ):
+        self.app = app
+        self.registry = registry
+        self.query_guard = query_guard
+        self.repeats = repeats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(keep_statements=self.query_guard)
+        token = current_query_stats.set(stats)
+        status = 500
+        size = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.query_guard:
+                    headers = [*message.get("headers", []), (b"x-query-count", str(stats.statements).encode())]
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        with self.registry.lock:
+            self.registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            with self.registry.lock:
+                self.registry.in_flight -= 1
+            current_query_stats.reset(token)
+            self.registry.observe(
+                scope["method"],
+                route_template(scope),
+                status,
+                time.perf_counter() - start,
+                size,
+                stats,
+            )
+
+        if self.query_guard:
+            for repeat in repeated_statements(stats.executed, self.repeats):
+                logging.warning(
+                    f"Possible N+1 in {scope['method']} {scope['path']}: "
+                    f"{repeat.count}x {repeat.statement}"
+                )
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,115 @@
+# backend/api/streaming.py
+import zlib
+from typing import Iterable, Iterator
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available.
+    brotli = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Serialized rows are sent in chunks of about this size. Small enough that the
+# first cards go out while the query is still running, large enough to keep
+# the per-chunk overhead down.
+CHUNK_BYTES = 64 * 1024
+
+
+def wants_ndjson(request: Request, format: str | None) -> bool:
+    if format:
+        return format == "ndjson"
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+# Pick a content coding from Accept-Encoding, preferring brotli when it is
+# installed. Returns None for identity.
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    offered = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            offered[coding.strip().lower()] = q
+
+    for coding in ("br", "gzip"):
+        if coding == "br" and brotli is None:
+            continue
+        if offered.get(coding, offered.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def json_array(rows: Iterable[dict]) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    for row in rows:
+        yield orjson.dumps(row) if first else b"," + orjson.dumps(row)
+        first = False
+    yield b"]"
+
+
+def ndjson_lines(rows: Iterable[dict]) -> Iterator[bytes]:
+    for row in rows:
+        yield orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def chunked(parts: Iterable[bytes], size: int | None = None) -> Iterator[bytes]:
+    size = size or CHUNK_BYTES
+    buffer = bytearray()
+    for part in parts:
+        buffer += part
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+# Compress a chunk stream. Every chunk is flushed so the client can decode
+# (and render) what it has received so far.
+def compressed(chunks: Iterable[bytes], encoding: str | None) -> Iterator[bytes]:
+    if encoding is None:
+        yield from chunks
+    elif encoding == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    elif encoding == "br":
+        compressor = brotli.Compressor(quality=4)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+# Serialize rows straight into the response as they are produced, as a JSON
+# array or as NDJSON. `rows` may be a generator that keeps a database cursor
+# open; it is consumed lazily while the response is sent.
+def stream_rows(
+    rows: Iterable[dict],
+    request: Request,
+    ndjson: bool = False,
+    headers: dict | None = None,
+) -> StreamingResponse:
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    parts = ndjson_lines(rows) if ndjson else json_array(rows)
+    return StreamingResponse(
+        compressed(chunked(parts), encoding),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json",
+        headers=headers,
+    )
@@ -1,9 +1,23 @@
-from fastapi import APIRouter, HTTPException, Body, Query
+import asyncio
+import base64
+import json
+import os
+import time
+from typing import Iterator
+from fastapi import APIRouter, HTTPException, Body, Header, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from uuid import UUID
-from sqlmodel import Session, select, desc, asc
-from core.database import engine
-from models.schema import Job, JobStateHistory, JobState
-from pydantic import BaseModel
+from sqlmodel import Session, select, desc, or_, and_, func
+from api.streaming import stream_rows, wants_ndjson
+from core.database import engine, read_engine
+from core.descriptions import decompress, description_text
+from core.geo import bounding_box
+from core.job_state import record_notes, record_state, record_states
+from core import search
+from models.schema import Job, JobCurrentState, JobDescription, JobRegion, JobState, JobStateHistory
+from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
@@ -15,88 +29,376 @@ RANGE_MAP = {
     "7d": timedelta(days=7),
 }
 
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+# How often an open change stream checks the database for new changes.
+CHANGE_POLL_SECONDS = float(os.getenv("CHANGE_POLL_SECONDS", "2"))
+CHANGE_KEEPALIVE_SECONDS = 15
+
+# Fields that can be requested from the list endpoint with `fields=`.
+BOARD_FIELDS = {
+    **{name: getattr(Job, name) for name in Job.__table__.columns.keys()},
+    "description": description_text(),
+    "state": JobCurrentState.state,
+    "notes": JobCurrentState.notes,
+    "updated_at": JobCurrentState.updated_at,
+    "applied_at": JobCurrentState.applied_at,
+}
 
-def normalize_ts(v):
-    if not v:
-        return None
-    if isinstance(v, datetime):
-        return v
-    # assume string
-    try:
-        return datetime.fromisoformat(v)
-    except:
-        # last-chance fallback for older timestamps
-        return datetime.strptime(v.split(".")[0], "%Y-%m-%d %H:%M:%S")
+# Default card projection. Descriptions are only served by GET /jobs/{job_id}.
+CARD_FIELDS = (
+    "id",
+    "title",
+    "company",
+    "url",
+    "country",
+    "region",
+    "remote",
+    "hybrid",
+    "state",
+    "notes",
+    "updated_at",
+)
+
+
+def parse_fields(fields: str | None) -> list[str]:
+    if not fields:
+        return list(CARD_FIELDS)
+
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [name for name in names if name not in BOARD_FIELDS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested",
+        )
+    return names
 
 
-@router.get("")
-def list_jobs(range: str | None = Query(None)):
+def encode_cursor(updated_at: datetime | None, job_id: UUID) -> str:
+    raw = json.dumps([updated_at.isoformat() if updated_at else None, job_id.hex])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-    cutoff = None
-    if range and range in RANGE_MAP:
-        cutoff = datetime.utcnow() - RANGE_MAP[range]
 
-    with Session(engine) as session:
-        stmt = (
-            select(Job)
-            .outerjoin(JobStateHistory)
-            .order_by(desc(JobStateHistory.timestamp))
+def decode_cursor(cursor: str) -> tuple[datetime | None, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, job_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            datetime.fromisoformat(updated_at) if updated_at else None,
+            UUID(job_id),
         )
-        jobs = session.exec(stmt).unique().all()
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-        formatted = []
-        for job in jobs:
-            latest = job.history[-1] if job.history else None
-            state = latest.state if latest else "new"
-            updated_at = normalize_ts(latest.timestamp if latest else None)
 
-            if cutoff and state == "new":
-                if not updated_at or updated_at < cutoff:
-                    continue
+# Shared WHERE clauses for board queries. Expects JobCurrentState joined to Job.
+def apply_board_filters(
+    stmt,
+    state: list[JobState] | None = None,
+    region: JobRegion | None = None,
+    range: str | None = None,
+):
+    if state:
+        stmt = stmt.where(JobCurrentState.state.in_([s.value for s in state]))
+
+    if region:
+        stmt = stmt.where(Job.region == region)
 
-            formatted.append(
-                {
-                    **job.dict(),
-                    "state": state,
-                    "notes": latest.notes if latest else "",
-                    "updated_at": updated_at.isoformat() if updated_at else None,
-                }
+    # The range cutoff only applies to the inbox.
+    if range in RANGE_MAP:
+        cutoff = datetime.utcnow() - RANGE_MAP[range]
+        stmt = stmt.where(
+            or_(
+                JobCurrentState.state != JobState.NEW.value,
+                JobCurrentState.updated_at >= cutoff,
             )
+        )
+
+    return stmt
 
-        formatted.sort(key=lambda j: normalize_ts(j["updated_at"]) or datetime.min, reverse=True)
 
-        return formatted
+def parse_near(near: str) -> tuple[float, float]:
+    try:
+        lat, lon = (float(part) for part in near.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="near must be 'lat,lon'")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(status_code=400, detail="near is out of range")
+    return lat, lon
+
+
+# Restrict to jobs within radius_km of `near`. The bounding box is evaluated
+# against ix_job_latitude_longitude; the exact distance is only computed for
+# the rows inside it.
+def apply_near(stmt, near: tuple[float, float], radius_km: float):
+    lat, lon = near
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    distance = func.haversine_km(lat, lon, Job.latitude, Job.longitude)
+
+    stmt = stmt.where(Job.latitude.between(min_lat, max_lat))
+    if min_lon is not None:
+        stmt = stmt.where(Job.longitude.between(min_lon, max_lon))
+    return stmt.where(distance <= radius_km), distance
+
+
+# Keyset pagination on (updated_at DESC, job_id DESC). SQLite sorts NULLs
+# last in descending order, so jobs that were never updated come at the end.
+def apply_cursor(stmt, cursor: str | None):
+    if not cursor:
+        return stmt
+    return apply_keyset(stmt, *decode_cursor(cursor))
+
+
+# Rows after (updated_at, job_id) in board order.
+def apply_keyset(stmt, updated_at: datetime | None, job_id: UUID):
+    if updated_at is None:
+        return stmt.where(
+            and_(JobCurrentState.updated_at.is_(None), JobCurrentState.job_id < job_id)
+        )
+
+    return stmt.where(
+        or_(
+            JobCurrentState.updated_at < updated_at,
+            and_(
+                JobCurrentState.updated_at == updated_at,
+                JobCurrentState.job_id < job_id,
+            ),
+            JobCurrentState.updated_at.is_(None),
+        )
+    )
+
+
+# The rows of a board query, read in keyset chunks of STREAM_BATCH_SIZE with
+# a short session each, so a slow or stalled client never holds a reader
+# connection while its response is sent. A job updated while the stream is
+# under way moves ahead of the keyset and is left out, as when paging.
+def board_rows(stmt, names: list[str]) -> Iterator[dict]:
+    chunk = stmt
+    while True:
+        with Session(read_engine) as session:
+            rows = session.exec(chunk.limit(STREAM_BATCH_SIZE)).mappings().all()
+        for row in rows:
+            yield {name: row[name] for name in names}
+        if len(rows) < STREAM_BATCH_SIZE:
+            return
+        last = rows[-1]
+        chunk = apply_keyset(stmt, last["_cursor_updated_at"], last["_cursor_id"])
+
+
+# Rows are serialized into the response as they are read (see
+# api/streaming.py), so a full board never sits in memory as Python
+# objects. Paged requests are bounded by MAX_PAGE_SIZE and read up front to
+# know whether to send X-Next-Cursor.
+@router.get("")
+def list_jobs(
+    request: Request,
+    range: str | None = Query(None),
+    state: list[JobState] | None = Query(None),
+    region: JobRegion | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None),
+    fields: str | None = Query(None, description="Comma-separated list of fields"),
+    near: str | None = Query(None, description="lat,lon"),
+    radius_km: float = Query(50, gt=0),
+    format: str | None = Query(None, pattern="^(json|ndjson)$"),
+):
+    names = parse_fields(fields)
+    columns = [BOARD_FIELDS[name].label(name) for name in names]
+
+    stmt = (
+        select(
+            JobCurrentState.job_id.label("_cursor_id"),
+            JobCurrentState.updated_at.label("_cursor_updated_at"),
+        )
+        .select_from(JobCurrentState)
+        .join(Job, Job.id == JobCurrentState.job_id)
+        .order_by(desc(JobCurrentState.updated_at), desc(JobCurrentState.job_id))
+    )
+    stmt = apply_board_filters(stmt, state=state, region=region, range=range)
+
+    if near:
+        stmt, distance = apply_near(stmt, parse_near(near), radius_km)
+        columns.append(distance.label("distance_km"))
+        names.append("distance_km")
+
+    stmt = stmt.add_columns(*columns)
+    stmt = apply_cursor(stmt, cursor)
+    ndjson = wants_ndjson(request, format)
+
+    if not limit:
+        return stream_rows(board_rows(stmt, names), request, ndjson=ndjson)
+
+    # Fetch one extra row to know whether another page exists.
+    with Session(read_engine) as session:
+        rows = session.exec(stmt.limit(limit + 1)).mappings().all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last["_cursor_updated_at"], last["_cursor_id"])
+
+    return stream_rows(
+        ({name: row[name] for name in names} for row in rows),
+        request,
+        ndjson=ndjson,
+        headers=headers,
+    )
+
+
+@router.get("/search")
+def search_jobs(
+    q: str = Query(..., min_length=1, description='Words, "phrases" and prefix* terms'),
+    range: str | None = Query(None),
+    state: list[JobState] | None = Query(None),
+    region: JobRegion | None = Query(None),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    match = search.build_match_query(q)
+    if not match:
+        raise HTTPException(status_code=400, detail="Query has no searchable terms")
+
+    fts = search.job_fts
+    columns = [BOARD_FIELDS[name].label(name) for name in CARD_FIELDS]
+    stmt = (
+        select(
+            *columns,
+            fts.c.rank,
+            search.highlight(1).label("title_highlight"),
+            # Jobs without a description have no snippet.
+            func.coalesce(search.snippet(3), "").label("snippet"),
+        )
+        .select_from(fts)
+        .join(Job, Job.id == fts.c.job_id)
+        .join(JobCurrentState, JobCurrentState.job_id == Job.id)
+        .where(search.match(match))
+    )
+    stmt = apply_board_filters(stmt, state=state, region=region, range=range)
+    # Lower rank is better, as with bm25().
+    stmt = stmt.order_by(fts.c.rank).limit(limit).offset(offset)
+
+    with Session(read_engine) as session:
+        rows = session.exec(stmt).mappings().all()
+    return [
+        {
+            **row,
+            "title_highlight": search.mark_up(row["title_highlight"]),
+            "snippet": search.mark_up(row["snippet"]),
+        }
+        for row in rows
+    ]
+
+
+# Card projections of jobs whose change_seq is above `since`, oldest change
+# first. high_water_mark is the value to pass as `since` next time.
+def fetch_changes(since: int, limit: int, names: list[str]) -> dict:
+    columns = [BOARD_FIELDS[name].label(name) for name in names]
+    stmt = (
+        select(JobCurrentState.change_seq, *columns)
+        .select_from(JobCurrentState)
+        .join(Job, Job.id == JobCurrentState.job_id)
+        .where(JobCurrentState.change_seq > since)
+        .order_by(JobCurrentState.change_seq)
+        .limit(limit + 1)
+    )
+
+    with Session(read_engine) as session:
+        rows = session.exec(stmt).mappings().all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "since": since,
+        "high_water_mark": rows[-1]["change_seq"] if rows else since,
+        "has_more": has_more,
+        "jobs": [{name: row[name] for name in ["change_seq", *names]} for row in rows],
+    }
+
+
+@router.get("/changes")
+def list_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = Query(None, description="Comma-separated list of fields"),
+):
+    return fetch_changes(since, limit, parse_fields(fields))
+
+
+def sse_event(event: str, data: dict, event_id: int | None = None) -> str:
+    lines = [f"event: {event}", f"data: {json.dumps(jsonable_encoder(data))}"]
+    if event_id is not None:
+        lines.insert(0, f"id: {event_id}")
+    return "\n".join(lines) + "\n\n"
+
+
+# Server-Sent Events version of /changes. Each "changes" event carries the
+# same payload as /changes and its high-water mark as the event id, so a
+# reconnecting EventSource resumes from Last-Event-ID. The stream ends after
+# `timeout` seconds; browsers reconnect on their own.
+@router.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: int = Query(0, ge=0),
+    fields: str | None = Query(None, description="Comma-separated list of fields"),
+    timeout: float = Query(300, gt=0, le=3600),
+    last_event_id: str | None = Header(None),
+):
+    names = parse_fields(fields)
+    if last_event_id and last_event_id.isdigit():
+        since = max(since, int(last_event_id))
+
+    async def events():
+        nonlocal since
+        deadline = time.monotonic() + timeout
+        last_sent = time.monotonic()
+        yield f"retry: {int(CHANGE_POLL_SECONDS * 1000)}\n\n"
+
+        while time.monotonic() < deadline and not await request.is_disconnected():
+            changes = await run_in_threadpool(fetch_changes, since, MAX_PAGE_SIZE, names)
+            if changes["jobs"]:
+                since = changes["high_water_mark"]
+                last_sent = time.monotonic()
+                yield sse_event("changes", changes, event_id=since)
+                if changes["has_more"]:
+                    continue
+            elif time.monotonic() - last_sent >= CHANGE_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
 
+            await asyncio.sleep(min(CHANGE_POLL_SECONDS, max(deadline - time.monotonic(), 0)))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{job_id}")
 def get_job(job_id: UUID):
-    with Session(engine) as session:
-        job = session.get(Job, job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail="Job not found")
-
-        # Fetch latest state entry
-        latest_entry = session.exec(
-            select(JobStateHistory)
-            .where(JobStateHistory.job_id == job_id)
-            .order_by(desc(JobStateHistory.timestamp))
+    with Session(read_engine) as session:
+        row = session.exec(
+            select(Job, JobCurrentState, JobDescription.body)
+            .outerjoin(JobCurrentState, JobCurrentState.job_id == Job.id)
+            .outerjoin(JobDescription, JobDescription.description_hash == Job.description_hash)
+            .where(Job.id == job_id)
         ).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Job not found")
 
-        # Fetch first time it was marked applied
-        applied_entry = session.exec(
-            select(JobStateHistory)
-            .where(JobStateHistory.job_id == job_id)
-            .where(JobStateHistory.state == "applied")
-            .order_by(asc(JobStateHistory.timestamp))
-        ).first()
+        job, current, description = row
 
-        response = job.dict()
+        response = job.dict(exclude={"description_hash"})
 
-        response["state"] = latest_entry.state if latest_entry else "new"
-        response["notes"] = latest_entry.notes if latest_entry else ""
-        response["updated_at"] = latest_entry.timestamp if latest_entry else None
-        response["applied_at"] = applied_entry.timestamp if applied_entry else None
+        response["description"] = decompress(description) if description else None
+        response["state"] = current.state if current else "new"
+        response["notes"] = current.notes if current else ""
+        response["updated_at"] = current.updated_at if current else None
+        response["applied_at"] = current.applied_at if current else None
 
         return response
 
@@ -114,44 +416,115 @@ def update_job_state(job_id: UUID, payload: JobUpdate):
             raise HTTPException(status_code=404, detail="Job not found")
 
         # Determine previous notes if none provided
-        last_notes = job.history[-1].notes if job.history else ""
-
-        history = JobStateHistory(
-            job_id=job_id,
-            user_id=None,
-            state=payload.state or JobState.NEW,
-            notes=payload.notes if payload.notes is not None else last_notes
+        current = session.get(JobCurrentState, job_id)
+        last_notes = current.notes if current else ""
+
+        history = record_state(
+            session,
+            job_id,
+            payload.state or JobState.NEW,
+            notes=payload.notes if payload.notes is not None else last_notes,
         )
-
-        session.add(history)
+        if payload.notes is not None and payload.notes != last_notes:
+            record_notes(session, job_id, payload.notes, timestamp=history.timestamp)
+        # Read before commit, which would expire the row and cost a reload.
+        state, notes = history.state, history.notes
         session.commit()
-        session.refresh(history)
 
         return {
             "job_id": job_id,
-            "state": history.state,
-            "notes": history.notes
+            "state": state,
+            "notes": notes
         }
 
 
 @router.patch("/{job_id}/notes")
 def update_notes(job_id: UUID, notes: str = Body(..., embed=True)):
     with Session(engine) as session:
-        job = session.get(Job, job_id)
-        if not job:
+        # Every job has a current state row, so the job itself is only
+        # looked up to tell a missing job from a missing row.
+        current = session.get(JobCurrentState, job_id)
+        if current is None and session.get(Job, job_id) is None:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        # Use existing state rather than defaulting to NEW
-        current_state = job.history[-1].state if job.history else JobState.NEW
+        # Notes edits don't touch the state or its history.
+        state = current.state if current else JobState.NEW
 
-        history = JobStateHistory(
-            job_id=job_id,
-            user_id=None,
-            state=current_state,
-            notes=notes
-        )
-        session.add(history)
+        record_notes(session, job_id, notes)
+        session.commit()
+
+        return {"job_id": job_id, "state": state, "notes": notes}
+
+
+# Selects jobs for a batch update, e.g. all new jobs older than 7 days:
+# {"state": ["new"], "older_than": "7d"}. At least one field must be set.
+class BatchFilter(BaseModel):
+    state: list[JobState] | None = None
+    region: JobRegion | None = None
+    older_than: str | None = None
+
+
+# When a job last changed, for older_than. Rows that were never updated fall
+# back to their first history row, i.e. when the job arrived; jobs with no
+# date at all predate state tracking and count as old.
+def is_older_than(cutoff: datetime):
+    first_seen = (
+        select(func.min(JobStateHistory.timestamp))
+        .where(JobStateHistory.job_id == JobCurrentState.job_id)
+        .scalar_subquery()
+    )
+    last_change = func.coalesce(JobCurrentState.updated_at, first_seen)
+    return or_(last_change < cutoff, last_change.is_(None))
+
+
+class BatchStateUpdate(BaseModel):
+    state: JobState
+    ids: list[UUID] | None = Field(None, max_length=MAX_BATCH_SIZE)
+    filter: BatchFilter | None = None
+    notes: str | None = None
+
+
+@router.post("/state:batch")
+def update_job_states(payload: BatchStateUpdate):
+    if (payload.ids is None) == (payload.filter is None):
+        raise HTTPException(status_code=400, detail="Give either ids or filter")
+
+    with Session(engine) as session:
+        if payload.filter is not None:
+            f = payload.filter
+            if not (f.state or f.region or f.older_than):
+                raise HTTPException(status_code=400, detail="filter needs state, region or older_than")
+            if f.older_than is not None and f.older_than not in RANGE_MAP:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"older_than must be one of {', '.join(RANGE_MAP)}",
+                )
+            stmt = select(JobCurrentState.job_id).join(Job, Job.id == JobCurrentState.job_id)
+            stmt = apply_board_filters(stmt, state=f.state, region=f.region)
+            if f.older_than:
+                stmt = stmt.where(is_older_than(datetime.utcnow() - RANGE_MAP[f.older_than]))
+            # Same cap as for ids; one row more tells that the filter is too wide.
+            job_ids = list(session.exec(stmt.limit(MAX_BATCH_SIZE + 1)).all())
+            if len(job_ids) > MAX_BATCH_SIZE:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"filter matches more than {MAX_BATCH_SIZE} jobs; narrow it down",
+                )
+        else:
+            job_ids = list(dict.fromkeys(payload.ids))
+
+        previous = record_states(session, job_ids, payload.state, notes=payload.notes)
         session.commit()
-        session.refresh(history)
 
-        return {"job_id": job_id, "state": history.state, "notes": history.notes}
+    return {
+        "state": payload.state,
+        "updated": len(previous),
+        "results": [
+            {
+                "job_id": job_id,
+                "status": "updated" if job_id in previous else "not_found",
+                "previous_state": previous.get(job_id),
+            }
+            for job_id in job_ids
+        ],
+    }
@@ -1,36 +1,24 @@
-import os
-import json
-import requests
 from fastapi import APIRouter, HTTPException
 from dotenv import load_dotenv
+from core.credits import CreditsService
+from core.database import read_engine
 
 load_dotenv()
 
-THEIRSTACK_KEY = os.getenv("THEIRSTACK_API_KEY")
-
 router = APIRouter(tags=["status"])
 
+credits_service = CreditsService(snapshot_bind=read_engine)
+
 
 @router.get("/status/credits")
-def fetch_credits():
+async def fetch_credits():
     try:
-        return {"remaining_credits": get_credits()}
+        credits = await credits_service.get()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-
-def get_credits() -> int:
-    url = "https://api.theirstack.com/v0/billing/credit-balance"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {THEIRSTACK_KEY}"
-        }
-    response = requests.get(url, headers=headers)
-    print(response)
-    if not response.ok:
-        raise RuntimeError(
-            f"Credits fetch failed: {response.status_code} {response.text}"
-        )
-    payload = response.json()
-    remaining = payload.get("api_credits", 0) - payload.get("used_api_credits", 0)
-    return max(remaining, 0)
+    return {
+        "remaining_credits": credits.remaining,
+        "fetched_at": credits.fetched_at,
+        "age_seconds": round(credits.age_seconds, 1),
+    }
@@ -0,0 +1,67 @@
+import codecs
+import tempfile
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlmodel import Session
+from api.streaming import NDJSON_MEDIA_TYPE, chunked, compressed, negotiate_encoding
+from core.database import engine, read_engine
+from core.transfer import csv_export, import_records, iter_export_records, ndjson_export, read_csv, read_ndjson
+
+router = APIRouter(tags=["Transfer"])
+
+# Uploads are spooled to disk past this size.
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+# Stream the whole board, jobs with their full history, as NDJSON or CSV.
+@router.get("/export")
+def export_board(request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    def records():
+        with Session(read_engine) as session:
+            yield from iter_export_records(session)
+
+    encode = csv_export if format == "csv" else ndjson_export
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    filename = f"duunikanban-{datetime.utcnow():%Y%m%d}.{format}"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Vary": "Accept-Encoding",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    return StreamingResponse(
+        compressed(chunked(encode(records())), encoding),
+        media_type="text/csv" if format == "csv" else NDJSON_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+# Load an export produced by GET /export. Jobs whose id or external id already
+# exists are skipped. The body is spooled to a temporary file and imported in
+# chunked transactions, so memory use doesn't depend on the upload size.
+@router.post("/import")
+async def import_board(request: Request, format: str | None = Query(None, pattern="^(ndjson|csv)$")):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if content_type.startswith("text/csv") else "ndjson"
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+
+        def load():
+            if format == "csv":
+                text = codecs.getreader("utf-8")(spool)
+                return import_records(read_csv(text), bind=engine)
+            return import_records(read_ndjson(spool), bind=engine)
+
+        try:
+            result = await run_in_threadpool(load)
+        except (ValueError, KeyError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid import: {e}")
+
+    return {"inserted": result.inserted, "skipped": result.skipped}
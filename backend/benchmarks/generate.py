@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# Build a synthetic duunikanban SQLite database for benchmarking.
+#
+#   python -m benchmarks.generate --jobs 100000 --out /tmp/bench-100k.db
+import argparse
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import insert
+from sqlmodel import Session
+from core.database import create_db_engine, init_db
+from core.descriptions import description_hash, store_descriptions
+from core.job_state import backfill_current_state
+from core.search import bulk_fts_insert
+from models.schema import Job, JobRegion, JobState, JobStateHistory
+
+CHUNK_SIZE = 5000
+
+WORDS = (
+    "kubernetes linux devops platform cloud terraform ansible monitoring "
+    "observability cassandra postgres on-call automation pipelines python go "
+    "reliability incident networking security containers helm aws azure gcp"
+).split()
+TITLES = [
+    "DevOps Engineer",
+    "Site Reliability Engineer",
+    "Platform Engineer",
+    "Infrastructure Engineer",
+    "Linux System Administrator",
+    "Cloud Engineer",
+    "Database Administrator",
+]
+COMPANIES = [f"Company {n}" for n in range(2000)]
+COUNTRIES = ["Finland", "Sweden", "Germany", "Netherlands", "Poland", "Estonia"]
+# Typical card life cycles: most jobs never leave the inbox.
+LIFECYCLES = [
+    ([JobState.NEW], 60),
+    ([JobState.NEW, JobState.TRASH], 20),
+    ([JobState.NEW, JobState.SAVED], 8),
+    ([JobState.NEW, JobState.SAVED, JobState.APPLIED], 6),
+    ([JobState.NEW, JobState.APPLIED, JobState.INTERVIEW, JobState.REJECTED], 4),
+    ([JobState.NEW, JobState.SAVED, JobState.APPLIED, JobState.INTERVIEW, JobState.OFFER], 2),
+]
+
+
+def description(rng: random.Random, length: int) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def job_row(rng: random.Random, n: int, description_length: int) -> dict:
+    region = rng.choice([JobRegion.FI, JobRegion.EMEA])
+    return {
+        "id": uuid4(),
+        "external_id": str(100_000_000 + n),
+        "title": rng.choice(TITLES),
+        "company": rng.choice(COMPANIES),
+        "url": f"https://example.com/jobs/{n}",
+        "description": description(rng, description_length),
+        "country": "Finland" if region == JobRegion.FI else rng.choice(COUNTRIES),
+        "latitude": 60 + rng.random() * 5 if region == JobRegion.FI else None,
+        "longitude": 22 + rng.random() * 6 if region == JobRegion.FI else None,
+        "remote": rng.random() < 0.5,
+        "hybrid": rng.random() < 0.3,
+        "region": region,
+    }
+
+
+def history_rows(rng: random.Random, job_id, now: datetime, notes_edits: int) -> list:
+    states = rng.choices(
+        [states for states, _ in LIFECYCLES], weights=[w for _, w in LIFECYCLES]
+    )[0]
+    ts = now - timedelta(minutes=rng.randint(0, 60 * 24 * 120))
+    rows = []
+    for state in states:
+        rows.append({"id": uuid4(), "job_id": job_id, "state": state.value, "notes": None, "timestamp": ts})
+        ts += timedelta(minutes=rng.randint(1, 60 * 24 * 3))
+
+    # Jobs that got past the inbox collect notes edits too.
+    if len(states) > 2:
+        for i in range(rng.randint(0, notes_edits)):
+            rows.append(
+                {
+                    "id": uuid4(),
+                    "job_id": job_id,
+                    "state": states[-1].value,
+                    "notes": f"notes revision {i}",
+                    "timestamp": ts,
+                }
+            )
+            ts += timedelta(minutes=rng.randint(1, 120))
+    return rows
+
+
+def generate(path: str, jobs: int, description_length: int = 1500, notes_edits: int = 20, seed: int = 1):
+    if os.path.exists(path):
+        os.remove(path)
+
+    rng = random.Random(seed)
+    engine = create_db_engine(f"sqlite:///{path}")
+    init_db(engine)
+    now = datetime.utcnow()
+    start = time.perf_counter()
+
+    with Session(engine) as session:
+        for offset in range(0, jobs, CHUNK_SIZE):
+            chunk = [job_row(rng, n, description_length) for n in range(offset, min(offset + CHUNK_SIZE, jobs))]
+            texts = {}
+            for job in chunk:
+                text = job.pop("description")
+                job["description_hash"] = description_hash(text)
+                texts[job["description_hash"]] = text
+            store_descriptions(session, texts)
+            with bulk_fts_insert(session.connection(), texts):
+                session.exec(insert(Job), params=chunk)
+            history = [row for job in chunk for row in history_rows(rng, job["id"], now, notes_edits)]
+            session.exec(insert(JobStateHistory), params=history)
+            logging.info(f"Inserted {offset + len(chunk)}/{jobs} jobs")
+
+        backfill_current_state(session)
+        session.commit()
+
+    engine.dispose()
+    logging.info(f"Generated {path} in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark database")
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--description-length", type=int, default=1500)
+    parser.add_argument("--notes-edits", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    generate(args.out, args.jobs, args.description_length, args.notes_edits, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# Time the API and ingestion hot paths against a synthetic database.
+#
+#   python -m benchmarks.run --jobs 100000 --save-baseline benchmarks/baseline-100k.json
+#   python -m benchmarks.run --jobs 100000 --compare benchmarks/baseline-100k.json
+#
+# Databases are generated once into benchmarks/.data and copied before each
+# run, so write scenarios never change the cached dataset.
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlmodel import Session, select
+from fastapi.testclient import TestClient
+import api.v1.jobs
+from api.main import app
+from benchmarks.generate import generate
+from core.database import create_db_engine, init_db
+from ingest.writer import save_jobs
+from models.schema import Job, JobRegion
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+
+
+class StatementCounter:
+    def __init__(self, *engines):
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(fn, iterations, counter):
+    fn(0)  # warm-up
+
+    latencies = []
+    before = counter.count
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i + 1)
+        latencies.append((time.perf_counter() - start) * 1000)
+    statements = (counter.count - before) / iterations
+
+    # Peak memory comes from a separate traced run, tracemalloc is too slow
+    # to leave on while timing.
+    tracemalloc.start()
+    fn(iterations + 1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "statements": round(statements, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+@contextmanager
+def patched_engines(writer, reader):
+    saved = api.v1.jobs.engine, api.v1.jobs.read_engine
+    api.v1.jobs.engine, api.v1.jobs.read_engine = writer, reader
+    try:
+        yield
+    finally:
+        api.v1.jobs.engine, api.v1.jobs.read_engine = saved
+
+
+def upsert_records(existing_ids, iteration, size=1000):
+    rng = random.Random(iteration)
+    half = min(size // 2, len(existing_ids))
+    records = [
+        {
+            "id": external_id,
+            "job_title": f"Reposted engineer {iteration}" if i % 2 else "DevOps Engineer",
+            "company": "Company 1",
+            "url": f"https://example.com/jobs/{external_id}",
+            "description": "kubernetes linux " * 80,
+            "country": "Finland",
+        }
+        for i, external_id in enumerate(rng.sample(existing_ids, half))
+    ]
+    records += [
+        {
+            "id": f"bench-{iteration}-{n}",
+            "job_title": "Platform Engineer",
+            "company": "Company 2",
+            "url": f"https://example.com/new/{iteration}/{n}",
+            "description": "terraform ansible " * 80,
+            "country": "Finland",
+        }
+        for n in range(size - half)
+    ]
+    return records
+
+
+def run(db_path, iterations):
+    writer = create_db_engine(f"sqlite:///{db_path}", echo=False)
+    # Bring cached datasets and --db copies up to the current schema.
+    init_db(writer)
+    reader = create_db_engine(f"sqlite:///{db_path}", readonly=True, echo=False)
+    counter = StatementCounter(writer, reader)
+    client = TestClient(app)
+
+    with Session(reader) as session:
+        job_ids = [str(i) for i in session.exec(select(Job.id).limit(1000)).all()]
+        external_ids = session.exec(select(Job.external_id).limit(20_000)).all()
+
+    def get(url, **params):
+        def call(i):
+            r = client.get(url, params=params)
+            assert r.status_code == 200, r.text
+        return call
+
+    def get_job(i):
+        r = client.get(f"/api/v1/jobs/{job_ids[i % len(job_ids)]}")
+        assert r.status_code == 200, r.text
+
+    def write_state(i):
+        state = ["saved", "applied", "interview"][i % 3]
+        r = client.post(f"/api/v1/jobs/{job_ids[i % len(job_ids)]}/state", json={"state": state})
+        assert r.status_code == 200, r.text
+
+    def write_notes(i):
+        r = client.patch(f"/api/v1/jobs/{job_ids[i % len(job_ids)]}/notes", json={"notes": f"note {i}"})
+        assert r.status_code == 200, r.text
+
+    def batch_state(i):
+        start = (i * 200) % max(len(job_ids) - 200, 1)
+        r = client.post(
+            "/api/v1/jobs/state:batch",
+            json={"state": ["trash", "new"][i % 2], "ids": job_ids[start:start + 200]},
+        )
+        assert r.status_code == 200, r.text
+
+    def upsert(i):
+        save_jobs(upsert_records(external_ids, i), JobRegion.FI, bind=writer)
+
+    scenarios = [
+        ("list_jobs", get("/api/v1/jobs"), max(iterations // 10, 3)),
+        ("list_jobs range=12h", get("/api/v1/jobs", range="12h"), max(iterations // 10, 3)),
+        ("list_jobs range=24h", get("/api/v1/jobs", range="24h"), max(iterations // 10, 3)),
+        ("list_jobs range=48h", get("/api/v1/jobs", range="48h"), max(iterations // 10, 3)),
+        ("list_jobs range=7d", get("/api/v1/jobs", range="7d"), max(iterations // 10, 3)),
+        # Every synthetic posting shares one small vocabulary, so these match
+        # most of the board: the worst case for BM25 ranking.
+        ("search q=engineer", get("/api/v1/jobs/search", q="engineer"), iterations),
+        ("search phrase+prefix", get("/api/v1/jobs/search", q='"platform engineer" kube*', state="new"), iterations),
+        ("search selective", get("/api/v1/jobs/search", q='"database administrator"'), iterations),
+        ("get_job", get_job, iterations),
+        ("update_job_state", write_state, iterations),
+        ("update_notes", write_notes, iterations),
+        ("state:batch 200 ids", batch_state, max(iterations // 10, 3)),
+        ("save_jobs 1000 records", upsert, max(iterations // 10, 3)),
+    ]
+
+    results = {}
+    with patched_engines(writer, reader):
+        for name, fn, n in scenarios:
+            logging.info(f"Running {name} x{n}")
+            results[name] = measure(fn, n, counter)
+
+    writer.dispose()
+    reader.dispose()
+    return results
+
+
+# Scenarios whose p95 latency or peak memory grew beyond the tolerance, or
+# that issue more SQL statements than the baseline.
+def regressions(results, baseline, tolerance):
+    found = []
+    for name, base in baseline.get("results", {}).items():
+        current = results.get(name)
+        if current is None:
+            continue
+        for key in ("p95_ms", "peak_kib"):
+            if current[key] > base[key] * (1 + tolerance):
+                found.append(f"{name}: {key} {base[key]} -> {current[key]}")
+        if current["statements"] > base["statements"]:
+            found.append(f"{name}: statements {base['statements']} -> {current['statements']}")
+    return found
+
+
+def print_table(results, baseline=None):
+    base = (baseline or {}).get("results", {})
+    header = f"{'scenario':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'stmts':>8}{'peak KiB':>12}"
+    if base:
+        header += f"{'p95 vs base':>13}"
+    print(header)
+    for name, r in results.items():
+        line = f"{name:<26}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['statements']:>8}{r['peak_kib']:>12}"
+        if name in base and base[name]["p95_ms"]:
+            line += f"{r['p95_ms'] / base[name]['p95_ms']:>12.2f}x"
+        print(line)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Duunikanban benchmarks")
+    parser.add_argument("--jobs", type=int, default=10_000, help="dataset size to generate")
+    parser.add_argument("--db", help="use an existing database instead of generating one")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--save-baseline", help="write results as the new baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    source = args.db
+    if not source:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        source = os.path.join(DATA_DIR, f"bench-{args.jobs}.db")
+        if not os.path.exists(source):
+            generate(source, args.jobs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        shutil.copyfile(source, db_path)
+        results = run(db_path, args.iterations)
+
+    report = {"jobs": args.jobs if not args.db else None, "db": source, "results": results}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if baseline:
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            logging.error(f"Regression: {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
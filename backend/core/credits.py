@@ -0,0 +1,146 @@
+# backend/core/credits.py
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+import httpx
+from anyio import to_thread
+from sqlmodel import Session
+from models.schema import CreditBalance
+
+CREDITS_PATH = "/v0/billing/credit-balance"
+CREDITS_TTL_SECONDS = float(os.getenv("CREDITS_TTL_SECONDS", "300"))
+CREDITS_STALE_SECONDS = float(os.getenv("CREDITS_STALE_SECONDS", "3600"))
+
+
+def remaining_from_payload(payload: dict) -> int:
+    remaining = payload.get("api_credits", 0) - payload.get("used_api_credits", 0)
+    return max(remaining, 0)
+
+
+def save_snapshot(session: Session, remaining: int, fetched_at: Optional[datetime] = None):
+    snapshot = session.get(CreditBalance, 1) or CreditBalance(id=1, remaining=remaining)
+    snapshot.remaining = remaining
+    snapshot.fetched_at = fetched_at or datetime.utcnow()
+    session.add(snapshot)
+
+
+# Called by the ingesters after each run. `client` is a TheirStackClient.
+def refresh_snapshot(client, bind=None) -> Optional[int]:
+    from core.database import engine
+
+    try:
+        remaining = client.remaining_credits()
+    except RuntimeError as e:
+        logging.warning(f"Could not refresh credit balance: {e}")
+        return None
+
+    with Session(bind or engine) as session:
+        save_snapshot(session, remaining)
+        session.commit()
+    logging.info(f"Remaining TheirStack credits: {remaining}")
+    return remaining
+
+
+def load_snapshot(bind) -> Optional[CreditBalance]:
+    with Session(bind) as session:
+        return session.get(CreditBalance, 1)
+
+
+@dataclass
+class Credits:
+    remaining: int
+    fetched_at: datetime
+
+    @property
+    def age_seconds(self) -> float:
+        return (datetime.utcnow() - self.fetched_at).total_seconds()
+
+
+# In-memory credit balance with a TTL and stale-while-revalidate. Concurrent
+# callers share one in-flight upstream request. Snapshots written by the
+# ingesters are picked up before going upstream.
+class CreditsService:
+    def __init__(
+        self,
+        fetch: Optional[Callable[[], Awaitable[int]]] = None,
+        snapshot_bind=None,
+        ttl: float = CREDITS_TTL_SECONDS,
+        stale: float = CREDITS_STALE_SECONDS,
+    ):
+        self.ttl = ttl
+        self.stale = stale
+        self.snapshot_bind = snapshot_bind
+        self._fetch = fetch or self._fetch_upstream
+        self._cached: Optional[Credits] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+
+    def prime(self, remaining: int, fetched_at: Optional[datetime] = None):
+        credits = Credits(remaining, fetched_at or datetime.utcnow())
+        if self._cached is None or credits.fetched_at > self._cached.fetched_at:
+            self._cached = credits
+
+    async def get(self) -> Credits:
+        cached = self._cached
+        if cached and cached.age_seconds < self.ttl:
+            return cached
+
+        if cached and cached.age_seconds < self.stale:
+            # Serve the stale value and refresh in the background.
+            self._refresh()
+            return cached
+
+        return await asyncio.shield(self._refresh())
+
+    def _refresh(self) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        if self._inflight is None or self._inflight.done() or self._inflight.get_loop() is not loop:
+            self._inflight = loop.create_task(self._load())
+            self._inflight.add_done_callback(self._log_failure)
+        return self._inflight
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception():
+            logging.warning(f"Credits refresh failed: {task.exception()}")
+
+    async def _load(self) -> Credits:
+        if self.snapshot_bind is not None:
+            snapshot = await to_thread.run_sync(load_snapshot, self.snapshot_bind)
+            if snapshot:
+                self.prime(snapshot.remaining, snapshot.fetched_at)
+                if self._cached.age_seconds < self.ttl:
+                    return self._cached
+
+        remaining = await self._fetch()
+        self.prime(remaining)
+        return self._cached
+
+    def _http(self) -> httpx.AsyncClient:
+        # The client is bound to the event loop it was created on.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=os.getenv("THEIRSTACK_BASE_URL", "https://api.theirstack.com"),
+                headers={"Authorization": f"Bearer {os.getenv('THEIRSTACK_API_KEY')}"},
+                timeout=10,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _fetch_upstream(self) -> int:
+        response = await self._http().get(CREDITS_PATH)
+        if response.is_error:
+            raise RuntimeError(
+                f"Credits fetch failed: {response.status_code} {response.text}"
+            )
+        return remaining_from_payload(response.json())
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -1,14 +1,107 @@
 # backend/core/database.py
-from sqlmodel import SQLModel, Session, create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, Session, create_engine, select
 import os
+import sqlite3
+from core.descriptions import sql_description_text
+from core.geo import sql_haversine
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./duunikanban.db")
+SQL_ECHO = os.getenv("SQL_ECHO", "0") == "1"
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Per-connection SQLite settings. Negative cache_size is in KiB.
+SQLITE_PRAGMAS = {
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "synchronous": "NORMAL",
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
 
-def init_db():
-    from models.schema import SQLModel  # ensures models are imported
-    SQLModel.metadata.create_all(engine)
+
+def _configure_sqlite(engine, readonly: bool):
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself, see on_begin below.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if not readonly:
+            # WAL lets readers keep going while the writer commits.
+            cursor.execute("PRAGMA journal_mode=WAL")
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if readonly:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def on_begin(conn):
+        # Writers take the write lock up front so busy_timeout applies,
+        # instead of failing with "database is locked" on lock upgrade.
+        conn.exec_driver_sql("BEGIN" if readonly else "BEGIN IMMEDIATE")
+
+
+# Build an engine for DATABASE_URL. For SQLite, readonly=True gives a pooled
+# engine for API reads, otherwise a single-connection engine so all writes
+# in this process are serialized.
+def create_db_engine(
+    url: str = DATABASE_URL,
+    readonly: bool = False,
+    echo: bool = SQL_ECHO,
+    pool_size: int = int(os.getenv("DB_READ_POOL_SIZE", "5")),
+):
+    if not url.startswith("sqlite") or url == "sqlite://" or ":memory:" in url:
+        return create_engine(url, echo=echo)
+
+    if readonly:
+        pool_args = {"pool_size": pool_size, "max_overflow": 0}
+    else:
+        pool_args = {"pool_size": 1, "max_overflow": 0}
+
+    engine = create_engine(
+        url,
+        echo=echo,
+        connect_args={"check_same_thread": False},
+        **pool_args,
+    )
+    _configure_sqlite(engine, readonly)
+    return engine
+
+
+# Writer: mutations and ingestion. Readers: the API's GET routes.
+engine = create_db_engine(DATABASE_URL)
+read_engine = create_db_engine(DATABASE_URL, readonly=True)
+
+
+# SQL helpers available on every SQLite connection.
+@event.listens_for(Engine, "connect")
+def register_sqlite_functions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(
+            "haversine_km", 4, sql_haversine, deterministic=True
+        )
+        dbapi_connection.create_function(
+            "description_text", 1, sql_description_text, deterministic=True
+        )
+
+
+def init_db(bind=None):
+    from models.schema import SQLModel, Job, JobCurrentState  # ensures models are imported
+    from core.job_state import backfill_current_state
+    from core.migrations import run_migrations
+
+    bind = bind or engine
+    SQLModel.metadata.create_all(bind)
+    run_migrations(bind)
+
+    # Databases created before JobCurrentState existed need a one-off backfill.
+    with Session(bind) as session:
+        has_jobs = session.exec(select(Job.id).limit(1)).first() is not None
+        has_state = session.exec(select(JobCurrentState.job_id).limit(1)).first() is not None
+        if has_jobs and not has_state:
+            backfill_current_state(session)
+            session.commit()
 
 def get_session():
     with Session(engine) as session:
@@ -0,0 +1,79 @@
+# backend/core/descriptions.py
+import hashlib
+import zlib
+from typing import Dict
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, select
+from models.schema import Job, JobDescription
+
+# Descriptions are kept out of the job table: each distinct text is stored
+# once in JobDescription, zlib-compressed and keyed by its SHA-256, and jobs
+# only carry the hash. Reposts and jobs found by both the FI and EMEA runs
+# share a row, and card listings and upserts never read description pages.
+# The text is decompressed for the detail view, exports and the search index.
+
+COMPRESSION_LEVEL = 6
+LOOKUP_CHUNK = 500
+
+
+def description_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress(body: bytes) -> str:
+    return zlib.decompress(body).decode("utf-8")
+
+
+# NULL-safe variant registered as the description_text() SQL function.
+def sql_description_text(body):
+    if body is None:
+        return None
+    return decompress(body)
+
+
+# Column expression for the text of a job's description, for queries that
+# select it among other columns. Only evaluated for the rows returned.
+def description_text(hash_column=Job.description_hash):
+    return (
+        select(func.description_text(JobDescription.body))
+        .where(JobDescription.description_hash == hash_column)
+        .scalar_subquery()
+    )
+
+
+# Store the texts, keyed by their hash, that aren't stored yet. Returns the
+# number of new rows.
+def store_descriptions(session: Session, texts: Dict[str, str]) -> int:
+    hashes = list(texts)
+    existing = set()
+    for i in range(0, len(hashes), LOOKUP_CHUNK):
+        chunk = hashes[i:i + LOOKUP_CHUNK]
+        existing.update(
+            session.exec(
+                select(JobDescription.description_hash)
+                .where(JobDescription.description_hash.in_(chunk))
+            ).all()
+        )
+
+    missing = [
+        {"description_hash": h, "body": compress(text)}
+        for h, text in texts.items()
+        if h not in existing
+    ]
+    if missing:
+        session.exec(insert(JobDescription.__table__), params=missing)
+    return len(missing)
+
+
+# Delete descriptions no job refers to any more, e.g. after a job's text was
+# edited upstream. Returns the number of rows deleted.
+def prune_descriptions(session: Session) -> int:
+    used = select(Job.description_hash).where(Job.description_hash.is_not(None))
+    result = session.exec(
+        delete(JobDescription).where(JobDescription.description_hash.not_in(used))
+    )
+    return result.rowcount
@@ -0,0 +1,35 @@
+# backend/core/geo.py
+from math import radians, degrees, sin, cos, sqrt, atan2
+from typing import Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+
+#  This function calculates the distance between two coordinate points
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+# NULL-safe variant registered as the haversine_km() SQL function.
+def sql_haversine(lat1, lon1, lat2, lon2):
+    if None in (lat1, lon1, lat2, lon2):
+        return None
+    return haversine(lat1, lon1, lat2, lon2)
+
+
+# Lat/lon box that contains every point within radius_km of the centre.
+# Longitude bounds are None when the box would wrap around a pole.
+def bounding_box(
+    lat: float, lon: float, radius_km: float
+) -> Tuple[float, float, Optional[float], Optional[float]]:
+    dlat = degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+
+    dlon = degrees(radius_km / (EARTH_RADIUS_KM * cos(radians(lat))))
+    return min_lat, max_lat, lon - dlon, lon + dlon
@@ -0,0 +1,352 @@
+# backend/core/job_state.py
+import os
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+from sqlalchemy import and_, case, delete, exists, func, insert, or_, update
+from sqlmodel import Session, select
+from models.schema import Job, JobCurrentState, JobNote, JobState, JobStateHistory
+
+# Notes saves for the same job closer together than this update the latest
+# revision instead of starting a new one.
+NOTES_COALESCE_SECONDS = int(os.getenv("NOTES_COALESCE_SECONDS", "300"))
+
+
+# Every write to a job's current state stamps it with the next change sequence
+# number, so clients can ask for everything after the last number they saw.
+# Writes are serialized by the single writer connection, which makes MAX()+1
+# safe; the value only grows because current state rows are never deleted
+# (backfill_current_state renumbers above the previous maximum).
+def last_change_seq(session: Session) -> int:
+    return session.exec(select(func.coalesce(func.max(JobCurrentState.change_seq), 0))).one()
+
+
+def next_change_seq():
+    return select(
+        func.coalesce(func.max(JobCurrentState.change_seq), 0) + 1
+    ).scalar_subquery()
+
+
+# Append a history row and update the job's current state in the same session.
+# Every state or notes change should go through here so JobCurrentState never
+# drifts from JobStateHistory. The caller owns the commit.
+def record_state(
+    session: Session,
+    job_id: UUID,
+    state: JobState | str,
+    notes: str | None = None,
+    timestamp: datetime | None = None,
+) -> JobStateHistory:
+    timestamp = timestamp or datetime.utcnow()
+    state = JobState(state)
+
+    history = JobStateHistory(
+        job_id=job_id,
+        user_id=None,
+        state=state,
+        notes=notes,
+        timestamp=timestamp,
+    )
+    session.add(history)
+
+    current = session.get(JobCurrentState, job_id)
+    if current is None:
+        current = JobCurrentState(job_id=job_id, state=state)
+
+    current.state = state
+    current.notes = notes
+    current.updated_at = timestamp
+    current.change_seq = next_change_seq()
+    if state == JobState.APPLIED and current.applied_at is None:
+        current.applied_at = timestamp
+
+    session.add(current)
+    return history
+
+
+# Save a job's notes. Notes live in JobNote revisions rather than in
+# JobStateHistory; a save within `window` seconds of the latest revision
+# overwrites it, so an autosaving editor produces one revision per editing
+# session. The current state row gets the new notes. The caller owns the commit.
+def record_notes(
+    session: Session,
+    job_id: UUID,
+    notes: str,
+    timestamp: datetime | None = None,
+    window: int | None = None,
+) -> JobNote:
+    timestamp = timestamp or datetime.utcnow()
+    window = NOTES_COALESCE_SECONDS if window is None else window
+
+    note = session.exec(
+        select(JobNote)
+        .where(JobNote.job_id == job_id)
+        .order_by(JobNote.updated_at.desc())
+        .limit(1)
+    ).first()
+    if note is None or timestamp - note.updated_at > timedelta(seconds=window):
+        note = JobNote(job_id=job_id, created_at=timestamp)
+    note.notes = notes
+    note.updated_at = timestamp
+    session.add(note)
+
+    current = session.get(JobCurrentState, job_id)
+    if current is None:
+        current = JobCurrentState(job_id=job_id, state=JobState.NEW)
+    current.notes = notes
+    current.updated_at = timestamp
+    current.change_seq = next_change_seq()
+    session.add(current)
+    return note
+
+
+# Bulk variant of record_state for existing jobs: moves every job in job_ids
+# to `state` with one current state lookup, one history insert and one current
+# state update. Notes are kept unless given. Returns each job's previous state;
+# ids without a current state row are left out. The caller owns the commit.
+def record_states(
+    session: Session,
+    job_ids: list[UUID],
+    state: JobState | str,
+    notes: str | None = None,
+    timestamp: datetime | None = None,
+    chunk_size: int = 500,
+) -> dict[UUID, str]:
+    timestamp = timestamp or datetime.utcnow()
+    state = JobState(state)
+
+    current = {}
+    for start in range(0, len(job_ids), chunk_size):
+        chunk = job_ids[start:start + chunk_size]
+        current.update(
+            (row.job_id, row)
+            for row in session.exec(
+                select(
+                    JobCurrentState.job_id,
+                    JobCurrentState.state,
+                    JobCurrentState.notes,
+                    JobCurrentState.applied_at,
+                ).where(JobCurrentState.job_id.in_(chunk))
+            )
+        )
+    if not current:
+        return {}
+
+    seq = last_change_seq(session)
+    history = []
+    updates = []
+    for n, (job_id, row) in enumerate(current.items(), start=1):
+        job_notes = notes if notes is not None else row.notes
+        history.append(
+            {
+                "id": uuid4(),
+                "job_id": job_id,
+                "state": state.value,
+                "notes": job_notes,
+                "timestamp": timestamp,
+            }
+        )
+        values = {
+            "job_id": job_id,
+            "state": state.value,
+            "notes": job_notes,
+            "updated_at": timestamp,
+            "change_seq": seq + n,
+        }
+        if state == JobState.APPLIED and row.applied_at is None:
+            values["applied_at"] = timestamp
+        updates.append(values)
+
+    # render_nulls keeps rows with and without notes in one executemany.
+    session.exec(insert(JobStateHistory).execution_options(render_nulls=True), params=history)
+    session.exec(update(JobCurrentState), params=updates)
+    return {job_id: row.state for job_id, row in current.items()}
+
+
+# Bulk variant of record_state for freshly inserted jobs: one history insert
+# and one current state insert for the whole batch.
+def record_new_jobs(
+    session: Session, job_ids: list[UUID], timestamp: datetime | None = None
+) -> None:
+    if not job_ids:
+        return
+    timestamp = timestamp or datetime.utcnow()
+    seq = last_change_seq(session)
+
+    session.exec(
+        insert(JobStateHistory),
+        params=[
+            {
+                "id": uuid4(),
+                "job_id": job_id,
+                "state": JobState.NEW.value,
+                "notes": None,
+                "timestamp": timestamp,
+            }
+            for job_id in job_ids
+        ],
+    )
+    session.exec(
+        insert(JobCurrentState),
+        params=[
+            {
+                "job_id": job_id,
+                "state": JobState.NEW.value,
+                "notes": None,
+                "updated_at": timestamp,
+                "change_seq": seq + n,
+            }
+            for n, job_id in enumerate(job_ids, start=1)
+        ],
+    )
+
+
+# Put jobs whose details changed (e.g. re-ingested with a new description)
+# back into the change feed without touching their state.
+def touch_jobs(session: Session, job_ids: list[UUID]) -> None:
+    if not job_ids:
+        return
+    seq = last_change_seq(session)
+    session.exec(
+        update(JobCurrentState),
+        params=[
+            {"job_id": job_id, "change_seq": seq + n}
+            for n, job_id in enumerate(job_ids, start=1)
+        ],
+    )
+
+
+# Rebuild JobCurrentState from JobStateHistory with a single INSERT ... SELECT.
+# Jobs without any history get a "new" row with no timestamp.
+def backfill_current_state(session: Session) -> int:
+    ranked = select(
+        JobStateHistory.job_id,
+        JobStateHistory.state,
+        JobStateHistory.notes,
+        JobStateHistory.timestamp,
+        func.row_number()
+        .over(
+            partition_by=JobStateHistory.job_id,
+            order_by=(JobStateHistory.timestamp.desc(), JobStateHistory.id.desc()),
+        )
+        .label("rn"),
+    ).subquery()
+
+    applied = (
+        select(
+            JobStateHistory.job_id,
+            func.min(JobStateHistory.timestamp).label("applied_at"),
+        )
+        .where(JobStateHistory.state == JobState.APPLIED.value)
+        .group_by(JobStateHistory.job_id)
+        .subquery()
+    )
+
+    latest_note = select(
+        JobNote.job_id,
+        JobNote.notes,
+        JobNote.updated_at,
+        func.row_number()
+        .over(partition_by=JobNote.job_id, order_by=JobNote.updated_at.desc())
+        .label("rn"),
+    ).subquery()
+
+    # Notes saved after the last state change win over the notes stored with it.
+    note_is_newer = and_(
+        latest_note.c.job_id.is_not(None),
+        or_(ranked.c.timestamp.is_(None), latest_note.c.updated_at >= ranked.c.timestamp),
+    )
+
+    rows = (
+        select(
+            Job.id,
+            func.coalesce(ranked.c.state, JobState.NEW.value),
+            case(
+                (note_is_newer, latest_note.c.notes),
+                (ranked.c.job_id.is_(None), ""),
+                else_=ranked.c.notes,
+            ),
+            case((note_is_newer, latest_note.c.updated_at), else_=ranked.c.timestamp),
+            applied.c.applied_at,
+        )
+        .outerjoin(ranked, and_(ranked.c.job_id == Job.id, ranked.c.rn == 1))
+        .outerjoin(latest_note, and_(latest_note.c.job_id == Job.id, latest_note.c.rn == 1))
+        .outerjoin(applied, applied.c.job_id == Job.id)
+    )
+
+    seq = last_change_seq(session)
+    rows = rows.add_columns(seq + func.row_number().over(order_by=Job.id))
+
+    session.exec(delete(JobCurrentState))
+    result = session.exec(
+        insert(JobCurrentState).from_select(
+            ["job_id", "state", "notes", "updated_at", "applied_at", "change_seq"], rows
+        )
+    )
+    return result.rowcount
+
+
+# Move notes-only history rows out of JobStateHistory: rows that repeat the
+# previous row's state with different notes, as notes saves used to write.
+# Rows whose notes already have a JobNote revision are state transitions
+# recorded since (e.g. marking a job applied again with a new note) and stay,
+# as do repeats with unchanged notes. Each run of notes-only rows closer
+# together than `window` becomes one JobNote revision holding the last notes
+# of the run. Returns (history rows removed, revisions created).
+def compact_notes(
+    session: Session, window: int | None = None, chunk_size: int = 500
+) -> tuple[int, int]:
+    window = timedelta(seconds=NOTES_COALESCE_SECONDS if window is None else window)
+
+    previous = {
+        "partition_by": JobStateHistory.job_id,
+        "order_by": (JobStateHistory.timestamp, JobStateHistory.id),
+    }
+    ordered = select(
+        JobStateHistory.id,
+        JobStateHistory.job_id,
+        JobStateHistory.state,
+        JobStateHistory.notes,
+        JobStateHistory.timestamp,
+        func.lag(JobStateHistory.state).over(**previous).label("previous_state"),
+        func.lag(JobStateHistory.notes).over(**previous).label("previous_notes"),
+    ).subquery()
+    noted = exists().where(
+        JobNote.job_id == ordered.c.job_id,
+        JobNote.created_at <= ordered.c.timestamp,
+        JobNote.updated_at >= ordered.c.timestamp,
+    )
+
+    rows = session.exec(
+        select(ordered.c.id, ordered.c.job_id, ordered.c.notes, ordered.c.timestamp)
+        .where(
+            ordered.c.state == ordered.c.previous_state,
+            ordered.c.notes.is_distinct_from(ordered.c.previous_notes),
+            ~noted,
+        )
+        .order_by(ordered.c.job_id, ordered.c.timestamp, ordered.c.id)
+    ).all()
+
+    revisions = []
+    for row in rows:
+        last = revisions[-1] if revisions else None
+        if last and last["job_id"] == row.job_id and row.timestamp - last["updated_at"] <= window:
+            last["notes"] = row.notes or ""
+            last["updated_at"] = row.timestamp
+        else:
+            revisions.append(
+                {
+                    "id": uuid4(),
+                    "job_id": row.job_id,
+                    "notes": row.notes or "",
+                    "created_at": row.timestamp,
+                    "updated_at": row.timestamp,
+                }
+            )
+
+    if revisions:
+        session.exec(insert(JobNote), params=revisions)
+    ids = [row.id for row in rows]
+    for start in range(0, len(ids), chunk_size):
+        session.exec(delete(JobStateHistory).where(JobStateHistory.id.in_(ids[start:start + chunk_size])))
+
+    return len(ids), len(revisions)
@@ -0,0 +1,202 @@
+# backend/core/migrations.py
+import logging
+from sqlalchemy import Uuid, inspect, text
+from sqlmodel import SQLModel
+from core.descriptions import compress, description_hash
+from core.search import (
+    FTS_TABLE, create_fts, drop_fts_triggers, fts_exists, rebuild_fts, replace_app_only_triggers,
+)
+
+DESCRIPTION_BATCH = 1000
+
+
+# Small in-place schema upgrades for databases created by older versions.
+# create_all() only adds missing tables, so anything that changes an existing
+# table goes here. Every step must be idempotent.
+def run_migrations(bind):
+    with bind.begin() as conn:
+        for step in MIGRATIONS:
+            step(conn)
+
+
+# Add nullable columns that were introduced after the table was created.
+def add_missing_columns(conn):
+    insp = inspect(conn)
+    for table in SQLModel.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {col["name"] for col in insp.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                raise RuntimeError(
+                    f"Cannot add non-nullable column {table.name}.{column.name}"
+                )
+            logging.info(f"Adding column {table.name}.{column.name}")
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(
+                text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {col_type}')
+            )
+
+
+def create_missing_indexes(conn):
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def unique_external_id(conn):
+    indexes = {ix["name"]: ix for ix in inspect(conn).get_indexes("job")}
+    index = indexes.get("ix_job_external_id")
+    if index and index["unique"]:
+        return
+
+    duplicates = conn.execute(
+        text(
+            "SELECT external_id FROM job WHERE external_id IS NOT NULL "
+            "GROUP BY external_id HAVING COUNT(*) > 1 LIMIT 5"
+        )
+    ).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            f"Cannot add unique index on job.external_id, duplicates found: {duplicates}"
+        )
+
+    logging.info("Upgrading ix_job_external_id to a unique index")
+    conn.execute(text("DROP INDEX IF EXISTS ix_job_external_id"))
+    conn.execute(text("CREATE UNIQUE INDEX ix_job_external_id ON job (external_id)"))
+
+
+# Move descriptions stored inline in job.description into jobdescription and
+# drop the column. The search triggers read the old column, so they are
+# dropped first and job_fts recreates them. The freed pages are only returned
+# to the filesystem by a VACUUM.
+def move_descriptions(conn):
+    columns = {col["name"] for col in inspect(conn).get_columns("job")}
+    if "description" not in columns:
+        return
+
+    drop_fts_triggers(conn)
+    moved = 0
+    last_rowid = 0
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT rowid, description FROM job WHERE rowid > :rowid "
+                "ORDER BY rowid LIMIT :limit"
+            ),
+            {"rowid": last_rowid, "limit": DESCRIPTION_BATCH},
+        ).all()
+        if not rows:
+            break
+        last_rowid = rows[-1].rowid
+
+        hashes = [
+            (row.rowid, description_hash(row.description) if row.description else None)
+            for row in rows
+        ]
+        stored = {h: row.description for (_, h), row in zip(hashes, rows) if h}
+        if stored:
+            conn.execute(
+                text(
+                    "INSERT OR IGNORE INTO jobdescription (description_hash, body) "
+                    "VALUES (:description_hash, :body)"
+                ),
+                [{"description_hash": h, "body": compress(d)} for h, d in stored.items()],
+            )
+        conn.execute(
+            text("UPDATE job SET description_hash = :description_hash WHERE rowid = :rowid"),
+            [{"rowid": rowid, "description_hash": h} for rowid, h in hashes],
+        )
+        moved += sum(1 for _, h in hashes if h)
+
+    conn.execute(text("ALTER TABLE job DROP COLUMN description"))
+    logging.info(f"Moved the descriptions of {moved} jobs to jobdescription")
+
+
+# Create the full-text index and its sync triggers, filling it from existing
+# jobs the first time.
+def job_fts(conn):
+    if fts_exists(conn):
+        if replace_app_only_triggers(conn):
+            logging.info("Replaced the full-text index triggers with plain SQL ones")
+        create_fts(conn)
+        return
+    count = rebuild_fts(conn)
+    logging.info(f"Built full-text index for {count} jobs")
+
+
+# Give current state rows from before the change feed a sequence number,
+# oldest update first.
+def number_change_feed(conn):
+    if not inspect(conn).has_table("jobcurrentstate"):
+        return
+    base = conn.execute(
+        text("SELECT COALESCE(MAX(change_seq), 0) FROM jobcurrentstate")
+    ).scalar_one()
+    result = conn.execute(
+        text(
+            "UPDATE jobcurrentstate SET change_seq = numbered.seq FROM ("
+            "  SELECT job_id, :base + row_number() OVER (ORDER BY updated_at, job_id) AS seq"
+            "  FROM jobcurrentstate WHERE change_seq IS NULL"
+            ") AS numbered WHERE jobcurrentstate.job_id = numbered.job_id"
+        ),
+        {"base": base},
+    )
+    if result.rowcount:
+        logging.info(f"Numbered {result.rowcount} jobs for the change feed")
+
+
+# UUIDs are stored as 32 hex digits. Rows written with the dashed form by hand
+# or by old tools never match a bound UUID parameter, so IN lookups (export,
+# import deduplication, bulk updates) silently skip them. Rewrite them.
+def normalize_uuid_keys(conn):
+    insp = inspect(conn)
+    targets = [
+        (table.name, column.name)
+        for table in SQLModel.metadata.sorted_tables
+        if insp.has_table(table.name)
+        for column in table.columns
+        if isinstance(column.type, Uuid)
+    ]
+    if fts_exists(conn):
+        targets.append((FTS_TABLE, "job_id"))
+
+    for table, column in targets:
+        result = conn.execute(
+            text(
+                f"UPDATE \"{table}\" SET \"{column}\" = replace(\"{column}\", '-', '') "
+                f"WHERE length(\"{column}\") = 36"
+            )
+        )
+        if result.rowcount:
+            logging.info(f"Normalized {result.rowcount} UUIDs in {table}.{column}")
+
+
+# Checkpoints used to resume at a page of the query as first sent; they now
+# resume after their newest stored record. Drop the stored query and keep
+# the page number as a count. Runs before add_missing_columns, which can't
+# add the non-nullable pages column.
+def keyset_checkpoints(conn):
+    insp = inspect(conn)
+    if not insp.has_table("ingestion_checkpoint"):
+        return
+    columns = {col["name"] for col in insp.get_columns("ingestion_checkpoint")}
+    if "sent_query" in columns:
+        logging.info("Dropping column ingestion_checkpoint.sent_query")
+        conn.execute(text('ALTER TABLE "ingestion_checkpoint" DROP COLUMN "sent_query"'))
+    if "next_page" in columns:
+        conn.execute(text('ALTER TABLE "ingestion_checkpoint" RENAME COLUMN "next_page" TO "pages"'))
+
+
+MIGRATIONS = [
+    keyset_checkpoints,
+    add_missing_columns,
+    unique_external_id,
+    create_missing_indexes,
+    move_descriptions,
+    job_fts,
+    number_change_feed,
+    normalize_uuid_keys,
+]
@@ -0,0 +1,128 @@
+# backend/core/query_guard.py
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Set QUERY_GUARD=1 to log per-request statement counts and N+1 warnings.
+QUERY_GUARD = os.getenv("QUERY_GUARD", "0") == "1"
+QUERY_GUARD_REPEATS = int(os.getenv("QUERY_GUARD_REPEATS", "3"))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+# Reduce a statement to its shape: literals and IN-lists of any length
+# collapse, so statements that differ only in parameters compare equal.
+def normalize(statement: str) -> str:
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class RepeatedStatement:
+    statement: str
+    count: int
+
+
+# Per-request SQL totals, filled in by the engine hooks below. `executed`
+# holds the statements themselves, and is only kept when asked for (the
+# query guard); metrics only need the totals.
+class QueryStats:
+    __slots__ = ("statements", "seconds", "started", "executed")
+
+    def __init__(self, keep_statements: bool = False):
+        self.statements = 0
+        self.seconds = 0.0
+        self.started = None
+        self.executed: Optional[List[str]] = [] if keep_statements else None
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Active QueryCounters. They see every statement in the process, whatever
+# context it runs in.
+_counters: List["QueryCounter"] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is not None and stats.started is not None:
+        stats.statements += 1
+        stats.seconds += time.perf_counter() - stats.started
+        stats.started = None
+        if stats.executed is not None:
+            stats.executed.append(statement)
+    for counter in _counters:
+        counter.statements.append(statement)
+
+
+# Statements run at least `threshold` times that differ only in their
+# parameters; the usual sign of a lazy load inside a loop.
+def repeated_statements(statements: List[str], threshold: int = QUERY_GUARD_REPEATS) -> List[RepeatedStatement]:
+    shapes = Counter(normalize(s) for s in statements)
+    return [
+        RepeatedStatement(statement, count)
+        for statement, count in shapes.most_common()
+        if count >= threshold
+    ]
+
+
+# Records every SQL statement executed in the process while active. It
+# doesn't go by context: TestClient runs the app in another thread, so a
+# context variable set in the test would not be seen there. Requests are
+# tracked through current_query_stats instead (see api/metrics.py).
+class QueryCounter:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    def __enter__(self):
+        _counters.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _counters.remove(self)
+
+    def reset(self):
+        self.statements.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = QUERY_GUARD_REPEATS) -> List[RepeatedStatement]:
+        return repeated_statements(self.statements, threshold)
+
+    def check(self, max_statements: Optional[int] = None, max_repeats: int = QUERY_GUARD_REPEATS):
+        problems = []
+        if max_statements is not None and self.count > max_statements:
+            problems.append(f"{self.count} statements, budget is {max_statements}")
+        for repeat in self.repeated(max_repeats):
+            problems.append(f"repeated {repeat.count}x: {repeat.statement}")
+        if problems:
+            listing = "\n".join(f"  {s}" for s in self.statements)
+            raise QueryBudgetExceeded(
+                "; ".join(problems) + f"\nStatements executed:\n{listing}"
+            )
+
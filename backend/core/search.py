@@ -0,0 +1,222 @@
+# backend/core/search.py
+import html
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, func, literal_column, text
+
+# Full-text index over job titles, companies and descriptions. It is a plain
+# FTS5 table whose rowid mirrors job.rowid, kept in sync by triggers on job and,
+# for descriptions, by the writers (see FTS_DDL below). The table
+# lives outside SQLModel.metadata because create_all() can't create virtual
+# tables; core/migrations.py creates it instead.
+FTS_TABLE = "job_fts"
+
+# Relative BM25 weights; job_id is unindexed and gets none.
+TITLE_WEIGHT = 10.0
+COMPANY_WEIGHT = 5.0
+DESCRIPTION_WEIGHT = 1.0
+RANK_FUNCTION = f"bm25(0.0, {TITLE_WEIGHT}, {COMPANY_WEIGHT}, {DESCRIPTION_WEIGHT})"
+
+job_fts = Table(
+    FTS_TABLE,
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("job_id", String),
+    Column("title", String),
+    Column("company", String),
+    Column("description", String),
+    # FTS5 hidden column, scored with RANK_FUNCTION.
+    Column("rank", Float),
+)
+
+# The triggers are plain SQL, so any connection can write to job, the sqlite3
+# CLI included. They keep titles and companies in sync; description text is
+# stored compressed (see core/descriptions.py), so the writers index it
+# themselves: index_descriptions() for single rows, bulk_fts_insert() for bulk
+# loads. Rows written by other tools are searchable by title and company until
+# the next `db_maintenance.py rebuild-fts`.
+FTS_SOURCE = (
+    "SELECT job.rowid, job.id, job.title, job.company, description_text(jobdescription.body) "
+    "FROM job LEFT JOIN jobdescription ON jobdescription.description_hash = job.description_hash"
+)
+FTS_TRIGGERS = ("job_fts_insert", "job_fts_update", "job_fts_delete")
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        job_id UNINDEXED, title, company, description,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_fts_insert AFTER INSERT ON job BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, job_id, title, company)
+        VALUES (new.rowid, new.id, new.title, new.company);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_fts_update AFTER UPDATE OF title, company ON job BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title, company = new.company WHERE rowid = new.rowid;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_fts_delete AFTER DELETE ON job BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid;
+    END""",
+]
+
+# Staging table for bulk_fts_insert(); TEMP, so private to the connection.
+FTS_STAGING_DDL = (
+    "CREATE TEMP TABLE IF NOT EXISTS fts_description "
+    "(description_hash TEXT PRIMARY KEY, description TEXT)"
+)
+
+
+def fts_exists(conn) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first() is not None
+
+
+def drop_fts_triggers(conn):
+    for name in FTS_TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+
+
+# Triggers created before they were plain SQL call description_text(), which
+# only this app's connections have. Replace them.
+def replace_app_only_triggers(conn) -> bool:
+    stale = conn.execute(
+        text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'job' "
+            "AND sql LIKE '%description_text(%'"
+        )
+    ).first()
+    if stale is None:
+        return False
+    drop_fts_triggers(conn)
+    create_fts(conn)
+    return True
+
+
+def create_fts(conn):
+    for ddl in FTS_DDL:
+        conn.execute(text(ddl))
+    # Make the weighted bm25() the table's rank, so ORDER BY rank is handled
+    # inside FTS5: rows come out already sorted and snippets are only built
+    # for the rows that are actually returned.
+    conn.execute(
+        text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', :rank)"),
+        {"rank": RANK_FUNCTION},
+    )
+
+
+# Refill the index from the job table. Needed once for databases created
+# before the index existed, after a VACUUM, which may renumber job rowids, and
+# after jobs were written by other tools. Decompresses descriptions with
+# description_text(), so it has to run on one of this app's connections.
+def rebuild_fts(conn) -> int:
+    create_fts(conn)
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    conn.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, job_id, title, company, description) {FTS_SOURCE}")
+    )
+    conn.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"))
+    return conn.execute(text(f"SELECT COUNT(*) FROM {FTS_TABLE}")).scalar_one()
+
+
+# Index the description text of existing job rows, given as (job id, text)
+# pairs; None clears it. For writers that insert or change a job's
+# description_hash, since the triggers can't read the compressed text.
+def index_descriptions(conn, descriptions: Iterable[Tuple[UUID, Optional[str]]]):
+    params = [{"job_id": job_id.hex, "description": body} for job_id, body in descriptions]
+    if not params:
+        return
+    conn.execute(
+        text(
+            f"UPDATE {FTS_TABLE} SET description = :description "
+            "WHERE rowid = (SELECT rowid FROM job WHERE id = :job_id)"
+        ),
+        params,
+    )
+
+
+# For bulk loads: drops the per-row insert trigger for the duration of the
+# block and indexes the new job rows with a single INSERT ... SELECT, which is
+# several times faster. `descriptions` maps the description hashes of the new
+# rows to their text. Must run inside a transaction, so the trigger is back
+# (or never gone) for every other connection.
+@contextmanager
+def bulk_fts_insert(conn, descriptions: Dict[str, str]):
+    if not fts_exists(conn):
+        yield
+        return
+
+    last_rowid = conn.execute(text("SELECT coalesce(max(rowid), 0) FROM job")).scalar_one()
+    conn.execute(text("DROP TRIGGER IF EXISTS job_fts_insert"))
+    yield
+
+    conn.execute(text(FTS_STAGING_DDL))
+    if descriptions:
+        conn.execute(
+            text("INSERT OR IGNORE INTO temp.fts_description VALUES (:description_hash, :description)"),
+            [{"description_hash": h, "description": body} for h, body in descriptions.items()],
+        )
+    conn.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE} (rowid, job_id, title, company, description) "
+            "SELECT job.rowid, job.id, job.title, job.company, staged.description FROM job "
+            "LEFT JOIN temp.fts_description AS staged ON staged.description_hash = job.description_hash "
+            "WHERE job.rowid > :rowid"
+        ),
+        {"rowid": last_rowid},
+    )
+    conn.execute(text("DELETE FROM temp.fts_description"))
+    conn.execute(text(FTS_DDL[1]))
+
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+")
+
+
+# Turn a user query into an FTS5 MATCH expression. "Quoted text" is a phrase
+# and a trailing * makes a prefix query; everything else is reduced to plain
+# words, so operators and stray punctuation can't cause syntax errors. All
+# terms must match.
+def build_match_query(q: str) -> str:
+    terms = []
+    for phrase, word in _QUERY_TOKEN.findall(q):
+        if phrase:
+            words = _WORD.findall(phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+            continue
+
+        prefix = word.endswith("*")
+        for part in _WORD.findall(word):
+            terms.append(f'"{part}"')
+        if prefix and terms and _WORD.findall(word):
+            terms[-1] += "*"
+    return " ".join(terms)
+
+
+def match(query: str):
+    return literal_column(FTS_TABLE).op("MATCH")(query)
+
+
+# highlight() and snippet() mark matches with these private-use characters
+# rather than tags: the text around them comes from job postings, so
+# mark_up() escapes it before turning the markers into <mark> tags.
+MATCH_START = "\ue000"
+MATCH_END = "\ue001"
+
+
+def highlight(column: int):
+    return func.highlight(literal_column(FTS_TABLE), column, MATCH_START, MATCH_END)
+
+
+def snippet(column: int, tokens: int = 16):
+    return func.snippet(literal_column(FTS_TABLE), column, MATCH_START, MATCH_END, "…", tokens)
+
+
+def mark_up(marked: Optional[str]) -> Optional[str]:
+    if marked is None:
+        return None
+    return html.escape(marked).replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
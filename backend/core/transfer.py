@@ -0,0 +1,380 @@
+# backend/core/transfer.py
+import csv
+import io
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Iterable, Iterator, List, Optional
+from uuid import UUID, uuid4
+import orjson
+from sqlalchemy import Boolean, Enum, Float, Integer, JSON, String, Uuid, func, insert, or_
+from sqlmodel import Session, select
+from sqlmodel.sql.sqltypes import AutoString
+from core.database import engine
+from core.descriptions import description_hash, store_descriptions
+from core.job_state import last_change_seq
+from core.search import bulk_fts_insert
+from ingest.writer import job_values
+from models.schema import Job, JobCurrentState, JobDescription, JobNote, JobRegion, JobState, JobStateHistory
+
+# Board export/import. One record per job: every Job column (with the
+# description as text rather than its hash), its current state, and its full
+# state history and notes revisions. NDJSON carries the
+# record as is; CSV flattens it with history and notes as JSON-encoded cells.
+
+JOB_COLUMNS = {
+    column.name: column for column in Job.__table__.columns if column.name != "description_hash"
+}
+STATE_FIELDS = ("state", "notes", "updated_at", "applied_at")
+NESTED_FIELDS = ("history", "note_revisions")
+CSV_FIELDS = (*JOB_COLUMNS, "description", *STATE_FIELDS, *NESTED_FIELDS)
+
+EXPORT_CHUNK_SIZE = 500
+IMPORT_CHUNK_SIZE = 5000
+
+LEGACY_FILES = {"fi_latest.json": JobRegion.FI, "emea_latest.json": JobRegion.EMEA}
+LEGACY_STATE_FILE = "job_state.json"
+
+
+# Export
+
+# Yield export records in job id order. Jobs are read from a server-side
+# cursor one chunk at a time; history and notes for each chunk are fetched
+# with one IN query each, so memory stays bounded by the chunk size.
+def iter_export_records(session: Session, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+    stmt = (
+        select(
+            *JOB_COLUMNS.values(),
+            func.description_text(JobDescription.body).label("description"),
+            *(getattr(JobCurrentState, name) for name in STATE_FIELDS),
+        )
+        .select_from(Job)
+        .outerjoin(JobDescription, JobDescription.description_hash == Job.description_hash)
+        .outerjoin(JobCurrentState, JobCurrentState.job_id == Job.id)
+        .order_by(Job.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    for chunk in session.exec(stmt).mappings().partitions():
+        job_ids = [row["id"] for row in chunk]
+        history = _grouped(
+            session,
+            select(JobStateHistory.job_id, JobStateHistory.state, JobStateHistory.notes, JobStateHistory.timestamp)
+            .where(JobStateHistory.job_id.in_(job_ids))
+            .order_by(JobStateHistory.job_id, JobStateHistory.timestamp),
+        )
+        notes = _grouped(
+            session,
+            select(JobNote.job_id, JobNote.notes, JobNote.created_at, JobNote.updated_at)
+            .where(JobNote.job_id.in_(job_ids))
+            .order_by(JobNote.job_id, JobNote.created_at),
+        )
+
+        for row in chunk:
+            record = dict(row)
+            record["region"] = row["region"].value if row["region"] else None
+            record["history"] = history.get(row["id"], [])
+            record["note_revisions"] = notes.get(row["id"], [])
+            yield record
+
+
+def _grouped(session: Session, stmt) -> dict:
+    grouped = {}
+    for row in session.exec(stmt).mappings():
+        item = dict(row)
+        grouped.setdefault(item.pop("job_id"), []).append(item)
+    return grouped
+
+
+def ndjson_export(records: Iterable[dict]) -> Iterator[bytes]:
+    for record in records:
+        yield orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def csv_export(records: Iterable[dict]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(CSV_FIELDS)
+    for record in records:
+        writer.writerow([_csv_cell(record.get(name)) for name in CSV_FIELDS])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+# Import
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    skipped: int = 0
+
+    def __iadd__(self, other: "ImportResult") -> "ImportResult":
+        self.inserted += other.inserted
+        self.skipped += other.skipped
+        return self
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(value)
+    # Timestamps are stored as naive UTC.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_region(value) -> JobRegion:
+    if not value:
+        return JobRegion.UNSPECIFIED
+    try:
+        return JobRegion(value)
+    except ValueError:
+        return JobRegion[value]
+
+
+def _parse_bool(value) -> bool:
+    return value if isinstance(value, bool) else value.lower() in ("true", "1")
+
+
+def _parse_json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _parse_uuid(value) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+# Converter for a Job column's values as they come from NDJSON (native types)
+# or CSV (strings). None means the value is used as is.
+def _converter(column):
+    kind = column.type
+    if isinstance(kind, Enum):
+        return _parse_region
+    for types, convert in (
+        ((String, AutoString), None),
+        ((Uuid,), _parse_uuid),
+        ((Float,), float),
+        ((Integer,), int),
+        ((Boolean,), _parse_bool),
+        ((JSON,), _parse_json),
+    ):
+        if isinstance(kind, types):
+            return convert
+    return None
+
+
+JOB_CONVERTERS = {name: _converter(column) for name, column in JOB_COLUMNS.items()}
+
+
+def _job_row(record: dict) -> dict:
+    row = {}
+    for name, convert in JOB_CONVERTERS.items():
+        value = record.get(name)
+        if convert is not None and value is not None:
+            value = None if value == "" else convert(value)
+        row[name] = value
+    return row
+
+
+def read_ndjson(stream: IO[bytes]) -> Iterator[dict]:
+    for line in stream:
+        if line.strip():
+            yield orjson.loads(line)
+
+
+def read_csv(stream: IO[str]) -> Iterator[dict]:
+    for row in csv.DictReader(stream):
+        record = {name: value for name, value in row.items() if value != ""}
+        for name in NESTED_FIELDS:
+            if name in record:
+                record[name] = json.loads(record[name])
+        yield record
+
+
+# Records from the JSON files the API used before the database: the raw
+# TheirStack responses in fi_latest.json/emea_latest.json, with state and
+# notes from job_state.json keyed by TheirStack id.
+def read_legacy(directory: str) -> Iterator[dict]:
+    saved = {}
+    state_path = os.path.join(directory, LEGACY_STATE_FILE)
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            saved = json.load(f)
+
+    for fname, region in LEGACY_FILES.items():
+        path = os.path.join(directory, fname)
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            raw = json.load(f)
+
+        for item in raw.get("data", []):
+            stored = saved.get(str(item.get("id")), {})
+            yield {
+                **job_values(item),
+                "external_id": str(item["id"]),
+                "remote": item.get("remote"),
+                "hybrid": item.get("hybrid"),
+                "region": region.value,
+                "state": stored.get("state", JobState.NEW.value),
+                "notes": stored.get("notes", ""),
+                "updated_at": stored.get("updated_at"),
+            }
+
+
+# Split one record into the rows it becomes: the job, its history, its notes
+# revisions and its current state (without change_seq).
+def _record_rows(record: dict, now: datetime):
+    job = _job_row(record)
+    job["id"] = job["id"] or uuid4()
+    job["region"] = job["region"] or JobRegion.UNSPECIFIED
+    job["title"] = job["title"] or ""
+    job["company"] = job["company"] or ""
+    job["url"] = job["url"] or ""
+    # Replaced by its hash once the chunk's descriptions are stored.
+    job["description"] = record.get("description") or None
+
+    updated_at = _parse_datetime(record.get("updated_at"))
+    history = [
+        {
+            "id": uuid4(),
+            "job_id": job["id"],
+            "state": JobState(item.get("state") or JobState.NEW).value,
+            "notes": item.get("notes"),
+            "timestamp": _parse_datetime(item.get("timestamp")) or now,
+        }
+        for item in record.get("history") or []
+    ]
+    # Minimal records (e.g. legacy data) get a history row for their state.
+    if "history" not in record:
+        history.append(
+            {
+                "id": uuid4(),
+                "job_id": job["id"],
+                "state": JobState(record.get("state") or JobState.NEW).value,
+                "notes": record.get("notes"),
+                "timestamp": updated_at or now,
+            }
+        )
+    history.sort(key=lambda item: item["timestamp"])
+
+    notes = [
+        {
+            "id": uuid4(),
+            "job_id": job["id"],
+            "notes": item.get("notes") or "",
+            "created_at": _parse_datetime(item.get("created_at")) or now,
+            "updated_at": _parse_datetime(item.get("updated_at")) or now,
+        }
+        for item in record.get("note_revisions") or []
+    ]
+
+    last = history[-1] if history else {"state": JobState.NEW.value, "notes": "", "timestamp": None}
+    applied = [item["timestamp"] for item in history if item["state"] == JobState.APPLIED.value]
+    current = {
+        "job_id": job["id"],
+        "state": JobState(record.get("state") or last["state"]).value,
+        "notes": record["notes"] if "notes" in record else last["notes"],
+        "updated_at": updated_at or last["timestamp"],
+        "applied_at": _parse_datetime(record.get("applied_at")) or (min(applied) if applied else None),
+    }
+    return job, history, notes, current
+
+
+# Insert one chunk of records, skipping jobs whose id or external_id already
+# exists (in the database or earlier in the chunk).
+def _import_chunk(session: Session, records: List[dict]) -> ImportResult:
+    now = datetime.utcnow()
+    rows = [_record_rows(record, now) for record in records]
+
+    ids = [job["id"] for job, *_ in rows]
+    external_ids = [job["external_id"] for job, *_ in rows if job["external_id"]]
+    existing = session.exec(
+        select(Job.id, Job.external_id).where(
+            or_(Job.id.in_(ids), Job.external_id.in_(external_ids))
+        )
+    ).all()
+    seen_ids = {row.id for row in existing}
+    seen_external = {row.external_id for row in existing if row.external_id}
+
+    jobs, history, notes, current = [], [], [], []
+    texts = {}
+    for job, job_history, job_notes, job_current in rows:
+        if job["id"] in seen_ids or (job["external_id"] and job["external_id"] in seen_external):
+            continue
+        seen_ids.add(job["id"])
+        if job["external_id"]:
+            seen_external.add(job["external_id"])
+        text = job.pop("description")
+        job["description_hash"] = description_hash(text) if text else None
+        if text:
+            texts[job["description_hash"]] = text
+        jobs.append(job)
+        history += job_history
+        notes += job_notes
+        current.append(job_current)
+
+    if jobs:
+        store_descriptions(session, texts)
+        seq = last_change_seq(session)
+        for n, row in enumerate(current, start=1):
+            row["change_seq"] = seq + n
+
+        # Core inserts on the tables: plain executemany, no ORM bookkeeping.
+        # The search index is filled once per chunk rather than per row.
+        with bulk_fts_insert(session.connection(), texts):
+            session.exec(insert(Job.__table__), params=jobs)
+        if history:
+            session.exec(insert(JobStateHistory.__table__), params=history)
+        session.exec(insert(JobCurrentState.__table__), params=current)
+        if notes:
+            session.exec(insert(JobNote.__table__), params=notes)
+
+    return ImportResult(inserted=len(jobs), skipped=len(records) - len(jobs))
+
+
+# Load records in chunks, committing after each chunk.
+def import_records(
+    records: Iterable[dict], bind=None, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> ImportResult:
+    result = ImportResult()
+    started = time.perf_counter()
+    batch: List[dict] = []
+
+    with Session(bind or engine) as session:
+        for record in records:
+            batch.append(record)
+            if len(batch) >= chunk_size:
+                result += _import_chunk(session, batch)
+                session.commit()
+                batch = []
+
+        if batch:
+            result += _import_chunk(session, batch)
+            session.commit()
+
+    logging.info(
+        f"Imported {result.inserted} jobs, skipped {result.skipped} duplicates "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return result
@@ -1,11 +1,10 @@
-from sqlmodel import SQLModel
 from models.schema import *  # ensure models are imported
-from core.database import engine
+from core.database import init_db as create_tables
 
 
 def init_db():
     print("Creating tables if they do not exist...")
-    SQLModel.metadata.create_all(engine)
+    create_tables()
     print("DB initialized!")
 
 
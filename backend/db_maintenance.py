@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import os
+import sys
+from sqlmodel import Session
+from core.database import engine, init_db
+from core.descriptions import prune_descriptions
+from core.job_state import backfill_current_state, compact_notes
+from core.search import rebuild_fts
+from core.transfer import csv_export, import_records, iter_export_records, ndjson_export, read_csv, read_legacy, read_ndjson
+from config_loader import load_config
+from ingest.matcher import PhraseMatcher
+from ingest.refilter import trash_dealbreakers
+from models.schema import JobRegion
+
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+
+
+def cmd_backfill_state(args):
+    with Session(engine) as session:
+        count = backfill_current_state(session)
+        session.commit()
+    logging.info(f"Current state rebuilt for {count} jobs.")
+
+
+def cmd_compact_notes(args):
+    with Session(engine) as session:
+        removed, revisions = compact_notes(session, window=args.window)
+        session.commit()
+    logging.info(f"Moved {removed} notes-only history rows into {revisions} notes revisions.")
+
+
+def cmd_rebuild_fts(args):
+    with engine.begin() as conn:
+        count = rebuild_fts(conn)
+    logging.info(f"Full-text index rebuilt for {count} jobs.")
+
+
+def cmd_prune_descriptions(args):
+    with Session(engine) as session:
+        count = prune_descriptions(session)
+        session.commit()
+    logging.info(f"Deleted {count} unused descriptions.")
+
+
+def cmd_export(args):
+    encode = csv_export if args.format == "csv" else ndjson_export
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        with Session(engine) as session:
+            for chunk in encode(iter_export_records(session)):
+                out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+
+def cmd_import(args):
+    if args.legacy:
+        result = import_records(read_legacy(args.path))
+    elif args.format == "csv" or (args.format is None and args.path.endswith(".csv")):
+        with open(args.path, newline="") as f:
+            result = import_records(read_csv(f))
+    else:
+        with open(args.path, "rb") as f:
+            result = import_records(read_ndjson(f))
+    logging.info(f"Imported {result.inserted} jobs, skipped {result.skipped}.")
+
+
+def cmd_refilter(args):
+    config = load_config()
+    matcher = PhraseMatcher(config["emea_filters"]["dealbreakers"])
+    region = JobRegion(args.region) if args.region else None
+
+    with Session(engine) as session:
+        hits = trash_dealbreakers(session, matcher, region=region, dry_run=args.dry_run)
+        session.commit()
+
+    for job_id, matched in hits.items():
+        logging.info(f"{job_id}: {', '.join(matched)}")
+    verb = "Would trash" if args.dry_run else "Trashed"
+    logging.info(f"{verb} {len(hits)} jobs.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Duunikanban database maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-state", help="Rebuild the current state table from job history"
+    )
+    backfill.set_defaults(func=cmd_backfill_state)
+
+    notes = commands.add_parser(
+        "compact-notes", help="Move notes-only history rows into notes revisions"
+    )
+    notes.add_argument(
+        "--window", type=int, help="coalescing window in seconds (default NOTES_COALESCE_SECONDS)"
+    )
+    notes.set_defaults(func=cmd_compact_notes)
+
+    fts = commands.add_parser(
+        "rebuild-fts", help="Rebuild the full-text search index (also needed after VACUUM)"
+    )
+    fts.set_defaults(func=cmd_rebuild_fts)
+
+    prune = commands.add_parser(
+        "prune-descriptions", help="Delete stored descriptions no job refers to"
+    )
+    prune.set_defaults(func=cmd_prune_descriptions)
+
+    export = commands.add_parser("export", help="Export all jobs with their history")
+    export.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    export.add_argument("--output", help="file to write (default stdout)")
+    export.set_defaults(func=cmd_export)
+
+    load = commands.add_parser(
+        "import", help="Import an export file, or with --legacy the old jaysons/ directory"
+    )
+    load.add_argument("path")
+    load.add_argument("--format", choices=["ndjson", "csv"])
+    load.add_argument(
+        "--legacy", action="store_true",
+        help="path is a directory with fi_latest.json, emea_latest.json and job_state.json",
+    )
+    load.set_defaults(func=cmd_import)
+
+    refilter = commands.add_parser(
+        "refilter", help="Trash inbox jobs that match the configured dealbreakers"
+    )
+    refilter.add_argument("--region", choices=[r.value for r in JobRegion])
+    refilter.add_argument("--dry-run", action="store_true")
+    refilter.set_defaults(func=cmd_refilter)
+
+    args = parser.parse_args()
+    init_db()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# backend/ingest/archive.py
+import glob
+import gzip
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+import orjson
+from mytypes import JobRecord
+
+# Every ingestion run appends the raw TheirStack records it fetched, before
+# any filtering, to ARCHIVE_DIR/<region>-<UTC start time>.jsonl.gz. Fields we
+# start storing later can be backfilled from these files instead of spending
+# API credits on a refetch.
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/archive")
+ARCHIVE_SUFFIX = ".jsonl.gz"
+
+
+# Gzip JSON lines writer for one run. Records go to a .part file that is
+# renamed on close, so a file without the suffix is never half-written. A
+# failed run still keeps what it fetched: those credits are spent.
+class RunArchive:
+    def __init__(
+        self,
+        region: str,
+        directory: str = ARCHIVE_DIR,
+        started_at: Optional[datetime] = None,
+    ):
+        started_at = started_at or datetime.utcnow()
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{region}-{started_at:%Y%m%dT%H%M%SZ}{ARCHIVE_SUFFIX}")
+        self.count = 0
+        self._part = self.path + ".part"
+        self._file = gzip.open(self._part, "wb")
+
+    def write(self, records: Iterable[JobRecord]):
+        for record in records:
+            self._file.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+            self.count += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        os.replace(self._part, self.path)
+        logging.info(f"Archived {self.count} raw records to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Archive files, oldest first, optionally for one region only.
+def archive_paths(directory: str = ARCHIVE_DIR, region: Optional[str] = None) -> List[str]:
+    pattern = f"{region or '*'}-*{ARCHIVE_SUFFIX}"
+    # The timestamp sorts chronologically within a region; sort on it so
+    # regions interleave in run order too.
+    paths = glob.glob(os.path.join(directory, pattern))
+    return sorted(paths, key=lambda path: os.path.basename(path).split("-", 1)[1])
+
+
+def read_archive(path: str) -> Iterator[JobRecord]:
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield orjson.loads(line)
@@ -0,0 +1,199 @@
+# backend/ingest/checkpoints.py
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import or_, update
+from sqlmodel import Session, select
+from core.database import engine
+from ingest.cursors import (
+    ORDER_BY_DISCOVERED, advance_cursor, discovered_at, incremental_query, newest_record, query_hash,
+)
+from ingest.writer import UpsertResult
+from models.schema import FetchCursor, IngestionCheckpoint, IngestionRun, RunStatus
+from mytypes import JobRecord
+
+# Resumable runs. Every live run is a row in ingestion_run with a checkpoint
+# per saved query, which the pipeline commits in the same transaction as
+# each batch it upserts, so stored jobs and checkpoints always agree. The
+# next run picks up the latest run that didn't complete.
+#
+# A query resumes by keyset, not by page: it is sent again as an incremental
+# query (see ingest/cursors.py) from its newest stored record, with the
+# posted_at window worked out afresh, starting at page 0. Results shift as
+# new postings arrive and old ones age out, so page numbers from an earlier
+# attempt don't line up; the watermark does. A query that completed in the
+# resumed run is fetched again from its cursor, so it still gets the
+# postings that arrived since. A query's fetch cursor only moves once its
+# checkpoint is complete.
+#
+# The running process keeps the run's heartbeat fresh with every batch it
+# commits. A run marked running with a recent heartbeat belongs to another
+# invocation and is left alone.
+
+STALE_AFTER = timedelta(minutes=30)
+
+
+# The latest run if it didn't complete, otherwise a new one. A run that is
+# still running is only taken over once its heartbeat is STALE_AFTER old (its
+# process died); before that, starting fails. The takeover is a conditional
+# UPDATE, so of two invocations only one can claim the run.
+def start_run(bind=None, now: Optional[datetime] = None) -> IngestionRun:
+    now = now or datetime.utcnow()
+    with Session(bind or engine) as session:
+        latest = session.exec(select(IngestionRun).order_by(IngestionRun.id.desc())).first()
+        if latest is None or latest.status == RunStatus.COMPLETED:
+            run = IngestionRun(status=RunStatus.RUNNING, heartbeat_at=now)
+            session.add(run)
+            session.commit()
+            session.refresh(run)
+            return run
+
+        claimed = session.exec(
+            update(IngestionRun)
+            .where(
+                IngestionRun.id == latest.id,
+                or_(
+                    IngestionRun.status != RunStatus.RUNNING,
+                    IngestionRun.heartbeat_at == None,  # noqa: E711
+                    IngestionRun.heartbeat_at < now - STALE_AFTER,
+                ),
+            )
+            .values(status=RunStatus.RUNNING, resumes=IngestionRun.resumes + 1, heartbeat_at=now)
+        ).rowcount
+        session.commit()
+        if not claimed:
+            raise RuntimeError(
+                f"Ingestion run {latest.id} is still running (last heartbeat {latest.heartbeat_at.isoformat()})"
+            )
+        run = session.get(IngestionRun, latest.id)
+        session.refresh(run)
+
+    logging.info(f"Resuming ingestion run {run.id} from {run.started_at.isoformat()}")
+    return run
+
+
+# Completed if every query in the run is, failed otherwise.
+def finish_run(run_id: int, bind=None) -> IngestionRun:
+    with Session(bind or engine) as session:
+        run = session.get(IngestionRun, run_id)
+        pending = session.exec(
+            select(IngestionCheckpoint.query_key)
+            .where(IngestionCheckpoint.run_id == run_id, IngestionCheckpoint.completed == False)  # noqa: E712
+        ).all()
+        run.status = RunStatus.FAILED if pending else RunStatus.COMPLETED
+        run.finished_at = datetime.utcnow()
+        session.add(run)
+        session.commit()
+        session.refresh(run)
+
+    if pending:
+        logging.warning(f"Ingestion run {run.id} did not complete {', '.join(pending)}; the next run resumes it")
+    return run
+
+
+# The checkpoint of `key` in the run, created if there is none. A completed
+# checkpoint is reopened, and one left by an earlier version of the query is
+# started over.
+def load_checkpoint(run_id: int, key: str, query: dict, bind=None) -> IngestionCheckpoint:
+    with Session(bind or engine) as session:
+        checkpoint = session.get(IngestionCheckpoint, (run_id, key))
+        if checkpoint and checkpoint.query_hash == query_hash(query):
+            if checkpoint.completed:
+                logging.info(f"Query {key} completed in run {run_id}, fetching what is new since")
+                checkpoint.completed = False
+                session.add(checkpoint)
+                session.commit()
+                session.refresh(checkpoint)
+            elif checkpoint.newest_discovered_at is not None:
+                logging.info(
+                    f"Query {key} resumes after {checkpoint.newest_discovered_at.isoformat()} "
+                    f"({checkpoint.newest_external_id})"
+                )
+            return checkpoint
+
+        if checkpoint:
+            logging.info(f"Query {key} changed since run {run_id} started, starting it over")
+            session.delete(checkpoint)
+            session.flush()
+        checkpoint = IngestionCheckpoint(run_id=run_id, query_key=key, query_hash=query_hash(query))
+        session.add(checkpoint)
+        session.commit()
+        session.refresh(checkpoint)
+    return checkpoint
+
+
+def _newest_stored(checkpoint: IngestionCheckpoint) -> Optional[JobRecord]:
+    if checkpoint.newest_discovered_at is None:
+        return None
+    return {"id": checkpoint.newest_external_id, "discovered_at": checkpoint.newest_discovered_at.isoformat()}
+
+
+# Where the query picks up: after the newest record stored in this run or
+# the fetch cursor, whichever is further along.
+def resume_position(checkpoint: IngestionCheckpoint, cursor: Optional[FetchCursor]) -> Optional[FetchCursor]:
+    stored = _newest_stored(checkpoint)
+    if stored is None:
+        return cursor
+    if cursor is not None:
+        position = {"id": cursor.external_id, "discovered_at": cursor.discovered_at.isoformat()}
+        if newest_record([stored, position]) is not stored:
+            return cursor
+    return FetchCursor(
+        query_key=checkpoint.query_key,
+        query_hash=checkpoint.query_hash,
+        discovered_at=checkpoint.newest_discovered_at,
+        external_id=checkpoint.newest_external_id,
+    )
+
+
+# The query to send from `position`, oldest first even without one: a run
+# that fails part way must have stored everything before its newest record.
+def resume_query(query: dict, position: Optional[FetchCursor], now: Optional[datetime] = None) -> dict:
+    return {**incremental_query(query, position, now), "order_by": ORDER_BY_DISCOVERED}
+
+
+# Record that `pages` more pages are stored, and that the run is alive. Call
+# with the session that upserted them, before it commits.
+def save_progress(
+    session: Session,
+    checkpoint: IngestionCheckpoint,
+    pages: int,
+    newest: Optional[JobRecord],
+    fetched: int,
+    kept: int,
+    result: UpsertResult,
+):
+    row = session.get(IngestionCheckpoint, (checkpoint.run_id, checkpoint.query_key))
+    newest = newest_record([_newest_stored(row), newest])
+    if newest is not None:
+        row.newest_discovered_at = discovered_at(newest)
+        row.newest_external_id = str(newest["id"])
+    row.pages += pages
+    row.fetched += fetched
+    row.kept += kept
+    row.inserted += result.inserted
+    row.updated += result.updated
+    row.updated_at = datetime.utcnow()
+    session.add(row)
+
+    run = session.get(IngestionRun, checkpoint.run_id)
+    run.heartbeat_at = row.updated_at
+    session.add(run)
+
+
+# Move the fetch cursor to the newest stored record and close the checkpoint.
+# Separate sessions: the writer engine has a single connection.
+def complete_checkpoint(checkpoint: IngestionCheckpoint, query: dict, bind=None) -> IngestionCheckpoint:
+    key = (checkpoint.run_id, checkpoint.query_key)
+    with Session(bind or engine) as session:
+        newest = _newest_stored(session.get(IngestionCheckpoint, key))
+    advance_cursor(checkpoint.query_key, query, [newest], bind=bind)
+
+    with Session(bind or engine) as session:
+        row = session.get(IngestionCheckpoint, key)
+        row.completed = True
+        row.updated_at = datetime.utcnow()
+        session.add(row)
+        session.commit()
+        session.refresh(row)
+    return row
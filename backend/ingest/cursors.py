@@ -0,0 +1,141 @@
+# backend/ingest/cursors.py
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+import orjson
+from sqlmodel import Session, select
+from core.database import engine
+from models.schema import FetchCursor, Job
+from mytypes import JobRecord
+
+# Incremental fetching. Each saved query keeps a watermark: the discovered_at
+# and id of the newest record a run has stored. The next run asks TheirStack
+# only for records discovered since then, so credits are spent on new postings
+# only; if runs were missed, the posted_at window is widened to cover the gap.
+#
+# Records come oldest first. Paging ends after the newest record, and a run
+# cut short by max_pages leaves the watermark at the last record it got, so
+# the next run picks up from there without a gap. (Newest first would lose
+# whatever lies between the page limit and the old watermark.) TheirStack
+# orders by discovered_at only, so records sharing the watermark's timestamp
+# come back in any order; of those, only the ones already stored are skipped.
+
+ORDER_BY_DISCOVERED = [{"desc": False, "field": "discovered_at"}]
+
+
+def query_hash(query: dict) -> str:
+    return hashlib.sha256(orjson.dumps(query, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+# discovered_at as naive UTC, or None if missing or unparseable.
+def discovered_at(record: JobRecord) -> Optional[datetime]:
+    value = record.get("discovered_at")
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# Records sort by (discovered_at, id); ids only break ties.
+def _position(when: datetime, external_id) -> Tuple[datetime, int, str]:
+    external_id = str(external_id)
+    return when, int(external_id) if external_id.isdigit() else -1, external_id
+
+
+# The stored watermark for `key`, or None if there is none or it belongs to
+# an earlier version of the query.
+def load_cursor(key: str, query: dict, bind=None) -> Optional[FetchCursor]:
+    with Session(bind or engine) as session:
+        cursor = session.get(FetchCursor, key)
+    if cursor is None:
+        return None
+    if cursor.query_hash != query_hash(query):
+        logging.info(f"Query {key} changed since the last run, fetching its full window")
+        return None
+    return cursor
+
+
+# The query to send: unchanged without a cursor, otherwise restricted to
+# records discovered since the watermark, oldest first.
+def incremental_query(query: dict, cursor: Optional[FetchCursor], now: Optional[datetime] = None) -> dict:
+    if cursor is None:
+        return query
+
+    now = now or datetime.utcnow()
+    incremental = {
+        **query,
+        "discovered_at_gte": cursor.discovered_at.isoformat(),
+        "order_by": ORDER_BY_DISCOVERED,
+    }
+    # Catch up on postings from runs that were missed.
+    if "posted_at_max_age_days" in query:
+        missed_days = (now - cursor.discovered_at).days + 1
+        incremental["posted_at_max_age_days"] = max(query["posted_at_max_age_days"], missed_days)
+    return incremental
+
+
+# Drop the records already fetched: those discovered before the watermark,
+# and those discovered at it that are stored. discovered_at_gte includes the
+# watermark itself, so the first page starts with records already stored.
+def unseen(records: List[JobRecord], cursor: Optional[FetchCursor], bind=None) -> List[JobRecord]:
+    if cursor is None:
+        return records
+
+    tied = [str(record.get("id")) for record in records if discovered_at(record) == cursor.discovered_at]
+    stored = set()
+    if tied:
+        with Session(bind or engine) as session:
+            stored = set(session.exec(select(Job.external_id).where(Job.external_id.in_(tied))).all())
+
+    def seen(record: JobRecord) -> bool:
+        when = discovered_at(record)
+        if when is None:
+            return False
+        return when < cursor.discovered_at or (when == cursor.discovered_at and str(record.get("id")) in stored)
+
+    fresh = [record for record in records if not seen(record)]
+    if len(fresh) < len(records):
+        logging.info(f"Skipped {len(records) - len(fresh)} records already fetched")
+    return fresh
+
+
+# The newest of `records` by (discovered_at, id), or None if none is dated.
+# Lets a streaming run remember one record per page instead of all of them.
+def newest_record(records: Iterable[Optional[JobRecord]]) -> Optional[JobRecord]:
+    newest = newest_position = None
+    for record in records:
+        when = discovered_at(record) if record else None
+        if when is not None and (newest is None or _position(when, record["id"]) > newest_position):
+            newest, newest_position = record, _position(when, record["id"])
+    return newest
+
+
+# Move the watermark to the newest of `records`. Call once they are stored,
+# in the same database, so a failed run is fetched again.
+def advance_cursor(key: str, query: dict, records: Iterable[JobRecord], bind=None) -> Optional[FetchCursor]:
+    record = newest_record(records)
+    if record is None:
+        return None
+    newest = _position(discovered_at(record), record["id"])
+
+    with Session(bind or engine) as session:
+        cursor = session.get(FetchCursor, key)
+        if cursor and cursor.query_hash == query_hash(query):
+            if _position(cursor.discovered_at, cursor.external_id) >= newest:
+                return cursor
+        cursor = cursor or FetchCursor(query_key=key)
+        cursor.query_hash = query_hash(query)
+        cursor.discovered_at, _, cursor.external_id = newest
+        cursor.updated_at = datetime.utcnow()
+        session.add(cursor)
+        session.commit()
+        session.refresh(cursor)
+
+    logging.info(f"Fetch cursor {key} is now at {cursor.discovered_at.isoformat()} ({cursor.external_id})")
+    return cursor
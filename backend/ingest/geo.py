@@ -0,0 +1,48 @@
+# backend/ingest/geo.py
+from typing import List
+import numpy as np
+from core.geo import EARTH_RADIUS_KM, bounding_box
+from mytypes import JobRecord
+
+
+# Same formula over whole arrays of destination points at once.
+def haversine_many(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+# Mark which records lie within radius_km of (lat, lon). Records are first
+# narrowed with the bounding box, then exact distances are computed for the
+# remaining candidates in one vectorized pass and stored on the record as
+# distance_from_home_km.
+def within_radius(
+    records: List[JobRecord], lat: float, lon: float, radius_km: float
+) -> List[bool]:
+    nearby = [False] * len(records)
+
+    located = [
+        i for i, job in enumerate(records)
+        if job.get("latitude") is not None and job.get("longitude") is not None
+    ]
+    if not located:
+        return nearby
+
+    lats = np.array([records[i]["latitude"] for i in located], dtype=float)
+    lons = np.array([records[i]["longitude"] for i in located], dtype=float)
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    mask = (lats >= min_lat) & (lats <= max_lat)
+    if min_lon is not None:
+        mask &= (lons >= min_lon) & (lons <= max_lon)
+
+    candidates = np.flatnonzero(mask)
+    distances = haversine_many(lat, lon, lats[candidates], lons[candidates])
+
+    for idx, distance in zip(candidates, distances):
+        i = located[idx]
+        records[i]["distance_from_home_km"] = round(float(distance), 2)
+        nearby[i] = bool(distance <= radius_km)
+
+    return nearby
@@ -0,0 +1,139 @@
+# backend/ingest/language.py
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+from langdetect import detect, DetectorFactory
+from langdetect.detector_factory import init_factory
+from langdetect.lang_detect_exception import LangDetectException
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+from core.database import engine
+from core.descriptions import description_hash
+from models.schema import DescriptionLanguage
+
+DetectorFactory.seed = 0
+
+LOOKUP_CHUNK = 500
+
+# Workers are started fresh rather than forked: the ingester runs one thread
+# per query, and forking a threaded process can deadlock the child.
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+# Runs in worker processes, so it must stay a picklable module-level function.
+def detect_language(text: str) -> Optional[str]:
+    try:
+        return detect(text)
+    except LangDetectException:
+        return None
+
+
+# Pool initializer: load the language profiles once per worker, not on the
+# first text it gets.
+def load_profiles():
+    DetectorFactory.seed = 0
+    init_factory()
+
+
+# A process pool for detect_languages(), started on first use and shared by
+# every call until closed, so an ingestion run starts its workers and loads
+# their profiles once instead of for every batch.
+class LanguagePool:
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def map(self, texts: List[str], chunksize: int) -> List[Optional[str]]:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(START_METHOD),
+                    initializer=load_profiles,
+                )
+        return list(self._pool.map(detect_language, texts, chunksize=chunksize))
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self) -> "LanguagePool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_cached(session: Session, hashes: List[str]) -> dict:
+    cached = {}
+    for i in range(0, len(hashes), LOOKUP_CHUNK):
+        chunk = hashes[i:i + LOOKUP_CHUNK]
+        rows = session.exec(
+            select(DescriptionLanguage.description_hash, DescriptionLanguage.language)
+            .where(DescriptionLanguage.description_hash.in_(chunk))
+        )
+        cached.update(dict(rows.all()))
+    return cached
+
+
+# Detect the language of every description, consulting the persistent cache
+# first and classifying the misses across a process pool: `pool` if given,
+# otherwise one started for this call. workers=None uses every CPU;
+# workers=1 runs inline.
+def detect_languages(
+    descriptions: List[str],
+    workers: Optional[int] = None,
+    chunksize: int = 16,
+    bind=None,
+    pool: Optional[LanguagePool] = None,
+) -> List[Optional[str]]:
+    start = time.perf_counter()
+    hashes = [description_hash(text) for text in descriptions]
+
+    # The cache is read and written in separate short sessions: the writer
+    # takes the write lock up front, and classifying can take a while.
+    with Session(bind or engine) as session:
+        languages = load_cached(session, list(set(hashes)))
+
+    # Identical descriptions in the same run are only detected once.
+    misses = {h: text for h, text in zip(hashes, descriptions) if h not in languages}
+    if misses:
+        workers = pool.workers if pool else workers or os.cpu_count() or 1
+        texts = list(misses.values())
+        if workers == 1 or len(texts) < chunksize:
+            detected = [detect_language(text) for text in texts]
+        elif pool is not None:
+            detected = pool.map(texts, chunksize)
+        else:
+            with LanguagePool(workers) as own_pool:
+                detected = own_pool.map(texts, chunksize)
+
+        now = datetime.utcnow()
+        rows = [
+            {"description_hash": h, "language": lang, "detected_at": now}
+            for h, lang in zip(misses, detected)
+        ]
+        with Session(bind or engine) as session:
+            session.exec(
+                insert(DescriptionLanguage).on_conflict_do_nothing(),
+                params=rows,
+            )
+            session.commit()
+        languages.update(zip(misses, detected))
+
+    elapsed = time.perf_counter() - start
+    rate = len(descriptions) / elapsed if elapsed else 0
+    logging.info(
+        f"Language detection: {len(descriptions)} descriptions "
+        f"({len(descriptions) - len(misses)} cached, {len(misses)} detected) "
+        f"in {elapsed:.2f}s, {rate:.0f}/s"
+    )
+    return [languages[h] for h in hashes]
@@ -0,0 +1,53 @@
+# backend/ingest/matcher.py
+import re
+from typing import Iterable, List
+
+
+# Finds which of a set of phrases occur in a text with a single compiled
+# regex, so each description is scanned once no matter how many phrases
+# there are. Matching is case-insensitive and on whole words; a trailing "*"
+# turns a phrase into a prefix ("etätyö*" also matches "etätyöpäivä").
+class PhraseMatcher:
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = list(dict.fromkeys(p.strip() for p in phrases if p.strip()))
+        self._exact = {}
+        self._prefixes = []
+
+        alternatives = []
+        # Longest first so the longest phrase starting at a position wins.
+        for phrase in sorted(self.phrases, key=len, reverse=True):
+            if phrase.endswith("*"):
+                stem = phrase[:-1].lower()
+                self._prefixes.append((stem, phrase))
+                alternatives.append(re.escape(stem) + r"\w*")
+            else:
+                self._exact[phrase.lower()] = phrase
+                alternatives.append(re.escape(phrase))
+
+        self._pattern = None
+        if alternatives:
+            # The lookahead makes matches zero-width, so overlapping phrases
+            # starting at different positions are all reported.
+            self._pattern = re.compile(
+                r"(?<!\w)(?=(" + "|".join(alternatives) + r")(?!\w))",
+                re.IGNORECASE,
+            )
+
+    def _phrase_for(self, text: str) -> str:
+        key = text.lower()
+        if key in self._exact:
+            return self._exact[key]
+        for stem, phrase in self._prefixes:
+            if key.startswith(stem):
+                return phrase
+        return text
+
+    # Matched phrases (as configured), in order of first appearance.
+    def find(self, text: str | None) -> List[str]:
+        if not text or self._pattern is None:
+            return []
+        found = dict.fromkeys(self._phrase_for(m.group(1)) for m in self._pattern.finditer(text))
+        return list(found)
+
+    def search(self, text: str | None) -> bool:
+        return bool(text) and self._pattern is not None and self._pattern.search(text) is not None
@@ -0,0 +1,246 @@
+# backend/ingest/pipeline.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, Iterator, List, Optional
+from sqlmodel import Session
+from ingest.archive import RunArchive
+from ingest.checkpoints import (
+    complete_checkpoint, finish_run, load_checkpoint, resume_position, resume_query, save_progress, start_run,
+)
+from ingest.cursors import load_cursor, newest_record, unseen
+from ingest.regions import Source
+from ingest.replay import ingest_target, read_recorded, replay_files
+from ingest.writer import CHUNK_SIZE, UpsertResult, upsert_batch
+from models.schema import JobRegion
+from mytypes import JobRecord
+
+# Streaming ingestion. Every source (a saved query with its filter) runs in
+# its own thread through the same chain of generators:
+#
+#   fetch page -> batch -> filter (geo, language, dealbreakers) -> upsert
+#
+# so a run holds at most one batch per source in memory, a slow query
+# doesn't hold up the others, and each batch is committed as soon as it is
+# filtered, together with the source's checkpoint. All sources share one
+# TheirStack client, and with it one rate limit. The fetch cursor only moves
+# once every batch of a source is stored.
+
+STAGES = ("fetch", "filter", "upsert")
+
+
+# Time spent in each stage, per region. Stages only count their own work, not
+# the time spent waiting for the stage before them.
+class StageTimings:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds: Dict[tuple, float] = defaultdict(float)
+        self.records: Dict[tuple, int] = defaultdict(int)
+
+    def add(self, region: JobRegion, stage: str, seconds: float, records: int):
+        with self._lock:
+            self.seconds[region, stage] += seconds
+            self.records[region, stage] += records
+
+    def log_summary(self, wall_seconds: float):
+        logging.info(f"Stage timings (wall time {wall_seconds:.2f}s):")
+        for region in dict.fromkeys(region for region, _ in self.seconds):
+            for stage in STAGES:
+                if (region, stage) in self.seconds:
+                    label = f"[{region.value.upper()}]"
+                    logging.info(
+                        f"  {label:<6} {stage:<7} "
+                        f"{self.records[region, stage]:>7} records "
+                        f"{self.seconds[region, stage]:>8.2f}s"
+                    )
+
+
+@dataclass
+class SourceRun:
+    source: Source
+    fetched: int = 0
+    kept: int = 0
+    seconds: float = 0.0
+    result: UpsertResult = field(default_factory=UpsertResult)
+
+
+# Records of one or more consecutive pages, and what a checkpoint needs to
+# know about them once they are stored.
+@dataclass
+class Batch:
+    records: List[JobRecord]
+    pages: int
+    # Newest record of the pages as fetched, before any filtering.
+    newest: Optional[JobRecord] = None
+    fetched: int = 0
+
+
+# Pages of a live query, from `position` on. Each page is archived before
+# anything else happens to it, and records at or below the position are
+# dropped.
+def fetch_pages(
+    client, run: SourceRun, position, archive: RunArchive, timings: StageTimings, bind=None
+) -> Iterator[Batch]:
+    pages = client.iter_pages(resume_query(run.source.query, position))
+    while True:
+        start = time.perf_counter()
+        page = next(pages, None)
+        if page is None:
+            return
+        archive.write(page)
+        newest = newest_record(page)
+        page = unseen(page, position, bind)
+        timings.add(run.source.region, "fetch", time.perf_counter() - start, len(page))
+        run.fetched += len(page)
+        yield Batch(page, 1, newest, len(page))
+
+
+# Recorded records of the source's region, read lazily file by file.
+def replay_pages(paths: Optional[List[str]], run: SourceRun, timings: StageTimings, size: int) -> Iterator[Batch]:
+    page: List[JobRecord] = []
+    start = time.perf_counter()
+    for path in replay_files(paths, run.source.region.value):
+        for record in read_recorded(path):
+            page.append(record)
+            if len(page) >= size:
+                timings.add(run.source.region, "fetch", time.perf_counter() - start, len(page))
+                run.fetched += len(page)
+                yield Batch(page, 1, fetched=len(page))
+                page = []
+                start = time.perf_counter()
+    if page:
+        timings.add(run.source.region, "fetch", time.perf_counter() - start, len(page))
+        run.fetched += len(page)
+        yield Batch(page, 1, fetched=len(page))
+
+
+# Join pages into batches of at least `size` records, so filtering and
+# upserting work on batches of similar size whatever the page size. Batches
+# end on a page boundary, so a checkpoint never covers half a page. If
+# fetching fails, the pages already fetched are still passed on before the
+# error: their credits are spent.
+def batches(pages: Iterable[Batch], size: int) -> Iterator[Batch]:
+    batch: Optional[Batch] = None
+    try:
+        for page in pages:
+            if batch is None:
+                batch = page
+            else:
+                batch = Batch(
+                    batch.records + page.records,
+                    batch.pages + page.pages,
+                    newest_record([batch.newest, page.newest]),
+                    batch.fetched + page.fetched,
+                )
+            if len(batch.records) >= size:
+                yield batch
+                batch = None
+    except Exception:
+        if batch is not None:
+            yield batch
+        raise
+    if batch is not None:
+        yield batch
+
+
+# Batches with only the records the source keeps. Empty batches still go
+# through, so the checkpoint moves past their pages.
+def filter_batches(batches: Iterable[Batch], run: SourceRun, bind, timings: StageTimings) -> Iterator[Batch]:
+    for batch in batches:
+        start = time.perf_counter()
+        kept = run.source.filter(batch.records, bind) if batch.records else []
+        timings.add(run.source.region, "filter", time.perf_counter() - start, len(kept))
+        run.kept += len(kept)
+        yield replace(batch, records=kept)
+
+
+# One short transaction per batch, checkpoint included: the writer engine has
+# a single connection, so the sources take turns committing.
+def upsert_batches(batches: Iterable[Batch], run: SourceRun, bind, timings: StageTimings, checkpoint=None):
+    for batch in batches:
+        start = time.perf_counter()
+        with Session(bind) as session:
+            result = upsert_batch(session, batch.records, run.source.region) if batch.records else UpsertResult()
+            if checkpoint is not None:
+                save_progress(
+                    session, checkpoint, batch.pages, batch.newest, batch.fetched, len(batch.records), result
+                )
+            session.commit()
+        run.result += result
+        timings.add(run.source.region, "upsert", time.perf_counter() - start, len(batch.records))
+
+
+def run_source(
+    source: Source,
+    client,
+    bind,
+    timings: StageTimings,
+    run_id: Optional[int] = None,
+    replay: Optional[List[str]] = None,
+    batch_size: int = CHUNK_SIZE,
+) -> SourceRun:
+    run = SourceRun(source)
+    label = f"[{source.region.value.upper()}]"
+    start = time.perf_counter()
+
+    if replay is not None:
+        pages = replay_pages(replay, run, timings, batch_size)
+        upsert_batches(filter_batches(batches(pages, batch_size), run, bind, timings), run, bind, timings)
+    else:
+        cursor = load_cursor(source.query_key, source.query, bind)
+        checkpoint = load_checkpoint(run_id, source.query_key, source.query, bind)
+        with RunArchive(source.region.value) as archive:
+            pages = fetch_pages(client, run, resume_position(checkpoint, cursor), archive, timings, bind)
+            upsert_batches(
+                filter_batches(batches(pages, batch_size), run, bind, timings), run, bind, timings, checkpoint
+            )
+        complete_checkpoint(checkpoint, source.query, bind)
+
+    run.seconds = time.perf_counter() - start
+    logging.info(
+        f"{label} {run.fetched} fetched, {run.kept} kept in {run.seconds:.2f}s "
+        f"— inserted: {run.result.inserted}, updated: {run.result.updated}"
+    )
+    return run
+
+
+# Run every source concurrently and log where the time went. A failing
+# source doesn't stop the others; the first failure is raised once they
+# are done. Live runs are recorded in ingestion_run and resume the previous
+# run if it didn't complete (see ingest/checkpoints.py); replays are not.
+def run_ingest(
+    sources: List[Source],
+    client=None,
+    replay: Optional[List[str]] = None,
+    dry_run: bool = False,
+    bind=None,
+    batch_size: int = CHUNK_SIZE,
+) -> Dict[JobRegion, SourceRun]:
+    start = time.perf_counter()
+    timings = StageTimings()
+    runs: Dict[JobRegion, SourceRun] = {}
+    errors: List[BaseException] = []
+
+    with ingest_target(dry_run, bind) as target:
+        run_id = start_run(target).id if replay is None else None
+        with ThreadPoolExecutor(max_workers=max(len(sources), 1), thread_name_prefix="ingest") as pool:
+            futures = {
+                source.region: pool.submit(run_source, source, client, target, timings, run_id, replay, batch_size)
+                for source in sources
+            }
+            for region, future in futures.items():
+                try:
+                    runs[region] = future.result()
+                except Exception as e:
+                    logging.exception(f"[{region.value.upper()}] ingestion failed: {e}")
+                    errors.append(e)
+        if run_id is not None:
+            finish_run(run_id, target)
+
+    timings.log_summary(time.perf_counter() - start)
+    if errors:
+        raise errors[0]
+    return runs
@@ -0,0 +1,57 @@
+# backend/ingest/refilter.py
+import logging
+from typing import Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import update
+from sqlmodel import Session, select
+from core.descriptions import decompress
+from core.job_state import record_state
+from ingest.matcher import PhraseMatcher
+from models.schema import Job, JobCurrentState, JobDescription, JobRegion, JobState
+
+
+# Re-apply the dealbreaker list to jobs already in the inbox, e.g. after
+# config.json changed. Matching jobs are moved to trash and their matched
+# phrases stored on the job. Returns the hits keyed by job id.
+def trash_dealbreakers(
+    session: Session,
+    matcher: PhraseMatcher,
+    region: Optional[JobRegion] = None,
+    dry_run: bool = False,
+) -> Dict[UUID, List[str]]:
+    stmt = (
+        select(Job.id, JobDescription.description_hash, JobDescription.body, JobCurrentState.notes)
+        .join(JobCurrentState, JobCurrentState.job_id == Job.id)
+        .join(JobDescription, JobDescription.description_hash == Job.description_hash)
+        .where(JobCurrentState.state == JobState.NEW.value)
+    )
+    if region:
+        stmt = stmt.where(Job.region == region)
+
+    hits = {}
+    notes = {}
+    # Jobs sharing a description are matched once.
+    found = {}
+    for job_id, key, body, job_notes in session.exec(stmt.execution_options(yield_per=500)):
+        if key not in found:
+            found[key] = matcher.find(decompress(body))
+        matched = found[key]
+        if matched:
+            hits[job_id] = matched
+            notes[job_id] = job_notes
+
+    if dry_run or not hits:
+        return hits
+
+    for job_id, matched in hits.items():
+        record_state(session, job_id, JobState.TRASH, notes=notes[job_id])
+    session.exec(
+        update(Job),
+        params=[
+            {"id": job_id, "filter_reason": "dealbreaker", "matched_phrases": matched}
+            for job_id, matched in hits.items()
+        ],
+    )
+
+    logging.info(f"Moved {len(hits)} jobs to trash after re-filtering")
+    return hits
@@ -0,0 +1,97 @@
+# backend/ingest/regions.py
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from ingest.geo import within_radius
+from ingest.language import LanguagePool, detect_languages
+from ingest.matcher import PhraseMatcher
+from models.schema import JobRegion
+from mytypes import JobRecord
+
+# The saved TheirStack queries and the local filters applied to their results,
+# built from config.json. Filters take one batch of records and the engine
+# to use (the language cache lives in the database) and return what to keep.
+BatchFilter = Callable[[List[JobRecord], object], List[JobRecord]]
+
+
+@dataclass
+class Source:
+    region: JobRegion
+    # config.json key of the query; also names its fetch cursor.
+    query_key: str
+    query: dict
+    filter: BatchFilter
+
+
+# FI: remote or hybrid jobs anywhere in Finland, onsite jobs near home.
+def fi_filter(config: dict) -> BatchFilter:
+    settings = config["fi_filters"]
+    home_lat = float(settings["home_lat"])
+    home_lon = float(settings["home_lon"])
+    radius_km = float(settings["distance_from_home_km"])
+    remote_keywords = PhraseMatcher(settings["remote_keywords"])
+
+    def keep(jobs: List[JobRecord], bind=None) -> List[JobRecord]:
+        filtered: List[JobRecord] = []
+        nearby = within_radius(jobs, home_lat, home_lon, radius_km)
+
+        for job, is_nearby in zip(jobs, nearby):
+            remote = job.get("remote", False)
+            hybrid = job.get("hybrid", False)
+
+            # Check description for remote/hybrid hints if flags are not set
+            if not remote and not hybrid:
+                matched = remote_keywords.find(job.get("description"))
+                if matched:
+                    job["matched_phrases"] = matched
+                    remote = True
+
+            if remote or hybrid:
+                job["filter_reason"] = "remote_or_hybrid"
+                filtered.append(job)
+            elif is_nearby:
+                job["filter_reason"] = f"onsite_within_{radius_km}km"
+                filtered.append(job)
+        return filtered
+
+    return keep
+
+
+# EMEA: English-language remote jobs without dealbreakers. The API query
+# already excludes dealbreakers, but checking locally keeps config changes
+# effective immediately and tells us which phrase hit. Language detection
+# runs on `language_pool` if given, so batches share its workers.
+def emea_filter(config: dict, language_pool: Optional[LanguagePool] = None) -> BatchFilter:
+    dealbreakers = PhraseMatcher(config["emea_filters"]["dealbreakers"])
+    language_settings = config.get("language_detection", {})
+
+    def keep(jobs: List[JobRecord], bind=None) -> List[JobRecord]:
+        candidates = [job for job in jobs if job.get("description")]
+        languages = detect_languages(
+            [job["description"] for job in candidates], **language_settings, bind=bind, pool=language_pool
+        )
+
+        kept: List[JobRecord] = []
+        for job, lang in zip(candidates, languages):
+            if lang != "en":
+                continue
+            matched = dealbreakers.find(job.get("description"))
+            if matched:
+                logging.debug(f"Dropping {job.get('id')}: dealbreakers {matched}")
+                continue
+            kept.append(job)
+        return kept
+
+    return keep
+
+
+def load_sources(config: dict, language_pool: Optional[LanguagePool] = None) -> List[Source]:
+    emea_query = {
+        **config["emea_query"],
+        "job_country_code_or": config["emea_filters"]["countries"],
+        "job_description_pattern_not": config["emea_filters"]["dealbreakers"],
+    }
+    return [
+        Source(JobRegion.FI, "fi_query", config["fi_query"], fi_filter(config)),
+        Source(JobRegion.EMEA, "emea_query", emea_query, emea_filter(config, language_pool)),
+    ]
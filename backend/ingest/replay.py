@@ -0,0 +1,128 @@
+# backend/ingest/replay.py
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+import orjson
+from sqlmodel import Session, select
+from core.database import create_db_engine, engine, init_db
+from core.job_state import last_change_seq
+from ingest.archive import ARCHIVE_DIR, archive_paths, read_archive
+from models.schema import Job, JobCurrentState
+from mytypes import JobRecord
+
+# Offline runs. --replay feeds archived (see ingest/archive.py) or recorded
+# raw responses through the same filter, language detection and upsert
+# stages as a live run, without calling TheirStack. --dry-run sends every
+# write to a scratch copy of the database and reports what would change.
+
+
+def add_replay_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--replay", nargs="*", metavar="PATH",
+        help="replay raw responses instead of calling TheirStack: archive files, "
+             "JSON/JSONL dumps or directories (default: every archive of this region "
+             f"in {ARCHIVE_DIR})",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="write to a scratch copy of the database and report what would change",
+    )
+
+
+# Records from one recorded response: a run archive (.jsonl.gz), JSON lines,
+# or a JSON list or {"data": [...]} response body, such as debug_fi_jobs.json
+# or the old fi_latest.json.
+def read_recorded(path: str) -> Iterator[JobRecord]:
+    if path.endswith(".gz"):
+        yield from read_archive(path)
+        return
+
+    with open(path, "rb") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
+            return
+        payload = json.load(f)
+    yield from (payload.get("data", []) if isinstance(payload, dict) else payload)
+
+
+# Files to replay for `region`, oldest run first. Directories contribute
+# their archives for that region.
+def replay_files(paths: Optional[List[str]], region: str) -> List[str]:
+    files = []
+    for path in paths or [ARCHIVE_DIR]:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Nothing to replay for {region}: {path} does not exist")
+        if os.path.isdir(path):
+            files += archive_paths(path, region)
+        else:
+            files.append(path)
+    if not files:
+        raise FileNotFoundError(f"Nothing to replay for {region} in {paths or [ARCHIVE_DIR]}")
+    return files
+
+
+# Consistent copy of an SQLite database, WAL included, via the backup API.
+def scratch_copy(bind) -> str:
+    fd, path = tempfile.mkstemp(prefix="duunikanban-dry-run-", suffix=".db")
+    os.close(fd)
+    source, target = sqlite3.connect(bind.url.database), sqlite3.connect(path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    return path
+
+
+def report_changes(bind, since: int, known: set):
+    stmt = (
+        select(Job.external_id, Job.title, Job.company, Job.filter_reason)
+        .join(JobCurrentState, JobCurrentState.job_id == Job.id)
+        .where(JobCurrentState.change_seq > since)
+        .order_by(JobCurrentState.change_seq)
+    )
+    inserted = updated = 0
+    with Session(bind) as session:
+        for external_id, title, company, reason in session.exec(stmt):
+            if external_id in known:
+                updated += 1
+                verb = "update"
+            else:
+                inserted += 1
+                verb = "insert"
+            reason = f" ({reason})" if reason else ""
+            logging.info(f"Would {verb}: {title} — {company}{reason}")
+    logging.info(f"Dry run: would insert {inserted} and update {updated} jobs")
+
+
+# The engine a run writes to. With dry_run, a scratch copy of `bind` that is
+# reported on and deleted when the block exits.
+@contextmanager
+def ingest_target(dry_run: bool, bind=None):
+    bind = bind or engine
+    if not dry_run:
+        yield bind
+        return
+
+    path = scratch_copy(bind)
+    scratch = create_db_engine(f"sqlite:///{path}", echo=False)
+    logging.info(f"Dry run: writing to scratch copy {path}")
+    try:
+        init_db(scratch)
+        with Session(scratch) as session:
+            since = last_change_seq(session)
+            known = set(session.exec(select(Job.external_id)).all())
+        yield scratch
+        report_changes(scratch, since, known)
+    finally:
+        scratch.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
@@ -0,0 +1,153 @@
+# backend/ingest/theirstack.py
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from core.credits import CREDITS_PATH, remaining_from_payload
+from mytypes import JobRecord
+
+DEFAULT_BASE_URL = "https://api.theirstack.com"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# Thread-safe token bucket: `rate` requests per second with bursts of `capacity`.
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class TheirStackClient:
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = DEFAULT_BASE_URL,
+        max_pages: int = 10,
+        concurrency: int = 4,
+        requests_per_second: float = 4,
+        max_retries: int = 5,
+        backoff_seconds: float = 1.0,
+        timeout_seconds: float = 30,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_pages = max_pages
+        self.concurrency = max(concurrency, 1)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout_seconds
+        self.bucket = TokenBucket(requests_per_second)
+
+        # One pooled keep-alive session shared by all worker threads.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {api_key}",
+            }
+        )
+
+    # Build a client from the "theirstack" section of config.json.
+    # THEIRSTACK_BASE_URL overrides the configured base URL.
+    @classmethod
+    def from_config(cls, api_key: Optional[str], settings: Optional[dict] = None) -> "TheirStackClient":
+        settings = dict(settings or {})
+        settings["base_url"] = os.getenv(
+            "THEIRSTACK_BASE_URL", settings.get("base_url", DEFAULT_BASE_URL)
+        )
+        return cls(api_key, **settings)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise RuntimeError(f"TheirStack request failed: {e}") from e
+                delay = self._backoff(attempt)
+                logging.warning(f"TheirStack {path}: {e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                logging.warning(
+                    f"TheirStack {path}: {response.status_code}, retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                continue
+
+            if not response.ok:
+                raise RuntimeError(
+                    f"TheirStack request failed: {response.status_code} {response.text}"
+                )
+            return response
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        delay = self.backoff_seconds * (2 ** attempt)
+        return delay + random.uniform(0, delay / 2)
+
+    def remaining_credits(self) -> int:
+        response = self.request("GET", CREDITS_PATH)
+        return remaining_from_payload(response.json())
+
+    def fetch_page(self, query: dict, page: int) -> List[JobRecord]:
+        response = self.request("POST", "/v1/jobs/search", json={**query, "page": page})
+        return response.json().get("data", [])
+
+    # Yield result pages in order. Pages are requested `concurrency` at a time;
+    # paging stops at the first short page or at `max_pages`.
+    def iter_pages(self, query: dict, start_page: int = 0) -> Iterator[List[JobRecord]]:
+        page_size = query.get("limit", 25)
+        page = start_page
+        stop = start_page + self.max_pages
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while page < stop:
+                wave = range(page, min(page + self.concurrency, stop))
+                results = pool.map(lambda p: self.fetch_page(query, p), wave)
+
+                for records in results:
+                    yield records
+                    if len(records) < page_size:
+                        return
+                page = wave.stop
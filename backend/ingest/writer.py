@@ -0,0 +1,186 @@
+# backend/ingest/writer.py
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List
+from uuid import uuid4
+import orjson
+from sqlalchemy import insert, update
+from sqlmodel import Session, select
+from core.database import engine
+from core.descriptions import description_hash, store_descriptions
+from core.job_state import record_new_jobs, touch_jobs
+from core.search import index_descriptions
+from models.schema import Job, JobRegion
+from mytypes import JobRecord
+
+CHUNK_SIZE = 500
+
+# Job columns refreshed from the API on every run.
+SYNCED_FIELDS = (
+    "title",
+    "company",
+    "url",
+    "description_hash",
+    "country",
+    "latitude",
+    "longitude",
+    "distance_from_home_km",
+    "filter_reason",
+    "matched_phrases",
+)
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+
+    def __iadd__(self, other: "UpsertResult") -> "UpsertResult":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        return self
+
+
+# Hash of the whole record as received (plus the filters' annotations), with
+# keys sorted so it doesn't depend on the API's key order.
+def payload_hash(raw: JobRecord) -> str:
+    return hashlib.sha256(orjson.dumps(raw, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def job_values(raw: JobRecord) -> dict:
+    return {
+        "title": raw["job_title"],
+        "company": raw["company"],
+        "url": raw["url"],
+        "description": raw.get("description", ""),
+        "country": raw.get("country", None),
+        "latitude": raw.get("latitude"),
+        "longitude": raw.get("longitude"),
+        "distance_from_home_km": raw.get("distance_from_home_km"),
+        "filter_reason": raw.get("filter_reason"),
+        "matched_phrases": raw.get("matched_phrases"),
+    }
+
+
+# Upsert one batch of API records in the caller's session without committing.
+# Existing jobs are resolved with a single IN query; new jobs and their initial
+# "new" state are bulk inserted. Records whose payload hash matches the stored
+# one are skipped without looking at their fields.
+def upsert_batch(
+    session: Session, records: List[JobRecord], region: JobRegion
+) -> UpsertResult:
+    result = UpsertResult()
+
+    # Last record wins if the API returns the same id twice.
+    by_external_id = {str(raw["id"]): raw for raw in records}
+    if not by_external_id:
+        return result
+
+    existing = {
+        row.external_id: row
+        for row in session.exec(
+            select(
+                Job.id,
+                Job.external_id,
+                Job.region,
+                Job.payload_hash,
+                *(getattr(Job, field) for field in SYNCED_FIELDS),
+            ).where(Job.external_id.in_(list(by_external_id)))
+        )
+    }
+
+    new_rows = []
+    changed_rows = []
+    # Rows whose record changed only in fields we don't store.
+    rehashed_rows = []
+    # Description texts to store, by hash. Jobs are compared by hash only.
+    texts = {}
+    for external_id, raw in by_external_id.items():
+        digest = payload_hash(raw)
+        row = existing.get(external_id)
+        if row is not None and row.payload_hash == digest and row.region is not None:
+            continue
+
+        values = job_values(raw)
+        text = values.pop("description")
+        values["description_hash"] = description_hash(text) if text else None
+
+        if row is None:
+            new_rows.append(
+                {
+                    "id": uuid4(),
+                    "external_id": external_id,
+                    "region": region,
+                    "payload_hash": digest,
+                    **values,
+                }
+            )
+            if text:
+                texts[values["description_hash"]] = text
+            continue
+
+        # Only update changed fields
+        changes = {
+            field: value for field, value in values.items() if getattr(row, field) != value
+        }
+
+        # Ensure region is set
+        if row.region is None:
+            changes["region"] = region
+
+        if changes:
+            changed_rows.append({"id": row.id, "payload_hash": digest, **changes})
+            if text and "description_hash" in changes:
+                texts[values["description_hash"]] = text
+        else:
+            rehashed_rows.append({"id": row.id, "payload_hash": digest})
+
+    if texts:
+        store_descriptions(session, texts)
+
+    if new_rows:
+        session.exec(insert(Job), params=new_rows)
+        record_new_jobs(session, [row["id"] for row in new_rows], timestamp=datetime.utcnow())
+
+    if changed_rows or rehashed_rows:
+        # ORM bulk UPDATE by primary key, grouped by the set of changed columns.
+        session.exec(update(Job), params=changed_rows + rehashed_rows)
+    if changed_rows:
+        touch_jobs(session, [row["id"] for row in changed_rows])
+
+    # The search index triggers only cover titles and companies.
+    index_descriptions(
+        session.connection(),
+        [(row["id"], texts.get(row["description_hash"])) for row in new_rows if row["description_hash"]]
+        + [(row["id"], texts.get(row["description_hash"])) for row in changed_rows if "description_hash" in row],
+    )
+
+    result.inserted = len(new_rows)
+    result.updated = len(changed_rows)
+    return result
+
+
+# Upsert all records in chunks inside a single transaction.
+def save_jobs(
+    records: Iterable[JobRecord],
+    region: JobRegion,
+    bind=None,
+    chunk_size: int = CHUNK_SIZE,
+) -> UpsertResult:
+    result = UpsertResult()
+    batch: List[JobRecord] = []
+
+    with Session(bind or engine) as session:
+        for raw in records:
+            batch.append(raw)
+            if len(batch) >= chunk_size:
+                result += upsert_batch(session, batch, region)
+                batch = []
+
+        if batch:
+            result += upsert_batch(session, batch, region)
+
+        session.commit()
+
+    return result
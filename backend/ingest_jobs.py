@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import argparse
+import logging
+import os
+from typing import List, Optional
+from dotenv import load_dotenv
+from config_loader import load_config
+from core.credits import refresh_snapshot
+from ingest.language import LanguagePool
+from ingest.pipeline import run_ingest
+from ingest.regions import load_sources
+from ingest.replay import add_replay_arguments
+from ingest.theirstack import TheirStackClient
+from models.schema import JobRegion
+
+
+load_dotenv()
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s [%(levelname)s] %(threadName)s %(message)s",
+)
+
+THEIRSTACK_KEY = os.getenv("THEIRSTACK_API_KEY")
+
+
+# Fetch, filter and store every configured query in one run. See
+# ingest/pipeline.py for how the queries run side by side.
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Fetch jobs from TheirStack for every configured query")
+    parser.add_argument(
+        "--region", action="append", choices=[region.value for region in JobRegion],
+        help="only run the query of this region (repeatable; default: all)",
+    )
+    add_replay_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    # One language detection pool for the whole run, started on first use.
+    language_pool = LanguagePool(config.get("language_detection", {}).get("workers"))
+    sources = [
+        source for source in load_sources(config, language_pool)
+        if not args.region or source.region.value in args.region
+    ]
+
+    with language_pool, TheirStackClient.from_config(THEIRSTACK_KEY, config.get("theirstack")) as client:
+        run_ingest(sources, client=client, replay=args.replay, dry_run=args.dry_run)
+        if args.replay is None:
+            refresh_snapshot(client)
+
+    logging.info("Job sync completed.")
+
+
+if __name__ == "__main__":
+    main()
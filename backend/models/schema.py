@@ -1,4 +1,4 @@
-from sqlmodel import SQLModel, Field, Relationship, Column, String
+from sqlmodel import SQLModel, Field, Relationship, Column, String, Index, JSON
 from typing import Optional, List
 from uuid import uuid4, UUID
 from datetime import datetime
@@ -22,6 +22,12 @@ class JobState(str, Enum):
     TRASH = "trash"
 
 
+class RunStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
 class User(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     email: str
@@ -38,20 +44,33 @@ class JobSource(SQLModel, table=True):
 
 
 class Job(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_job_latitude_longitude", "latitude", "longitude"),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    external_id: Optional[str] = Field(default=None, index=True)
+    external_id: Optional[str] = Field(default=None, index=True, unique=True)
     title: str
     company: str
     url: str
-    description: Optional[str] = None
+    # The description text is stored in JobDescription; see core/descriptions.py.
+    description_hash: Optional[str] = Field(default=None, foreign_key="jobdescription.description_hash")
     country: Optional[str] = None
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    distance_from_home_km: Optional[float] = Field(default=None, index=True)
     remote: Optional[bool] = False
     hybrid: Optional[bool] = False
 
+    # Why the ingestion filters kept this job, see ingest/matcher.py.
+    filter_reason: Optional[str] = None
+    matched_phrases: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
+
     region: JobRegion = Field(default=JobRegion.UNSPECIFIED, index=True)
 
+    # SHA-256 of the API record this row was last synced from; see ingest/writer.py.
+    payload_hash: Optional[str] = None
+
     source_id: Optional[int] = Field(default=None, foreign_key="jobsource.id")
     source: Optional[JobSource] = Relationship()
 
@@ -68,6 +87,8 @@ class CVVersion(SQLModel, table=True):
 
 
 class JobStateHistory(SQLModel, table=True):
+    __table_args__ = (Index("ix_jobstatehistory_job_id_timestamp", "job_id", "timestamp"),)
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
 
     job_id: UUID = Field(foreign_key="job.id")
@@ -81,3 +102,104 @@ class JobStateHistory(SQLModel, table=True):
     job: Job = Relationship(back_populates="history")
     user: User = Relationship(back_populates="job_states")
     cv_version: Optional[CVVersion] = Relationship(back_populates="history")
+
+
+# Latest state of every job, maintained alongside JobStateHistory so the board
+# can be listed without replaying history. See core/job_state.py.
+class JobCurrentState(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_jobcurrentstate_updated_at_job_id", "updated_at", "job_id"),
+        Index("ix_jobcurrentstate_state_updated_at", "state", "updated_at", "job_id"),
+    )
+
+    job_id: UUID = Field(foreign_key="job.id", primary_key=True)
+    state: JobState = Field(sa_column=Column(String, nullable=False))  # stored as text
+    notes: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    applied_at: Optional[datetime] = None
+    # Position in the board change feed; see core/job_state.py.
+    change_seq: Optional[int] = Field(default=None, index=True)
+
+
+# Notes revisions, kept apart from JobStateHistory so editing notes doesn't
+# add state rows. Saves within the coalescing window update the latest
+# revision in place. See core/job_state.py.
+class JobNote(SQLModel, table=True):
+    __table_args__ = (Index("ix_jobnote_job_id_updated_at", "job_id", "updated_at"),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    job_id: UUID = Field(foreign_key="job.id")
+    notes: str = ""
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Job descriptions, zlib-compressed and keyed by the SHA-256 of the text, so
+# jobs with identical descriptions share one row. See core/descriptions.py.
+class JobDescription(SQLModel, table=True):
+    description_hash: str = Field(primary_key=True)
+    body: bytes
+
+
+# Language detection results keyed by the SHA-256 of the description text,
+# so unchanged descriptions are never classified twice. See ingest/language.py.
+class DescriptionLanguage(SQLModel, table=True):
+    description_hash: str = Field(primary_key=True)
+    language: Optional[str] = None
+    detected_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Newest record seen by each saved TheirStack query, so a run only asks for
+# what is new since the last one. See ingest/cursors.py.
+class FetchCursor(SQLModel, table=True):
+    query_key: str = Field(primary_key=True)
+    # Hash of the query the watermark belongs to; editing the query resets it.
+    query_hash: str
+    discovered_at: datetime
+    external_id: str
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# One ingestion run. A run that didn't complete, whether it failed or the
+# process died, is resumed by the next one. See ingest/checkpoints.py.
+class IngestionRun(SQLModel, table=True):
+    __tablename__ = "ingestion_run"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    status: RunStatus = Field(sa_column=Column(String, nullable=False))  # stored as text
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    # Times the run was picked up again after not completing.
+    resumes: int = 0
+    # Last sign of life of the process running it; see ingest/checkpoints.py.
+    heartbeat_at: Optional[datetime] = None
+
+
+# Progress of one saved query within a run, committed together with each
+# upserted batch: records up to the newest one are stored and are not fetched
+# again.
+class IngestionCheckpoint(SQLModel, table=True):
+    __tablename__ = "ingestion_checkpoint"
+
+    run_id: int = Field(foreign_key="ingestion_run.id", primary_key=True)
+    query_key: str = Field(primary_key=True)
+    query_hash: str
+    pages: int = 0
+    # Newest record of the stored pages: a resumed query starts after it, and
+    # the fetch cursor moves here at the end.
+    newest_discovered_at: Optional[datetime] = None
+    newest_external_id: Optional[str] = None
+    fetched: int = 0
+    kept: int = 0
+    inserted: int = 0
+    updated: int = 0
+    completed: bool = False
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Last known TheirStack credit balance. Written by the ingesters after each
+# run so the API can serve it without calling TheirStack. Single row, id=1.
+class CreditBalance(SQLModel, table=True):
+    id: int = Field(default=1, primary_key=True)
+    remaining: int
+    fetched_at: datetime = Field(default_factory=datetime.utcnow)
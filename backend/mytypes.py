@@ -121,3 +121,5 @@ class JobRecord(TypedDict, total=False):
 
     # Custom extensions:
     filter_reason: Optional[str]
+    distance_from_home_km: Optional[float]
+    matched_phrases: List[str]
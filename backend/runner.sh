@@ -3,19 +3,18 @@ set -euo pipefail
 
 DATE=$(date -I)
 
-# TODO recreate mock mode, this is a remnant from json-file era.
-# MOCK=${MOCK:-0}
+# REPLAY=1 replays the archived raw responses (ARCHIVE_DIR) instead of
+# querying TheirStack; DRY_RUN=1 writes to a scratch copy of the database
+# and reports what would change.
+ARGS=()
+if [ "${REPLAY:-0}" = "1" ]; then
+    ARGS+=(--replay)
+fi
+if [ "${DRY_RUN:-0}" = "1" ]; then
+    ARGS+=(--dry-run)
+fi
 
 echo "Running daily job fetch for ${DATE}"
 
-#if [ "$MOCK" = "1" ]; then
-#    echo "Running in MOCK mode: test data instead of querying API..."
-#else
-#    echo "Running in live mode: querying API..."
-#fi
-
-echo "Fetching Finnish jobs..."
-python3 ./fi_jobs.py
-
-echo "Fetching EMEA jobs..."
-python3 ./emea_jobs.py
+# Both regions run side by side in one process.
+python3 ./ingest_jobs.py ${ARGS[@]+"${ARGS[@]}"}
@@ -10,9 +10,11 @@ if ROOT not in sys.path:
 
 import shutil
 import pytest
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel, create_engine, func, select
 from fastapi.testclient import TestClient
 from api.main import app
+from core.database import create_db_engine, init_db
+from core.query_guard import QueryCounter
 
 # Copy test db to tmp db.
 @pytest.fixture(scope="session")
@@ -25,15 +27,68 @@ def test_db_path():
 @pytest.fixture(scope="session")
 def test_engine(test_db_path):
     engine = create_engine(f"sqlite:///{test_db_path}", connect_args={"check_same_thread": False})
+    init_db(engine)
     return engine
 
 @pytest.fixture
 def override_engine(monkeypatch, test_engine):
     import api.v1.jobs
-    monkeypatch.setattr(api.v1.jobs, "engine", test_engine)
+    import api.v1.transfer
+    for module in (api.v1.jobs, api.v1.transfer):
+        monkeypatch.setattr(module, "engine", test_engine)
+        monkeypatch.setattr(module, "read_engine", test_engine)
     return test_engine
 
 
 @pytest.fixture
 def client(override_engine):
     return TestClient(app)
+
+
+# Counts SQL statements while the test runs. Call check() with the endpoint's
+# statement budget; repeated statement shapes (N+1 patterns) always fail.
+@pytest.fixture
+def query_guard():
+    with QueryCounter() as counter:
+        yield counter
+
+
+# An empty, migrated database in a temp file. Parametrize indirectly with
+# "writer" to get the app's single-connection writer engine instead.
+@pytest.fixture
+def empty_engine(request, tmp_path):
+    url = f"sqlite:///{tmp_path / 'empty.db'}"
+    if getattr(request, "param", None) == "writer":
+        engine = create_db_engine(url, echo=False)
+    else:
+        engine = create_engine(url)
+    init_db(engine)
+    yield engine
+    engine.dispose()
+
+
+# Builds TheirStack API records; keyword arguments override or add fields.
+@pytest.fixture
+def make_record():
+    def make(n, **overrides):
+        return {
+            "id": n,
+            "job_title": f"DevOps Engineer {n}",
+            "company": f"Company {n}",
+            "url": f"https://example.com/jobs/{n}",
+            "description": "Kubernetes and Linux",
+            "country": "Finland",
+            "discovered_at": "2026-10-01T00:00:00",
+            **overrides,
+        }
+
+    return make
+
+
+@pytest.fixture
+def count_rows():
+    def count(engine, model):
+        with Session(engine) as session:
+            return session.exec(select(func.count()).select_from(model)).one()
+
+    return count
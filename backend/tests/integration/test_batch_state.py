@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from sqlmodel import Session, delete, func, select
+import api.v1.jobs
+from models.schema import Job, JobCurrentState, JobRegion, JobState, JobStateHistory
+
+
+def _history_count(engine):
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(JobStateHistory)).one()
+
+
+def test_batch_by_ids(client, override_engine, query_guard):
+    jobs = client.get("/api/v1/jobs", params={"limit": 5, "fields": "id,state,notes"}).json()
+    ids = [job["id"] for job in jobs]
+    missing = str(uuid4())
+    before = _history_count(override_engine)
+
+    query_guard.reset()
+    r = client.post(
+        "/api/v1/jobs/state:batch", json={"state": "trash", "ids": ids + [missing, ids[0]]}
+    )
+    assert r.status_code == 200, r.text
+    # One lookup, one change_seq read, one history insert, one state update.
+    query_guard.check(max_statements=4)
+
+    body = r.json()
+    assert body["updated"] == 5
+    results = {row["job_id"]: row for row in body["results"]}
+    assert results[missing] == {"job_id": missing, "status": "not_found", "previous_state": None}
+    for job in jobs:
+        assert results[job["id"]]["status"] == "updated"
+        assert results[job["id"]]["previous_state"] == job["state"]
+
+    assert _history_count(override_engine) == before + 5
+    for job in jobs:
+        detail = client.get(f"/api/v1/jobs/{job['id']}").json()
+        assert detail["state"] == "trash"
+        # Notes are carried over when none are given.
+        assert detail["notes"] == job["notes"]
+
+
+def test_batch_by_filter(client):
+    r = client.post(
+        "/api/v1/jobs/state:batch",
+        json={"state": "trash", "filter": {"state": ["new"], "region": "emea", "older_than": "7d"}},
+    )
+    assert r.status_code == 200, r.text
+    moved = r.json()["results"]
+    assert moved
+    assert all(row["previous_state"] == "new" for row in moved)
+
+    remaining = client.get("/api/v1/jobs", params={"state": "new", "region": "emea", "range": "7d"}).json()
+    assert remaining == []
+
+
+def test_batch_requires_ids_or_filter(client):
+    assert client.post("/api/v1/jobs/state:batch", json={"state": "trash"}).status_code == 400
+    r = client.post(
+        "/api/v1/jobs/state:batch",
+        json={"state": "trash", "ids": [], "filter": {"state": ["new"]}},
+    )
+    assert r.status_code == 400
+    r = client.post(
+        "/api/v1/jobs/state:batch", json={"state": "trash", "filter": {"older_than": "1y"}}
+    )
+    assert r.status_code == 400
+
+
+def test_batch_rejects_empty_filter(client, override_engine):
+    before = _history_count(override_engine)
+
+    r = client.post("/api/v1/jobs/state:batch", json={"state": "trash", "filter": {}})
+
+    assert r.status_code == 400
+    assert _history_count(override_engine) == before
+
+
+def test_batch_filter_is_capped(client, override_engine, monkeypatch):
+    monkeypatch.setattr(api.v1.jobs, "MAX_BATCH_SIZE", 3)
+    before = _history_count(override_engine)
+
+    r = client.post("/api/v1/jobs/state:batch", json={"state": "trash", "filter": {"state": ["applied"]}})
+
+    assert r.status_code == 400
+    assert "more than 3 jobs" in r.json()["detail"]
+    assert _history_count(override_engine) == before
+
+
+# New jobs whose state row was never updated: one that arrived a month ago,
+# one with no history at all and one that arrived just now. Removed again
+# afterwards, since the database is shared by the whole session.
+@pytest.fixture
+def undated_jobs(override_engine):
+    now = datetime.utcnow()
+    ids = {}
+    with Session(override_engine) as session:
+        for name, arrived in (("old", now - timedelta(days=30)), ("undated", None), ("recent", now)):
+            job = Job(title=name, company="Stale Oy", url=f"https://example.com/{name}", region=JobRegion.FI)
+            session.add(job)
+            session.add(JobCurrentState(job_id=job.id, state=JobState.NEW.value, updated_at=None))
+            if arrived:
+                session.add(JobStateHistory(job_id=job.id, state=JobState.NEW.value, timestamp=arrived))
+            ids[name] = job.id
+        session.commit()
+
+    yield {name: str(job_id) for name, job_id in ids.items()}
+
+    with Session(override_engine) as session:
+        for column in (JobStateHistory.job_id, JobCurrentState.job_id, Job.id):
+            session.exec(delete(column.class_).where(column.in_(list(ids.values()))))
+        session.commit()
+
+
+# Jobs never updated are dated by their first history row, or count as old
+# if they have none.
+def test_batch_older_than_without_updated_at(client, undated_jobs):
+    r = client.post(
+        "/api/v1/jobs/state:batch",
+        json={"state": "trash", "filter": {"state": ["new"], "region": "fi", "older_than": "7d"}},
+    )
+
+    assert r.status_code == 200, r.text
+    moved = {row["job_id"] for row in r.json()["results"]}
+    assert {undated_jobs["old"], undated_jobs["undated"]} <= moved
+    assert undated_jobs["recent"] not in moved
@@ -0,0 +1,17 @@
+from benchmarks.generate import generate
+from benchmarks.run import regressions, run
+
+
+def test_benchmark_harness_smoke(tmp_path):
+    db = generate(str(tmp_path / "bench.db"), jobs=200, description_length=200, notes_edits=2)
+
+    results = run(db, iterations=3)
+
+    assert set(results) >= {"list_jobs", "get_job", "update_job_state", "save_jobs 1000 records"}
+    for result in results.values():
+        assert result["p95_ms"] >= result["p50_ms"] > 0
+        assert result["statements"] > 0
+
+    assert regressions(results, {"results": results}, tolerance=0.5) == []
+    slower = {"results": {"get_job": {**results["get_job"], "statements": 0}}}
+    assert regressions(results, slower, tolerance=0.5)
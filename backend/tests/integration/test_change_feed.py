@@ -0,0 +1,88 @@
+import json
+from sqlmodel import Session, func, select
+from ingest.writer import save_jobs
+from models.schema import JobCurrentState, JobRegion
+
+
+def _changes(client, since, **params):
+    r = client.get("/api/v1/jobs/changes", params={"since": since, **params})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_existing_jobs_are_numbered(test_engine):
+    with Session(test_engine) as session:
+        missing = session.exec(
+            select(func.count()).select_from(JobCurrentState).where(JobCurrentState.change_seq.is_(None))
+        ).one()
+    assert missing == 0
+
+
+def test_full_feed_pages_by_sequence(client):
+    first = _changes(client, 0, limit=50)
+    assert first["has_more"]
+    seqs = [job["change_seq"] for job in first["jobs"]]
+    assert seqs == sorted(seqs) and len(seqs) == 50
+    assert first["high_water_mark"] == seqs[-1]
+
+    rest = _changes(client, first["high_water_mark"])
+    assert not rest["has_more"]
+    assert all(job["change_seq"] > first["high_water_mark"] for job in rest["jobs"])
+
+
+def test_state_change_appears_in_feed(client):
+    mark = _changes(client, 0)["high_water_mark"]
+    assert _changes(client, mark)["jobs"] == []
+
+    job_id = client.get("/api/v1/jobs", params={"limit": 1}).json()[0]["id"]
+    client.post(f"/api/v1/jobs/{job_id}/state", json={"state": "saved"})
+
+    delta = _changes(client, mark)
+    assert [job["id"] for job in delta["jobs"]] == [job_id]
+    assert delta["jobs"][0]["state"] == "saved"
+    assert delta["high_water_mark"] > mark
+
+
+def test_ingestion_upserts_appear_in_feed(client, test_engine, make_record):
+    mark = _changes(client, 0)["high_water_mark"]
+
+    save_jobs([make_record("change-feed-1", job_title="Release Engineer")], JobRegion.FI, bind=test_engine)
+    inserted = _changes(client, mark)
+    assert [job["title"] for job in inserted["jobs"]] == ["Release Engineer"]
+
+    # Unchanged records don't move; changed ones come back with a new number.
+    save_jobs([make_record("change-feed-1", job_title="Release Engineer")], JobRegion.FI, bind=test_engine)
+    assert _changes(client, inserted["high_water_mark"])["jobs"] == []
+
+    save_jobs([make_record("change-feed-1", job_title="Senior Release Engineer")], JobRegion.FI, bind=test_engine)
+    updated = _changes(client, inserted["high_water_mark"], fields="id,title,state")
+    assert updated["jobs"] == [
+        {
+            "change_seq": updated["high_water_mark"],
+            "id": inserted["jobs"][0]["id"],
+            "title": "Senior Release Engineer",
+            "state": "new",
+        }
+    ]
+
+
+def test_stream_pushes_deltas(client, monkeypatch):
+    import api.v1.jobs
+    monkeypatch.setattr(api.v1.jobs, "CHANGE_POLL_SECONDS", 0.05)
+
+    seqs = [job["change_seq"] for job in _changes(client, 0)["jobs"]]
+    r = client.get(
+        "/api/v1/jobs/changes/stream",
+        params={"timeout": 0.3, "fields": "id,state"},
+        headers={"Last-Event-ID": str(seqs[-3])},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+
+    events = [block for block in r.text.split("\n\n") if block.startswith("id:")]
+    assert len(events) == 1
+    lines = dict(line.split(": ", 1) for line in events[0].splitlines())
+    assert lines["event"] == "changes"
+    assert int(lines["id"]) == seqs[-1]
+    payload = json.loads(lines["data"])
+    assert [job["change_seq"] for job in payload["jobs"]] == seqs[-2:]
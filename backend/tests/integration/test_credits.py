@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlmodel import Session
+from core.credits import CreditsService, save_snapshot
+
+
+class CountingFetch:
+    def __init__(self, value=100, delay=0.05):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+def test_concurrent_callers_share_one_request():
+    fetch = CountingFetch()
+    service = CreditsService(fetch=fetch)
+
+    async def run():
+        return await asyncio.gather(*(service.get() for _ in range(20)))
+
+    results = asyncio.run(run())
+
+    assert fetch.calls == 1
+    assert {r.remaining for r in results} == {100}
+
+
+def test_fresh_value_is_served_from_memory():
+    fetch = CountingFetch()
+    service = CreditsService(fetch=fetch, ttl=60)
+
+    async def run():
+        await service.get()
+        return await service.get()
+
+    assert asyncio.run(run()).remaining == 100
+    assert fetch.calls == 1
+
+
+def test_stale_value_is_served_while_revalidating():
+    fetch = CountingFetch(value=42)
+    service = CreditsService(fetch=fetch, ttl=60, stale=3600)
+    service.prime(7, datetime.utcnow() - timedelta(minutes=5))
+
+    async def run():
+        stale = await service.get()
+        await asyncio.sleep(0.1)
+        return stale, await service.get()
+
+    stale, fresh = asyncio.run(run())
+
+    assert stale.remaining == 7
+    assert fresh.remaining == 42
+    assert fetch.calls == 1
+
+
+def test_ingester_snapshot_is_used(test_engine):
+    with Session(test_engine) as session:
+        save_snapshot(session, 1234)
+        session.commit()
+
+    fetch = CountingFetch()
+    service = CreditsService(fetch=fetch, snapshot_bind=test_engine)
+
+    credits = asyncio.run(service.get())
+
+    assert credits.remaining == 1234
+    assert fetch.calls == 0
+
+
+def test_credits_endpoint(client, monkeypatch):
+    from api.v1.status import credits
+
+    monkeypatch.setattr(credits, "credits_service", CreditsService(fetch=CountingFetch(55)))
+
+    body = client.get("/api/v1/status/credits").json()
+
+    assert body["remaining_credits"] == 55
+    assert body["age_seconds"] >= 0
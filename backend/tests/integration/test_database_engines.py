@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from core.database import create_db_engine, init_db
+
+
+@pytest.fixture
+def engines(tmp_path):
+    url = f"sqlite:///{tmp_path / 'engines.db'}"
+    writer = create_db_engine(url)
+    init_db(writer)
+    reader = create_db_engine(url, readonly=True)
+    yield writer, reader
+    writer.dispose()
+    reader.dispose()
+
+
+def test_pragmas(engines):
+    writer, reader = engines
+
+    with writer.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+        # NORMAL
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+
+    assert not writer.echo
+
+
+def test_reader_is_read_only(engines):
+    _, reader = engines
+
+    with reader.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO jobsource (name) VALUES ('nope')"))
+
+
+def test_readers_do_not_wait_for_writer(engines):
+    writer, reader = engines
+
+    with writer.begin() as write_conn:
+        write_conn.execute(text("INSERT INTO jobsource (name) VALUES ('pending')"))
+
+        # The write transaction is still open; readers see the last commit.
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM jobsource")).scalar() == 0
+
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM jobsource")).scalar() == 1
@@ -0,0 +1,101 @@
+import os
+import sqlite3
+from sqlalchemy import inspect, text
+from sqlmodel import Session, func, select
+from core.database import init_db
+from core.descriptions import prune_descriptions
+from ingest.writer import save_jobs
+from models.schema import JobDescription, JobRegion
+
+FIXTURE_DB = os.path.join(os.path.dirname(__file__), "../fixtures/testkanban.db")
+
+
+def _search(engine, q):
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT count(*) FROM job_fts WHERE job_fts MATCH :q"), {"q": q}
+        ).scalar_one()
+
+
+def test_inline_descriptions_are_moved(client, test_engine):
+    # The fixture was created with descriptions in the job table.
+    with sqlite3.connect(FIXTURE_DB) as raw:
+        job_id, original = raw.execute(
+            "SELECT id, description FROM job WHERE description != '' LIMIT 1"
+        ).fetchone()
+
+    assert "description" not in {col["name"] for col in inspect(test_engine).get_columns("job")}
+
+    job = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert job["description"] == original
+    assert "description_hash" not in job
+
+    jobs = client.get("/api/v1/jobs", params={"fields": "id,description"}).json()
+    assert {j["id"]: j["description"] for j in jobs}[job["id"]] == original
+
+
+def test_identical_descriptions_are_stored_once(empty_engine, make_record):
+    description = "Kubernetes on bare metal. " * 50
+    save_jobs([make_record(1, description=description)], JobRegion.FI, bind=empty_engine)
+    save_jobs([make_record(2, description=description)], JobRegion.EMEA, bind=empty_engine)
+
+    with Session(empty_engine) as session:
+        assert session.exec(select(func.count()).select_from(JobDescription)).one() == 1
+        stored = session.exec(select(JobDescription)).one()
+    assert len(stored.body) < len(description) / 10
+    assert _search(empty_engine, "bare") == 2
+
+
+def test_changed_description_is_reindexed_and_pruned(empty_engine, make_record):
+    save_jobs([make_record(1, description="Ansible playbooks")], JobRegion.FI, bind=empty_engine)
+    save_jobs([make_record(1, description="Terraform modules")], JobRegion.FI, bind=empty_engine)
+
+    assert _search(empty_engine, "ansible") == 0
+    assert _search(empty_engine, "terraform") == 1
+
+    with Session(empty_engine) as session:
+        assert prune_descriptions(session) == 1
+        session.commit()
+        assert session.exec(select(func.count()).select_from(JobDescription)).one() == 1
+
+
+def test_card_listing_does_not_read_descriptions(client, query_guard):
+    client.get("/api/v1/jobs")
+    assert not any("jobdescription" in s for s in query_guard.statements)
+
+
+def test_other_connections_can_write_jobs(empty_engine, make_record):
+    save_jobs([make_record(1, description="Ansible playbooks")], JobRegion.FI, bind=empty_engine)
+
+    # A plain sqlite3 connection, like the CLI, has none of the app's functions.
+    with sqlite3.connect(empty_engine.url.database) as raw:
+        raw.execute("UPDATE job SET title = 'Platform Wrangler' WHERE external_id = '1'")
+        raw.execute(
+            "INSERT INTO job (id, external_id, title, company, url, region) "
+            "VALUES ('0123456789abcdef0123456789abcdef', 'manual', 'Manual Entry', 'Hand Oy', 'u', 'FI')"
+        )
+
+    assert _search(empty_engine, "wrangler") == 1
+    assert _search(empty_engine, "ansible") == 1
+    assert _search(empty_engine, "manual") == 1
+
+
+def test_app_only_triggers_are_replaced(empty_engine):
+    with empty_engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER job_fts_insert"))
+        conn.execute(
+            text(
+                "CREATE TRIGGER job_fts_insert AFTER INSERT ON job BEGIN "
+                "INSERT INTO job_fts (rowid, job_id, title, company, description) "
+                "VALUES (new.rowid, new.id, new.title, new.company, description_text(NULL)); END"
+            )
+        )
+
+    init_db(empty_engine)
+
+    with empty_engine.connect() as conn:
+        triggers = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'job'")
+        ).scalars().all()
+    assert len(triggers) == 3
+    assert not any("description_text" in sql for sql in triggers)
@@ -0,0 +1,63 @@
+from datetime import datetime
+from ingest.cursors import advance_cursor, incremental_query, load_cursor, unseen
+from ingest.writer import save_jobs
+from models.schema import JobRegion
+
+QUERY = {"page": 0, "limit": 25, "posted_at_max_age_days": 1, "job_title_or": ["devops"]}
+
+
+def test_first_run_uses_the_configured_query(empty_engine):
+    cursor = load_cursor("fi_query", QUERY, bind=empty_engine)
+    assert cursor is None
+    assert incremental_query(QUERY, cursor) == QUERY
+
+
+def test_cursor_restricts_the_next_run(empty_engine, make_record):
+    records = [
+        make_record(10, discovered_at="2026-10-01T08:00:00Z"),
+        make_record(12, discovered_at="2026-10-01T09:30:00+03:00"),
+        make_record(11, discovered_at="2026-10-01T06:30:00"),
+    ]
+    advance_cursor("fi_query", QUERY, records, bind=empty_engine)
+
+    cursor = load_cursor("fi_query", QUERY, bind=empty_engine)
+    # Latest by discovered_at (in UTC), ties broken by id.
+    assert (cursor.discovered_at, cursor.external_id) == (datetime(2026, 10, 1, 8), "10")
+
+    query = incremental_query(QUERY, cursor, now=datetime(2026, 10, 4, 9))
+    assert query["discovered_at_gte"] == "2026-10-01T08:00:00"
+    assert query["order_by"] == [{"desc": False, "field": "discovered_at"}]
+    # Three missed days are caught up on.
+    assert query["posted_at_max_age_days"] == 4
+
+    # Records at the watermark come back from discovered_at_gte, in any id
+    # order. Only the stored ones are dropped: 9 was cut off by max_pages.
+    save_jobs([records[0]], JobRegion.FI, bind=empty_engine)
+    page = [
+        make_record(8, discovered_at="2026-10-01T07:00:00Z"),
+        make_record(9, discovered_at="2026-10-01T08:00:00Z"),
+        make_record(10, discovered_at="2026-10-01T08:00:00Z"),
+        make_record(13, discovered_at="2026-10-01T08:00:00Z"),
+        make_record(14, discovered_at="2026-10-02T07:00:00Z"),
+    ]
+    assert [r["id"] for r in unseen(page, cursor, bind=empty_engine)] == [9, 13, 14]
+
+
+def test_cursor_only_moves_forward(empty_engine, make_record):
+    advance_cursor("fi_query", QUERY, [make_record(20, discovered_at="2026-10-02T00:00:00")], bind=empty_engine)
+    advance_cursor("fi_query", QUERY, [make_record(5, discovered_at="2026-09-30T00:00:00")], bind=empty_engine)
+    assert load_cursor("fi_query", QUERY, bind=empty_engine).external_id == "20"
+
+    # Runs without usable timestamps leave it alone.
+    assert advance_cursor("fi_query", QUERY, [{"id": 30}], bind=empty_engine) is None
+
+
+def test_changed_query_resets_the_cursor(empty_engine, make_record):
+    advance_cursor("fi_query", QUERY, [make_record(20, discovered_at="2026-10-02T00:00:00")], bind=empty_engine)
+    changed = {**QUERY, "job_title_or": ["devops", "sre"]}
+
+    assert load_cursor("fi_query", changed, bind=empty_engine) is None
+    assert load_cursor("emea_query", QUERY, bind=empty_engine) is None
+
+    advance_cursor("fi_query", changed, [make_record(3, discovered_at="2026-09-01T00:00:00")], bind=empty_engine)
+    assert load_cursor("fi_query", changed, bind=empty_engine).external_id == "3"
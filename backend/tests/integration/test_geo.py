@@ -0,0 +1,62 @@
+import pytest
+from core.geo import haversine
+from ingest.geo import within_radius
+from ingest.writer import save_jobs
+from models.schema import JobRegion
+
+HOME = (62.2426, 25.7473)  # Jyväskylä
+
+CITIES = {
+    "jyvaskyla": (62.2415, 25.7209),
+    "tampere": (61.4978, 23.7610),
+    "helsinki": (60.1699, 24.9384),
+}
+
+
+def _records():
+    return [
+        {
+            "id": f"geo-{name}",
+            "job_title": f"Platform Engineer in {name}",
+            "company": "GeoCorp",
+            "url": f"https://example.com/{name}",
+            "latitude": lat,
+            "longitude": lon,
+        }
+        for name, (lat, lon) in CITIES.items()
+    ] + [{"id": "geo-nowhere", "job_title": "Anywhere", "company": "GeoCorp", "url": "u"}]
+
+
+def test_within_radius_matches_scalar_haversine():
+    records = _records()
+
+    nearby = within_radius(records, *HOME, radius_km=150)
+
+    assert nearby == [True, True, False, False]
+    for record in records[:2]:
+        expected = haversine(*HOME, record["latitude"], record["longitude"])
+        assert record["distance_from_home_km"] == pytest.approx(expected, abs=0.01)
+    # Outside the bounding box: no exact distance is computed.
+    assert "distance_from_home_km" not in records[2]
+
+
+def test_near_query(client, test_engine):
+    save_jobs(_records(), JobRegion.FI, bind=test_engine)
+
+    r = client.get(
+        "/api/v1/jobs",
+        params={"near": f"{HOME[0]},{HOME[1]}", "radius_km": 150, "fields": "title"},
+    )
+    assert r.status_code == 200
+    jobs = {j["title"]: j["distance_km"] for j in r.json()}
+
+    assert "Platform Engineer in jyvaskyla" in jobs
+    assert "Platform Engineer in tampere" in jobs
+    assert "Platform Engineer in helsinki" not in jobs
+    assert "Anywhere" not in jobs
+    assert all(distance <= 150 for distance in jobs.values())
+    assert jobs["Platform Engineer in tampere"] == pytest.approx(
+        haversine(*HOME, *CITIES["tampere"])
+    )
+
+    assert client.get("/api/v1/jobs", params={"near": "north"}).status_code == 400
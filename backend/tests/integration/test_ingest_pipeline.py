@@ -0,0 +1,215 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import Session, select
+from ingest.archive import archive_paths
+from ingest.checkpoints import STALE_AFTER, start_run
+from ingest.pipeline import run_ingest
+from ingest.regions import Source
+from models.schema import FetchCursor, IngestionCheckpoint, IngestionRun, Job, JobRegion, RunStatus
+
+
+# Pages per query, each taking `delay` seconds to arrive. discovered_at_gte
+# is applied like TheirStack would, paging what is left. Requesting the page
+# given in `fail_at` for a query raises, like TheirStack giving up with a
+# 5xx. `windows` holds when each query's first request started and its last
+# one finished.
+class StubClient:
+    def __init__(self, pages_by_country, delay=0.0, fail_at=None):
+        self.pages_by_country = pages_by_country
+        self.delay = delay
+        self.fail_at = fail_at or {}
+        self.queries = []
+        self.requested = []
+        self.windows = {}
+
+    def iter_pages(self, query, start_page=0):
+        self.queries.append(query)
+        country = query["country"]
+        pages = self.pages_by_country[country]
+        if "discovered_at_gte" in query:
+            size = len(pages[0])
+            records = [r for page in pages for r in page if r["discovered_at"] >= query["discovered_at_gte"]]
+            pages = [records[i:i + size] for i in range(0, len(records), size)]
+        for number in range(start_page, len(pages)):
+            if self.fail_at.get(country) == number:
+                raise RuntimeError("TheirStack request failed: 503")
+            self.requested.append((country, number))
+            started = self.windows.get(country, (time.monotonic(),))[0]
+            time.sleep(self.delay)
+            self.windows[country] = (started, time.monotonic())
+            yield pages[number]
+
+
+def _source(region, country, keep=lambda jobs, bind: jobs):
+    return Source(region, f"{region.value}_query", {"country": country}, keep)
+
+
+# Every test gets the single-connection writer engine the ingester uses.
+pytestmark = pytest.mark.parametrize("empty_engine", ["writer"], indirect=True)
+
+
+# Run archives go to data/archive under the working directory.
+@pytest.fixture(autouse=True)
+def archive_in_tmp(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def _stored(engine):
+    with Session(engine) as session:
+        return {(job.region, job.external_id) for job in session.exec(select(Job))}
+
+
+def test_sources_run_concurrently(empty_engine, caplog, make_record):
+    pages = [[make_record(n) for n in range(page * 5, page * 5 + 5)] for page in range(3)]
+    client = StubClient({"FI": pages, "XX": [[make_record(n) for n in range(100, 105)]] * 3}, delay=0.2)
+    sources = [_source(JobRegion.FI, "FI"), _source(JobRegion.EMEA, "XX")]
+
+    with caplog.at_level(logging.INFO):
+        runs = run_ingest(sources, client=client, bind=empty_engine)
+
+    # Each query was still fetching when the other one started.
+    (fi_start, fi_end), (xx_start, xx_end) = client.windows["FI"], client.windows["XX"]
+    assert fi_start < xx_end and xx_start < fi_end
+    assert runs[JobRegion.FI].result.inserted == 15
+    assert runs[JobRegion.EMEA].result.inserted == 5
+    assert "Stage timings" in caplog.text
+    assert "[FI]   fetch" in caplog.text and "[EMEA] upsert" in caplog.text
+
+    assert len(archive_paths("data/archive")) == 2
+    with Session(empty_engine) as session:
+        assert session.get(FetchCursor, "fi_query").external_id == "14"
+
+
+def test_batches_bound_what_is_held(empty_engine, make_record):
+    seen = []
+
+    def keep(jobs, bind):
+        seen.append(len(jobs))
+        return [job for job in jobs if job["id"] % 2 == 0]
+
+    pages = [[make_record(n) for n in range(page * 25, page * 25 + 25)] for page in range(4)]
+    client = StubClient({"FI": pages})
+    runs = run_ingest([_source(JobRegion.FI, "FI", keep)], client=client, bind=empty_engine, batch_size=40)
+
+    # Batches end on page boundaries.
+    assert seen == [50, 50]
+    assert runs[JobRegion.FI].fetched == 100
+    assert runs[JobRegion.FI].kept == 50
+    assert len(_stored(empty_engine)) == 50
+
+
+def test_replay_streams_recorded_files(empty_engine, tmp_path, make_record):
+    (tmp_path / "fi.json").write_text(json.dumps({"data": [make_record(n) for n in range(7)]}))
+
+    runs = run_ingest(
+        [_source(JobRegion.FI, "FI")], replay=[str(tmp_path / "fi.json")], bind=empty_engine, batch_size=3
+    )
+
+    assert runs[JobRegion.FI].result.inserted == 7
+    with Session(empty_engine) as session:
+        assert session.get(FetchCursor, "fi_query") is None
+
+
+def test_failing_source_does_not_stop_the_others(empty_engine, make_record):
+    def broken(jobs, bind):
+        raise ValueError("filter bug")
+
+    client = StubClient({"FI": [[make_record(1)]], "XX": [[make_record(2)]]})
+    sources = [_source(JobRegion.FI, "FI", broken), _source(JobRegion.EMEA, "XX")]
+
+    with pytest.raises(ValueError):
+        run_ingest(sources, client=client, bind=empty_engine)
+
+    assert _stored(empty_engine) == {(JobRegion.EMEA, "2")}
+    with Session(empty_engine) as session:
+        assert session.get(FetchCursor, "fi_query") is None
+
+
+# Records discovered a minute apart, oldest first.
+def _pages(make_record, count, size=5, first=0):
+    return [
+        [make_record(n, discovered_at=f"2026-10-01T00:{n:02d}:00") for n in range(start, start + size)]
+        for start in range(first, first + count * size, size)
+    ]
+
+
+def test_failed_run_resumes_from_checkpoint(empty_engine, make_record):
+    pages = _pages(make_record, 4)
+    source = Source(JobRegion.FI, "fi_query", {"country": "FI", "posted_at_max_age_days": 1}, lambda jobs, bind: jobs)
+
+    with pytest.raises(RuntimeError):
+        run_ingest([source], client=StubClient({"FI": pages}, fail_at={"FI": 2}), bind=empty_engine)
+
+    # The pages fetched before the failure were stored with their checkpoint.
+    assert len(_stored(empty_engine)) == 10
+    with Session(empty_engine) as session:
+        run = session.exec(select(IngestionRun)).one()
+        checkpoint = session.get(IngestionCheckpoint, (run.id, "fi_query"))
+        assert run.status == RunStatus.FAILED
+        assert (checkpoint.pages, checkpoint.inserted, checkpoint.newest_external_id) == (2, 10, "9")
+        assert session.get(FetchCursor, "fi_query") is None
+
+    client = StubClient({"FI": pages})
+    runs = run_ingest([source], client=client, bind=empty_engine)
+
+    # Sent again from the newest stored record, with the age window worked
+    # out from now, starting at page 0. The boundary record is dropped.
+    [query] = client.queries
+    assert query["discovered_at_gte"] == "2026-10-01T00:09:00"
+    assert query["posted_at_max_age_days"] > 1
+    assert client.requested == [("FI", 0), ("FI", 1), ("FI", 2)]
+    assert runs[JobRegion.FI].fetched == 10
+    assert runs[JobRegion.FI].result.inserted == 10
+    assert len(_stored(empty_engine)) == 20
+    with Session(empty_engine) as session:
+        run = session.exec(select(IngestionRun)).one()
+        assert (run.status, run.resumes) == (RunStatus.COMPLETED, 1)
+        assert session.get(FetchCursor, "fi_query").external_id == "19"
+
+
+def test_resume_fetches_completed_queries_again(empty_engine, make_record):
+    sources = [_source(JobRegion.FI, "FI"), _source(JobRegion.EMEA, "XX")]
+    pages = {"FI": _pages(make_record, 2), "XX": _pages(make_record, 2, size=1, first=50)}
+
+    with pytest.raises(RuntimeError):
+        run_ingest(sources, client=StubClient(pages, fail_at={"XX": 1}), bind=empty_engine)
+
+    # FI completed in the failed run, but has new postings by the next one.
+    pages["FI"] = _pages(make_record, 3)
+    client = StubClient(pages)
+    runs = run_ingest(sources, client=client, bind=empty_engine)
+
+    sent = {query["country"]: query["discovered_at_gte"] for query in client.queries}
+    assert sent == {"FI": "2026-10-01T00:09:00", "XX": "2026-10-01T00:50:00"}
+    assert runs[JobRegion.FI].result.inserted == 5
+    assert runs[JobRegion.EMEA].result.inserted == 1
+    assert len(_stored(empty_engine)) == 17
+    with Session(empty_engine) as session:
+        assert session.exec(select(IngestionRun.status)).all() == [RunStatus.COMPLETED]
+        assert session.get(FetchCursor, "fi_query").external_id == "14"
+
+
+def test_running_run_is_not_shared(empty_engine):
+    run = start_run(empty_engine)
+
+    with pytest.raises(RuntimeError, match="still running"):
+        start_run(empty_engine)
+
+    # Once its heartbeat is stale, the process running it is assumed dead.
+    resumed = start_run(empty_engine, now=datetime.utcnow() + STALE_AFTER + timedelta(minutes=1))
+    assert (resumed.id, resumed.resumes) == (run.id, 1)
+
+
+def test_changed_query_starts_over(empty_engine, make_record):
+    with pytest.raises(RuntimeError):
+        client = StubClient({"FI": _pages(make_record, 3)}, fail_at={"FI": 1})
+        run_ingest([_source(JobRegion.FI, "FI")], client=client, bind=empty_engine)
+
+    changed = Source(JobRegion.FI, "fi_query", {"country": "FI", "remote": True}, lambda jobs, bind: jobs)
+    client = StubClient({"FI": _pages(make_record, 3)})
+    run_ingest([changed], client=client, bind=empty_engine)
+
+    assert client.requested == [("FI", 0), ("FI", 1), ("FI", 2)]
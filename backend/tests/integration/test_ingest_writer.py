@@ -0,0 +1,66 @@
+from sqlalchemy import inspect
+from sqlmodel import Session, select
+from ingest.writer import payload_hash, save_jobs
+from models.schema import Job, JobCurrentState, JobRegion, JobStateHistory
+
+
+def test_insert_then_update_counts(empty_engine, make_record, count_rows):
+    records = [make_record(n) for n in range(1, 1201)]
+
+    result = save_jobs(records, JobRegion.FI, bind=empty_engine, chunk_size=500)
+    assert (result.inserted, result.updated) == (1200, 0)
+    assert count_rows(empty_engine, Job) == 1200
+    assert count_rows(empty_engine, JobStateHistory) == 1200
+    assert count_rows(empty_engine, JobCurrentState) == 1200
+
+    # Re-ingesting unchanged records touches nothing.
+    result = save_jobs(records, JobRegion.FI, bind=empty_engine)
+    assert (result.inserted, result.updated) == (0, 0)
+
+    records[10] = make_record(11, job_title="Senior DevOps Engineer")
+    records.append(make_record(5000))
+    result = save_jobs(records, JobRegion.FI, bind=empty_engine)
+    assert (result.inserted, result.updated) == (1, 1)
+
+    with Session(empty_engine) as session:
+        job = session.exec(select(Job).where(Job.external_id == "11")).one()
+        assert job.title == "Senior DevOps Engineer"
+        assert job.region == JobRegion.FI
+
+
+def test_duplicate_ids_in_one_batch(empty_engine, make_record):
+    records = [make_record(1), make_record(1, job_title="Reposted")]
+
+    result = save_jobs(records, JobRegion.EMEA, bind=empty_engine)
+
+    assert result.inserted == 1
+    with Session(empty_engine) as session:
+        assert session.exec(select(Job.title)).one() == "Reposted"
+
+
+def test_unchanged_payloads_are_skipped(empty_engine, query_guard, make_record):
+    records = [make_record(n, salary_string="4000 EUR") for n in range(1, 11)]
+    save_jobs(records, JobRegion.FI, bind=empty_engine)
+    with Session(empty_engine) as session:
+        seqs = dict(session.exec(select(JobCurrentState.job_id, JobCurrentState.change_seq)).all())
+
+    # Identical payloads: one lookup, no writes.
+    query_guard.reset()
+    result = save_jobs(records, JobRegion.FI, bind=empty_engine)
+    assert (result.inserted, result.updated) == (0, 0)
+    assert not any(s.startswith(("INSERT", "UPDATE")) for s in query_guard.statements)
+
+    # A change in a field we don't store refreshes the hash only; the board
+    # doesn't see it.
+    records[0] = make_record(1, salary_string="5000 EUR")
+    result = save_jobs(records, JobRegion.FI, bind=empty_engine)
+    assert (result.inserted, result.updated) == (0, 0)
+    with Session(empty_engine) as session:
+        job = session.exec(select(Job).where(Job.external_id == "1")).one()
+        assert job.payload_hash == payload_hash(records[0])
+        assert dict(session.exec(select(JobCurrentState.job_id, JobCurrentState.change_seq)).all()) == seqs
+
+
+def test_external_id_index_is_unique(test_engine):
+    indexes = {ix["name"]: ix for ix in inspect(test_engine).get_indexes("job")}
+    assert indexes["ix_job_external_id"]["unique"]
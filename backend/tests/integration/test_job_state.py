@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+from sqlmodel import Session, select
+from core.job_state import backfill_current_state, compact_notes, record_notes, record_state
+from models.schema import Job, JobCurrentState, JobNote, JobStateHistory
+
+
+def _current_states(session):
+    return {
+        row.job_id: (row.state, row.notes, row.updated_at, row.applied_at)
+        for row in session.exec(select(JobCurrentState))
+    }
+
+
+def test_backfill_covers_every_job(test_engine):
+    with Session(test_engine) as session:
+        backfill_current_state(session)
+        session.flush()
+
+        job_ids = set(session.exec(select(Job.id)).all())
+        state_ids = set(session.exec(select(JobCurrentState.job_id)).all())
+        session.rollback()
+
+    assert job_ids == state_ids
+
+
+def test_current_state_follows_endpoints(client, test_engine):
+    job_id = client.get("/api/v1/jobs").json()[0]["id"]
+
+    client.post(f"/api/v1/jobs/{job_id}/state", json={"state": "applied"})
+    client.patch(f"/api/v1/jobs/{job_id}/notes", json={"notes": "called back"})
+
+    with Session(test_engine) as session:
+        history = session.exec(
+            select(JobStateHistory)
+            .where(JobStateHistory.job_id == UUID(job_id))
+            .order_by(JobStateHistory.timestamp)
+        ).all()
+        current = session.get(JobCurrentState, UUID(job_id))
+
+        note = session.exec(
+            select(JobNote).where(JobNote.job_id == UUID(job_id)).order_by(JobNote.updated_at.desc())
+        ).first()
+
+        assert current.state == "applied"
+        assert current.notes == "called back"
+        # The notes save is a revision, not another history row.
+        assert history[-1].state == "applied"
+        assert note.notes == "called back"
+        assert current.updated_at == note.updated_at
+        assert current.applied_at == min(
+            h.timestamp for h in history if h.state == "applied"
+        )
+
+
+def test_backfill_matches_incremental_updates(client, test_engine):
+    job_id = client.get("/api/v1/jobs").json()[0]["id"]
+    client.post(f"/api/v1/jobs/{job_id}/state", json={"state": "interview"})
+
+    with Session(test_engine) as session:
+        before = _current_states(session)
+        backfill_current_state(session)
+        session.flush()
+        after = _current_states(session)
+        session.rollback()
+
+    for job_id, (state, notes, updated_at, _) in before.items():
+        assert after[job_id][0] == state
+        assert after[job_id][2] == updated_at
+        assert (after[job_id][1] or "") == (notes or "")
+
+
+def test_notes_saves_coalesce_within_window(test_engine):
+    with Session(test_engine) as session:
+        job_id = session.exec(select(Job.id)).first()
+        start = datetime(2030, 1, 1, 12, 0)
+
+        first = record_notes(session, job_id, "a", timestamp=start, window=60)
+        session.flush()
+        second = record_notes(session, job_id, "ab", timestamp=start + timedelta(seconds=30), window=60)
+        third = record_notes(session, job_id, "abc", timestamp=start + timedelta(minutes=5), window=60)
+        session.flush()
+
+        assert second.id == first.id and second.notes == "ab"
+        assert second.created_at == start
+        assert third.id != first.id
+        assert session.get(JobCurrentState, job_id).notes == "abc"
+        session.rollback()
+
+
+def test_compact_notes_moves_notes_only_rows(test_engine):
+    start = datetime(2030, 2, 1, 9, 0)
+    with Session(test_engine) as session:
+        job_id = session.exec(select(Job.id)).first()
+        # Legacy pattern: a state change followed by notes saves that repeat
+        # the state, two close together and one much later.
+        for minutes, state, notes in [
+            (0, "saved", "first"),
+            (1, "saved", "first draft"),
+            (2, "saved", "first draft, edited"),
+            (90, "saved", "later thought"),
+            (91, "applied", "later thought"),
+        ]:
+            session.add(
+                JobStateHistory(
+                    id=uuid4(),
+                    job_id=job_id,
+                    state=state,
+                    notes=notes,
+                    timestamp=start + timedelta(minutes=minutes),
+                )
+            )
+        session.flush()
+        before = _current_states(session)
+
+        removed, revisions = compact_notes(session, window=300)
+        session.flush()
+
+        history = session.exec(
+            select(JobStateHistory.state, JobStateHistory.timestamp)
+            .where(JobStateHistory.job_id == job_id, JobStateHistory.timestamp >= start)
+            .order_by(JobStateHistory.timestamp)
+        ).all()
+        notes = session.exec(
+            select(JobNote.notes).where(JobNote.job_id == job_id, JobNote.created_at >= start)
+            .order_by(JobNote.created_at)
+        ).all()
+
+        assert removed >= 3 and revisions >= 2
+        assert [h.state for h in history] == ["saved", "applied"]
+        assert notes == ["first draft, edited", "later thought"]
+        # Compaction never changes what the board shows.
+        assert _current_states(session) == before
+        assert compact_notes(session, window=300) == (0, 0)
+        session.rollback()
+
+
+# Marking a job with the state it already has is a real transition, with or
+# without new notes, and survives compaction.
+def test_compact_notes_keeps_repeated_transitions(test_engine):
+    start = datetime(2030, 3, 1, 9, 0)
+    with Session(test_engine) as session:
+        job_id = session.exec(select(Job.id)).first()
+        record_state(session, job_id, "applied", notes="sent CV", timestamp=start)
+        record_notes(session, job_id, "sent CV", timestamp=start)
+        # Re-marked applied ten minutes later with a follow-up note, then
+        # again without changing the notes.
+        later = start + timedelta(minutes=10)
+        record_state(session, job_id, "applied", notes="sent CV, followed up", timestamp=later)
+        record_notes(session, job_id, "sent CV, followed up", timestamp=later)
+        record_state(session, job_id, "applied", notes="sent CV, followed up", timestamp=later + timedelta(minutes=30))
+        session.flush()
+
+        compact_notes(session, window=300)
+        session.flush()
+
+        history = session.exec(
+            select(JobStateHistory.state)
+            .where(JobStateHistory.job_id == job_id, JobStateHistory.timestamp >= start)
+        ).all()
+        assert history == ["applied"] * 3
+        session.rollback()
@@ -67,3 +67,61 @@ def test_ordering_by_updated_at(client):
         j["updated_at"] for j in jobs if j["updated_at"] is not None
     ]
     assert timestamps == sorted(timestamps, reverse=True)
+
+
+def test_keyset_pagination_walks_whole_board(client):
+    everything = [j["id"] for j in client.get("/api/v1/jobs").json()]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/api/v1/jobs", params=params)
+        assert r.status_code == 200
+        page = r.json()
+        assert len(page) <= 10
+        seen.extend(j["id"] for j in page)
+
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == everything
+
+
+def test_state_and_region_filters(client):
+    jobs = client.get("/api/v1/jobs").json()
+
+    applied = client.get("/api/v1/jobs", params={"state": "applied"}).json()
+    assert applied
+    assert {j["state"] for j in applied} == {"applied"}
+    assert len(applied) == sum(1 for j in jobs if j["state"] == "applied")
+
+    both = client.get("/api/v1/jobs", params=[("state", "applied"), ("state", "new")]).json()
+    assert {j["state"] for j in both} == {"applied", "new"}
+
+    fi = client.get("/api/v1/jobs", params={"region": "fi"}).json()
+    assert fi
+    assert {j["region"] for j in fi} == {"fi"}
+
+
+def test_invalid_cursor_is_rejected(client):
+    r = client.get("/api/v1/jobs", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+def test_list_returns_card_projection_by_default(client):
+    job = client.get("/api/v1/jobs").json()[0]
+
+    assert "description" not in job
+    assert {"id", "title", "company", "url", "state", "notes", "updated_at"} <= set(job)
+
+
+def test_fields_selector(client):
+    jobs = client.get("/api/v1/jobs", params={"fields": "id,title,description"}).json()
+    assert all(set(j) == {"id", "title", "description"} for j in jobs)
+
+    r = client.get("/api/v1/jobs", params={"fields": "id,password"})
+    assert r.status_code == 400
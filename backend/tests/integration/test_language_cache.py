@@ -0,0 +1,43 @@
+from sqlmodel import Session, func, select
+from ingest import language
+from ingest.language import detect_languages
+from models.schema import DescriptionLanguage
+
+ENGLISH = "We are looking for an experienced engineer to run our Kubernetes clusters and Linux servers."
+FINNISH = "Etsimme kokenutta asiantuntijaa ylläpitämään palvelimiamme ja kehittämään infrastruktuuria."
+
+
+def test_detects_and_caches(empty_engine, monkeypatch):
+    langs = detect_languages([ENGLISH, FINNISH, ENGLISH], workers=1, bind=empty_engine)
+    assert langs == ["en", "fi", "en"]
+
+    with Session(empty_engine) as session:
+        assert session.exec(select(func.count()).select_from(DescriptionLanguage)).one() == 2
+
+    # Second run must be served entirely from the cache.
+    def fail(text):
+        raise AssertionError("description was re-detected")
+
+    monkeypatch.setattr(language, "detect_language", fail)
+    assert detect_languages([FINNISH, ENGLISH], workers=1, bind=empty_engine) == ["fi", "en"]
+
+
+def test_process_pool(empty_engine):
+    texts = [f"{ENGLISH} Posting number {n}." for n in range(40)]
+
+    langs = detect_languages(texts, workers=2, chunksize=8, bind=empty_engine)
+
+    assert langs == ["en"] * 40
+
+
+def test_shared_pool_is_started_once(empty_engine):
+    with language.LanguagePool(workers=2) as pool:
+        english = [f"{ENGLISH} Posting {n}." for n in range(20)]
+        finnish = [f"{FINNISH} Ilmoitus {n}." for n in range(20)]
+        first = detect_languages(english, chunksize=8, bind=empty_engine, pool=pool)
+        workers = pool._pool
+        second = detect_languages(finnish, chunksize=8, bind=empty_engine, pool=pool)
+
+        assert pool._pool is workers
+    assert (first, second) == (["en"] * 20, ["fi"] * 20)
+    assert pool._pool is None
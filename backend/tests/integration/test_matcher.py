@@ -0,0 +1,76 @@
+from sqlmodel import Session, select
+from ingest.matcher import PhraseMatcher
+from ingest.refilter import trash_dealbreakers
+from ingest.writer import save_jobs
+from models.schema import Job, JobCurrentState, JobRegion
+
+
+def test_whole_words_and_case():
+    matcher = PhraseMatcher(["uk only", "onsite only", "unpaid", "work in the UK"])
+
+    text = "This role is UK only. Paid, not unpaid. You will WORK IN THE UK."
+
+    assert matcher.find(text) == ["uk only", "unpaid", "work in the UK"]
+    assert matcher.find("The Ukraine office is onsite-only") == []
+    assert not matcher.search("the ukonly team")
+
+
+def test_prefix_phrases():
+    matcher = PhraseMatcher(["etätyö*", "remote*", "etänä"])
+
+    assert matcher.find("Mahdollisuus etätyöskentelyyn") == ["etätyö*"]
+    assert matcher.find("Work remotely or etänä") == ["remote*", "etänä"]
+    assert matcher.find("Toimistolla Tampereella") == []
+
+
+def test_overlapping_phrases_are_all_reported():
+    matcher = PhraseMatcher(["remote within uk", "within uk only", "uk"])
+
+    assert set(matcher.find("fully remote within uk only")) == {
+        "remote within uk",
+        "within uk only",
+        "uk",
+    }
+
+
+def test_scales_to_many_phrases():
+    phrases = [f"dealbreaker phrase {n}" for n in range(1000)]
+    matcher = PhraseMatcher(phrases)
+
+    assert matcher.find("nothing to see dealbreaker phrase 777 here") == ["dealbreaker phrase 777"]
+
+
+def test_trash_dealbreakers(test_engine):
+    save_jobs(
+        [
+            {
+                "id": "refilter-1",
+                "job_title": "SRE",
+                "company": "Relocate Ltd",
+                "url": "https://example.com/1",
+                "description": "Relocation required to our Berlin office.",
+            },
+            {
+                "id": "refilter-2",
+                "job_title": "SRE",
+                "company": "Remote Ltd",
+                "url": "https://example.com/2",
+                "description": "Fully remote across Europe.",
+            },
+        ],
+        JobRegion.EMEA,
+        bind=test_engine,
+    )
+    matcher = PhraseMatcher(["relocation required"])
+
+    with Session(test_engine) as session:
+        hits = trash_dealbreakers(session, matcher, region=JobRegion.EMEA)
+        session.commit()
+
+        job = session.exec(select(Job).where(Job.external_id == "refilter-1")).one()
+        assert hits[job.id] == ["relocation required"]
+        assert job.matched_phrases == ["relocation required"]
+        assert session.get(JobCurrentState, job.id).state == "trash"
+
+        other = session.exec(select(Job).where(Job.external_id == "refilter-2")).one()
+        assert session.get(JobCurrentState, other.id).state == "new"
@@ -0,0 +1,28 @@
+import re
+
+
+def _sample(text, name, **labels):
+    label_re = ".*".join(f'{k}="{re.escape(v)}"' for k, v in labels.items())
+    match = re.search(rf"^{name}\{{.*{label_re}.*\}} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_metrics_endpoint_reports_route_templates(client):
+    job_id = client.get("/api/v1/jobs", params={"limit": 1}).json()[0]["id"]
+    client.get(f"/api/v1/jobs/{job_id}")
+    client.get(f"/api/v1/jobs/{job_id}")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+
+    route = "/api/v1/jobs/{job_id}"
+    assert _sample(text, "http_requests_total", route=route, status="200") >= 2
+    assert _sample(text, "http_request_duration_seconds_count", route=route) >= 2
+    assert _sample(text, "http_response_size_bytes_sum", route=route) > 0
+    # Each detail request issues at least one SQL statement.
+    assert _sample(text, "db_statements_per_request_sum", route=route) >= 2
+    assert "http_requests_in_flight" in text
+    # Concrete ids must not leak into label values.
+    assert job_id not in text
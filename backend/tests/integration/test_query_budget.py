@@ -0,0 +1,81 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from api.metrics import MetricsMiddleware, MetricsRegistry
+from api.v1.jobs import router as jobs_router
+from core.query_guard import QueryBudgetExceeded, QueryCounter, normalize
+from models.schema import Job
+
+# Statement budget per endpoint. Raising one of these should be a deliberate
+# change, not a side effect of a lazy load sneaking back in.
+LIST_BUDGET = 1
+DETAIL_BUDGET = 2
+UPDATE_BUDGET = 4
+
+
+def _some_job_id(client):
+    return client.get("/api/v1/jobs", params={"limit": 1}).json()[0]["id"]
+
+
+@pytest.mark.parametrize("params", [{}, {"limit": 50}, {"fields": "id,title,description,state,notes"}, {"state": "new"}])
+def test_list_jobs_budget(client, query_guard, params):
+    assert client.get("/api/v1/jobs", params=params).status_code == 200
+    query_guard.check(max_statements=LIST_BUDGET)
+
+
+def test_get_job_budget(client, query_guard):
+    job_id = _some_job_id(client)
+    query_guard.reset()
+    assert client.get(f"/api/v1/jobs/{job_id}").status_code == 200
+    query_guard.check(max_statements=DETAIL_BUDGET)
+
+
+def test_update_endpoints_budget(client, query_guard):
+    job_id = _some_job_id(client)
+
+    query_guard.reset()
+    r = client.post(f"/api/v1/jobs/{job_id}/state", json={"state": "saved"})
+    assert r.status_code == 200
+    query_guard.check(max_statements=UPDATE_BUDGET)
+
+    query_guard.reset()
+    r = client.patch(f"/api/v1/jobs/{job_id}/notes", json={"notes": "budget"})
+    assert r.status_code == 200
+    query_guard.check(max_statements=UPDATE_BUDGET)
+
+
+def test_normalize_ignores_parameters():
+    assert normalize("SELECT * FROM job WHERE id IN (?, ?, ?)") == normalize(
+        "SELECT *\n FROM job WHERE id IN (?)"
+    )
+    assert normalize("SELECT 1 WHERE x = 'a'") == normalize("SELECT 2 WHERE x = 'b'")
+
+
+def test_repeated_statements_are_flagged(test_engine):
+    with Session(test_engine) as session:
+        ids = session.exec(select(Job.id).limit(5)).all()
+        session.expunge_all()
+
+        with QueryCounter() as counter:
+            for job_id in ids:
+                session.get(Job, job_id)
+
+    assert counter.repeated(threshold=5)[0].count == 5
+    with pytest.raises(QueryBudgetExceeded, match="repeated 5x"):
+        counter.check()
+
+
+# Debug mode reuses the metrics middleware's per-request statement tracking.
+def test_guard_mode_reports_query_count(client):
+    job_id = _some_job_id(client)
+    app = FastAPI()
+    app.include_router(jobs_router, prefix="/api/v1")
+    app.add_middleware(MetricsMiddleware, registry=MetricsRegistry(), query_guard=True)
+    guarded = TestClient(app)
+
+    r = guarded.get(f"/api/v1/jobs/{job_id}")
+
+    assert r.status_code == 200
+    assert 1 <= int(r.headers["x-query-count"]) <= DETAIL_BUDGET
+    assert "x-query-count" not in client.get(f"/api/v1/jobs/{job_id}").headers
@@ -0,0 +1,59 @@
+import json
+import os
+import logging
+from datetime import datetime
+import pytest
+from sqlmodel import Session, func, select
+from ingest.archive import RunArchive
+from ingest.replay import ingest_target, read_recorded, replay_files
+from ingest.writer import save_jobs
+from models.schema import Job, JobRegion
+
+
+def _replayed(paths, region):
+    return [record["id"] for path in replay_files(paths, region) for record in read_recorded(path)]
+
+
+def test_replay_reads_archives_and_dumps(tmp_path, make_record):
+    archive_dir = tmp_path / "archive"
+    for day, n in ((2, 2), (1, 1)):
+        with RunArchive("fi", directory=str(archive_dir), started_at=datetime(2026, 10, day)) as archive:
+            archive.write([make_record(n)])
+    with RunArchive("emea", directory=str(archive_dir)) as archive:
+        archive.write([make_record(99)])
+
+    # Oldest run first, other regions left out.
+    assert _replayed([str(archive_dir)], "fi") == [1, 2]
+
+    (tmp_path / "debug_fi_jobs.json").write_text(json.dumps([make_record(3)]))
+    (tmp_path / "fi_latest.json").write_text(json.dumps({"data": [make_record(4)]}))
+    assert _replayed([str(tmp_path / "debug_fi_jobs.json"), str(tmp_path / "fi_latest.json")], "fi") == [3, 4]
+
+    with pytest.raises(FileNotFoundError, match="Nothing to replay"):
+        replay_files([str(tmp_path / "missing")], "fi")
+    (tmp_path / "empty").mkdir()
+    with pytest.raises(FileNotFoundError, match="Nothing to replay"):
+        replay_files([str(tmp_path / "empty")], "fi")
+
+
+def test_dry_run_writes_to_a_scratch_copy(empty_engine, caplog, make_record):
+    save_jobs([make_record(1)], JobRegion.FI, bind=empty_engine)
+
+    caplog.set_level(logging.INFO)
+    with ingest_target(True, bind=empty_engine) as bind:
+        assert bind is not empty_engine
+        result = save_jobs([make_record(1, job_title="Senior Platform Engineer"), make_record(2)], JobRegion.FI, bind=bind)
+    assert (result.inserted, result.updated) == (1, 1)
+
+    assert "Would insert: DevOps Engineer 2 — Company 2" in caplog.text
+    assert "Would update: Senior Platform Engineer — Company 1" in caplog.text
+    assert "would insert 1 and update 1 jobs" in caplog.text
+    with Session(empty_engine) as session:
+        assert session.exec(select(func.count()).select_from(Job)).one() == 1
+        assert session.exec(select(Job.title)).one() == "DevOps Engineer 1"
+    assert not os.path.exists(bind.url.database)
+
+
+def test_without_dry_run_writes_in_place(empty_engine):
+    with ingest_target(False, bind=empty_engine) as bind:
+        assert bind is empty_engine
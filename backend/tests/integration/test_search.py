@@ -0,0 +1,99 @@
+from sqlalchemy import text
+from sqlmodel import create_engine
+from core.database import init_db
+from core.search import build_match_query, rebuild_fts
+from ingest.writer import save_jobs
+from models.schema import JobRegion
+
+
+def _search(client, q, **params):
+    r = client.get("/api/v1/jobs/search", params={"q": q, **params})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_search_ranks_title_matches_first(client):
+    results = _search(client, "kubernetes")
+    assert results
+    ranks = [row["rank"] for row in results]
+    assert ranks == sorted(ranks)
+    assert "kubernetes" in results[0]["title"].lower()
+    assert "<mark>" in results[0]["title_highlight"]
+    # Card projection plus search fields; descriptions are not served.
+    assert "description" not in results[0]
+    assert {"id", "title", "state", "snippet", "rank"} <= set(results[0])
+
+
+def test_phrase_and_prefix_queries(client):
+    phrase = _search(client, '"platform engineer"')
+    assert phrase
+    for row in phrase:
+        assert "<mark>Platform Engineer</mark>" in row["title_highlight"] + row["snippet"]
+
+    assert _search(client, "kube*")
+    assert not _search(client, "kube")
+
+
+def test_search_combines_with_board_filters(client):
+    everything = _search(client, "engineer", limit=1000)
+    fi = _search(client, "engineer", region="fi", limit=1000)
+    new = _search(client, "engineer", state="new", limit=1000)
+    assert 0 < len(fi) < len(everything)
+    assert all(row["region"] == "fi" for row in fi)
+    assert all(row["state"] == "new" for row in new)
+
+
+def test_query_syntax_is_sanitised(client):
+    assert client.get("/api/v1/jobs/search", params={"q": '"'}).status_code == 400
+    assert client.get("/api/v1/jobs/search", params={"q": "devops AND (NOT"}).status_code == 200
+    assert build_match_query('"site reliability" kube* c++') == '"site reliability" "kube"* "c"'
+
+
+def test_ingestion_keeps_index_in_sync(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fts.db'}")
+    init_db(engine)
+    record = {
+        "id": 1,
+        "job_title": "Observability Engineer",
+        "company": "Acme",
+        "url": "https://example.com/1",
+        "description": "Prometheus and Grafana",
+        "country": "Finland",
+    }
+    save_jobs([record], JobRegion.FI, bind=engine)
+    save_jobs([{**record, "description": "OpenTelemetry collectors"}], JobRegion.FI, bind=engine)
+
+    def hits(q):
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT COUNT(*) FROM job_fts WHERE job_fts MATCH :q"), {"q": q}
+            ).scalar_one()
+
+    assert hits("opentelemetry") == 1
+    assert hits("grafana") == 0
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM job_fts"))
+        assert rebuild_fts(conn) == 1
+    assert hits("opentelemetry") == 1
+
+
+def test_highlights_escape_job_text(client, test_engine):
+    save_jobs(
+        [
+            {
+                "id": "xss-1",
+                "job_title": "<img src=x onerror=alert(1)> Zookeeper",
+                "company": "Acme",
+                "url": "https://example.com/xss",
+                "description": "Feed the <script>alert(1)</script> zookeeper daily.",
+            }
+        ],
+        JobRegion.FI,
+        bind=test_engine,
+    )
+
+    [row] = _search(client, "zookeeper")
+    assert row["title_highlight"] == "&lt;img src=x onerror=alert(1)&gt; <mark>Zookeeper</mark>"
+    assert "<script>" not in row["snippet"]
+    assert "&lt;script&gt;" in row["snippet"] and "<mark>zookeeper</mark>" in row["snippet"]
@@ -0,0 +1,135 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from ingest.archive import RunArchive, archive_paths, read_archive
+from ingest.theirstack import TheirStackClient, TokenBucket
+
+
+class FakeTheirStack(BaseHTTPRequestHandler):
+    total = 60
+    fail_first = set()
+    seen_pages = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        page, limit = body["page"], body["limit"]
+
+        if page in self.fail_first:
+            self.fail_first.discard(page)
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        self.seen_pages.append(page)
+        start = page * limit
+        data = [{"id": n, "job_title": f"Job {n}"} for n in range(start, min(start + limit, self.total))]
+        payload = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_server():
+    FakeTheirStack.fail_first = set()
+    FakeTheirStack.seen_pages = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTheirStack)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", FakeTheirStack
+    server.shutdown()
+    server.server_close()
+
+
+def _records(client, query, start_page=0):
+    return [record for page in client.iter_pages(query, start_page=start_page) for record in page]
+
+
+def test_walks_every_page(fake_server):
+    url, handler = fake_server
+    handler.total = 60
+
+    with TheirStackClient("key", base_url=url, concurrency=3, requests_per_second=100) as client:
+        jobs = _records(client, {"limit": 25})
+
+    assert [j["id"] for j in jobs] == list(range(60))
+    assert sorted(handler.seen_pages) == [0, 1, 2]
+
+
+def test_starts_at_the_given_page(fake_server):
+    url, handler = fake_server
+    handler.total = 60
+
+    with TheirStackClient("key", base_url=url, concurrency=3, requests_per_second=100) as client:
+        jobs = _records(client, {"limit": 25}, start_page=1)
+
+    assert [j["id"] for j in jobs] == list(range(25, 60))
+    assert min(handler.seen_pages) == 1
+
+
+def test_archives_raw_pages(fake_server, tmp_path):
+    url, handler = fake_server
+    handler.total = 60
+
+    with TheirStackClient("key", base_url=url, concurrency=3, requests_per_second=100) as client, \
+            RunArchive("fi", directory=str(tmp_path)) as archive:
+        jobs = []
+        for page in client.iter_pages({"limit": 25}):
+            archive.write(page)
+            jobs += page
+
+    assert archive_paths(str(tmp_path)) == [archive.path]
+    assert list(read_archive(archive.path)) == jobs
+    assert archive_paths(str(tmp_path), region="emea") == []
+
+
+def test_respects_max_pages(fake_server):
+    url, handler = fake_server
+    handler.total = 1000
+
+    with TheirStackClient("key", base_url=url, max_pages=2, requests_per_second=100) as client:
+        jobs = _records(client, {"limit": 25})
+
+    assert len(jobs) == 50
+
+
+def test_retries_rate_limited_pages(fake_server):
+    url, handler = fake_server
+    handler.total = 30
+    handler.fail_first = {0, 1}
+
+    with TheirStackClient(
+        "key", base_url=url, requests_per_second=100, backoff_seconds=0.01
+    ) as client:
+        jobs = _records(client, {"limit": 25})
+
+    assert len(jobs) == 30
+
+
+def test_gives_up_after_max_retries(fake_server):
+    url, handler = fake_server
+    handler.fail_first = {0}
+
+    with TheirStackClient(
+        "key", base_url=url, max_retries=0, requests_per_second=100
+    ) as client:
+        with pytest.raises(RuntimeError):
+            _records(client, {"limit": 25})
+
+
+def test_token_bucket_limits_rate():
+    import time
+
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.18
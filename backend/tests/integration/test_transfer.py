@@ -0,0 +1,101 @@
+import io
+import json
+import orjson
+from sqlalchemy import text
+from sqlmodel import Session, select
+from core.transfer import import_records, read_csv, read_legacy, read_ndjson
+from models.schema import Job, JobCurrentState, JobRegion, JobStateHistory
+
+
+def _board(engine):
+    with Session(engine) as session:
+        return {
+            row.job_id: (row.state, row.notes or "", row.updated_at, row.applied_at)
+            for row in session.exec(select(JobCurrentState))
+        }
+
+
+def test_ndjson_export_round_trip(client, test_engine, empty_engine, count_rows):
+    r = client.get("/api/v1/export", headers={"Accept-Encoding": "identity"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in r.headers["content-disposition"]
+
+    records = [orjson.loads(line) for line in r.content.splitlines()]
+    assert len(records) == count_rows(test_engine, Job)
+    assert sum(len(record["history"]) for record in records) == count_rows(test_engine, JobStateHistory)
+
+    result = import_records(read_ndjson(io.BytesIO(r.content)), bind=empty_engine, chunk_size=50)
+    assert (result.inserted, result.skipped) == (len(records), 0)
+    assert count_rows(empty_engine, JobStateHistory) == count_rows(test_engine, JobStateHistory)
+    imported = _board(empty_engine)
+    # Jobs without a current state row get one on import.
+    assert {job_id: imported[job_id] for job_id in _board(test_engine)} == _board(test_engine)
+
+    again = import_records(read_ndjson(io.BytesIO(r.content)), bind=empty_engine)
+    assert (again.inserted, again.skipped) == (0, len(records))
+
+
+def test_csv_export_round_trip(client, test_engine, empty_engine, count_rows):
+    r = client.get("/api/v1/export", params={"format": "csv"}, headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["content-type"].startswith("text/csv")
+
+    result = import_records(read_csv(io.StringIO(r.text)), bind=empty_engine)
+    assert result.inserted == count_rows(test_engine, Job)
+
+    with Session(empty_engine) as session:
+        imported = {job.id: job for job in session.exec(select(Job))}
+    with Session(test_engine) as session:
+        for job in session.exec(select(Job)):
+            copy = imported[job.id]
+            assert (copy.title, copy.region, copy.latitude, copy.remote) == (
+                job.title, job.region, job.latitude, job.remote
+            )
+
+
+def test_import_endpoint_skips_existing_jobs(client, test_engine):
+    exported = client.get("/api/v1/export").content
+    first = orjson.loads(exported.splitlines()[0])
+    new = {**first, "id": None, "external_id": "imported-1", "title": "Imported Engineer", "history": []}
+    body = exported + orjson.dumps(new) + b"\n"
+
+    r = client.post("/api/v1/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200, r.text
+    assert r.json() == {"inserted": 1, "skipped": len(exported.splitlines())}
+
+    r = client.post("/api/v1/import", content=b"{not json\n")
+    assert r.status_code == 400
+
+
+def test_legacy_json_import(tmp_path, empty_engine):
+    raw = {
+        "id": 4242,
+        "job_title": "Linux Admin",
+        "company": "Legacy Oy",
+        "url": "https://example.com/4242",
+        "description": "Old data",
+        "country": "Finland",
+        "remote": True,
+    }
+    (tmp_path / "fi_latest.json").write_text(json.dumps({"data": [raw, {**raw, "id": 4243}]}))
+    (tmp_path / "job_state.json").write_text(
+        json.dumps({"4242": {"state": "applied", "notes": "sent CV", "updated_at": "2025-05-01T12:00:00+03:00"}})
+    )
+
+    result = import_records(read_legacy(str(tmp_path)), bind=empty_engine)
+    assert result.inserted == 2
+
+    with Session(empty_engine) as session:
+        job = session.exec(select(Job).where(Job.external_id == "4242")).one()
+        current = session.get(JobCurrentState, job.id)
+    assert job.region == JobRegion.FI and job.remote
+    assert (current.state, current.notes) == ("applied", "sent CV")
+    assert current.updated_at.isoformat() == "2025-05-01T09:00:00"
+    assert current.applied_at == current.updated_at
+
+    # Imported jobs are in the search index, and the insert trigger is back.
+    with empty_engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM job_fts WHERE job_fts MATCH 'linux'")).scalar_one() == 2
+        assert conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'job_fts_insert'")).first()
@@ -20,6 +20,12 @@ export async function fetchJobs(range?: string) {
   return res.json();
 }
 
+// The list only carries card fields; descriptions come with the single job.
+export const fetchJob = async (id: string) => {
+  const res = await api.get(`/jobs/${id}`);
+  return res.data;
+};
+
 export const updateJobState = async (id: string, state: string) => {
   const res = await api.post(`/jobs/${id}/state`, { state });
   return res.data;
@@ -12,6 +12,7 @@ import {
   Button,
   Menu,
   ActionIcon,
+  Loader,
   useMantineTheme,
 } from "@mantine/core";
 
@@ -24,7 +25,8 @@ import {
 
 import type { Job } from "../api/jobs";
 import { useJobs } from "../hooks/useJobs";
-import { useQueryClient } from "@tanstack/react-query";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
+import { fetchJob } from "../api/jobsApi";
 
 const COLUMN_ORDER = [
   "new",
@@ -51,6 +53,13 @@ export function KanbanBoard() {
 
   const [selectedJob, setSelectedJob] = useState<Job | null>(null);
 
+  // The board list has no descriptions; load the full job when the modal opens.
+  const selectedDetail = useQuery({
+    queryKey: ["job", selectedJob ? String(selectedJob.id) : null],
+    queryFn: () => fetchJob(String(selectedJob!.id)),
+    enabled: !!selectedJob,
+  });
+
   if (jobs.isLoading) return <>Loading...</>;
   if (!jobs.data) return <>No jobs</>;
 
@@ -101,13 +110,17 @@ export function KanbanBoard() {
             </Text>
 
             <ScrollArea h={300} mb="md">
-              <Text size="sm" style={{ whiteSpace: "pre-line" }}>
-                {selectedJob.description ||
-                  selectedJob.long_description ||
-                  selectedJob.full_description ||
-                  selectedJob.content ||
-                  "No description available."}
-              </Text>
+              {selectedDetail.isLoading ? (
+                <Loader size="sm" />
+              ) : (
+                <Text size="sm" style={{ whiteSpace: "pre-line" }}>
+                  {selectedDetail.data?.description ||
+                    selectedJob.long_description ||
+                    selectedJob.full_description ||
+                    selectedJob.content ||
+                    "No description available."}
+                </Text>
+              )}
             </ScrollArea>
 
             <Button